@@ -0,0 +1,132 @@
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_18_add_amenity_mask'
+down_revision = '2026_10_18_add_approved_property_search'
+branch_labels = None
+depends_on = None
+
+# Same vocabulary as app/utils/amenities.py (key = lowercased name without non-[a-z0-9])
+AMENITY_BITS_SQL = """
+    CREATE OR REPLACE FUNCTION amenity_bits(amenities jsonb) RETURNS bigint AS $$
+      SELECT COALESCE(bit_or(1::bigint << v.bit), 0)
+      FROM jsonb_array_elements_text(CASE WHEN jsonb_typeof(amenities) = 'array' THEN amenities ELSE '[]'::jsonb END) AS a(name)
+      JOIN (VALUES
+        ('wifi', 0), ('wireless', 0), ('internet', 0), ('parking', 1), ('garage', 1),
+        ('carparking', 1), ('security', 2), ('guard', 2), ('securityguard', 2), ('generator', 3),
+        ('backuppower', 3), ('247water', 4), ('water', 4), ('watertank', 4), ('balcony', 5),
+        ('garden', 6), ('elevator', 7), ('lift', 7), ('furnished', 8), ('kitchenette', 9),
+        ('gym', 10), ('fitness', 10), ('swimmingpool', 11), ('pool', 11), ('sauna', 12),
+        ('jacuzzi', 13), ('rooftopterrace', 14), ('rooftop', 14), ('terrace', 14),
+        ('sharedkitchen', 15), ('loadingdock', 16), ('mainroadaccess', 17), ('mainroad', 17)
+      ) AS v(key, bit) ON v.key = regexp_replace(lower(a.name), '[^a-z0-9]+', '', 'g')
+    $$ LANGUAGE sql IMMUTABLE;
+"""
+
+
+def _sync_functions(with_mask: bool) -> list:
+    """
+    sync/refresh functions of approved_property_search, with or without the amenity_mask column.
+    """
+    columns = "id, user_id, title, description, location, price, house_type, amenities, photos, lat, lon, geohash, earth, updated_at"
+    upsert = """
+        user_id = EXCLUDED.user_id, title = EXCLUDED.title, description = EXCLUDED.description,
+        location = EXCLUDED.location, price = EXCLUDED.price, house_type = EXCLUDED.house_type,
+        amenities = EXCLUDED.amenities, photos = EXCLUDED.photos, lat = EXCLUDED.lat, lon = EXCLUDED.lon,
+        geohash = EXCLUDED.geohash, earth = EXCLUDED.earth, updated_at = EXCLUDED.updated_at
+    """
+    new_amenities = "COALESCE(NEW.amenities, '[]'::jsonb)"
+    p_amenities = "COALESCE(p.amenities, '[]'::jsonb)"
+    if with_mask:
+        columns = columns.replace("amenities,", "amenities, amenity_mask,")
+        new_amenities += ", NEW.amenity_mask"
+        p_amenities += ", p.amenity_mask"
+        upsert = upsert.replace("amenities = EXCLUDED.amenities,", "amenities = EXCLUDED.amenities, amenity_mask = EXCLUDED.amenity_mask,")
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION sync_approved_property_search() RETURNS trigger AS $$
+        BEGIN
+          IF TG_OP = 'DELETE' THEN
+            DELETE FROM approved_property_search WHERE id = OLD.id;
+            RETURN OLD;
+          END IF;
+          IF NEW.status <> 'APPROVED' THEN
+            DELETE FROM approved_property_search WHERE id = NEW.id;
+            RETURN NEW;
+          END IF;
+          INSERT INTO approved_property_search ({columns})
+          VALUES (NEW.id, NEW.user_id, NEW.title, NEW.description, NEW.location, NEW.price, NEW.house_type,
+                  {new_amenities}, COALESCE(NEW.photos, '[]'::jsonb), NEW.lat, NEW.lon, NEW.geohash,
+                  CASE WHEN NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL THEN ll_to_earth(NEW.lat, NEW.lon) END,
+                  NEW.updated_at)
+          ON CONFLICT (id) DO UPDATE SET {upsert};
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION refresh_approved_property_search() RETURNS integer AS $$
+        DECLARE
+          removed integer;
+          changed integer;
+        BEGIN
+          DELETE FROM approved_property_search s
+          WHERE NOT EXISTS (SELECT 1 FROM properties p WHERE p.id = s.id AND p.status = 'APPROVED');
+          GET DIAGNOSTICS removed = ROW_COUNT;
+          INSERT INTO approved_property_search ({columns})
+          SELECT p.id, p.user_id, p.title, p.description, p.location, p.price, p.house_type,
+                 {p_amenities}, COALESCE(p.photos, '[]'::jsonb), p.lat, p.lon, p.geohash,
+                 CASE WHEN p.lat IS NOT NULL AND p.lon IS NOT NULL THEN ll_to_earth(p.lat, p.lon) END,
+                 p.updated_at
+          FROM properties p
+          LEFT JOIN approved_property_search s ON s.id = p.id
+          WHERE p.status = 'APPROVED' AND (s.id IS NULL OR s.updated_at < p.updated_at)
+          ON CONFLICT (id) DO UPDATE SET {upsert};
+          GET DIAGNOSTICS changed = ROW_COUNT;
+          RETURN removed + changed;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+    ]
+
+
+def upgrade():
+    op.execute(AMENITY_BITS_SQL)
+    op.add_column('properties', sa.Column('amenity_mask', sa.BigInteger, nullable=False, server_default='0'))
+    op.add_column('approved_property_search', sa.Column('amenity_mask', sa.BigInteger, nullable=False, server_default='0'))
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_amenity_mask_column() RETURNS trigger AS $$
+        BEGIN
+          NEW.amenity_mask := amenity_bits(NEW.amenities);
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP TRIGGER IF EXISTS update_amenity_mask ON properties")
+    op.execute("""
+        CREATE TRIGGER update_amenity_mask
+        BEFORE INSERT OR UPDATE OF amenities ON properties
+        FOR EACH ROW EXECUTE PROCEDURE update_amenity_mask_column()
+    """)
+
+    # Search-table sync now copies the mask as well
+    for sql in _sync_functions(with_mask=True):
+        op.execute(sql)
+
+    # Backfill without bumping updated_at or publishing a change per row
+    op.execute("ALTER TABLE properties DISABLE TRIGGER USER")
+    op.execute("UPDATE properties SET amenity_mask = amenity_bits(amenities)")
+    op.execute("ALTER TABLE properties ENABLE TRIGGER USER")
+    op.execute("UPDATE approved_property_search SET amenity_mask = amenity_bits(amenities)")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS update_amenity_mask ON properties")
+    op.execute("DROP FUNCTION IF EXISTS update_amenity_mask_column()")
+    op.drop_column('approved_property_search', 'amenity_mask')
+    op.drop_column('properties', 'amenity_mask')
+    op.execute("DROP FUNCTION IF EXISTS amenity_bits(jsonb)")
+    for sql in _sync_functions(with_mask=False):
+        op.execute(sql)
@@ -0,0 +1,105 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_18_add_approved_property_search'
+down_revision = '2026_10_18_add_properties_geohash'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = "id, user_id, title, description, location, price, house_type, amenities, photos, lat, lon, geohash, earth, updated_at"
+UPSERT_SET = """
+    user_id = EXCLUDED.user_id, title = EXCLUDED.title, description = EXCLUDED.description,
+    location = EXCLUDED.location, price = EXCLUDED.price, house_type = EXCLUDED.house_type,
+    amenities = EXCLUDED.amenities, photos = EXCLUDED.photos, lat = EXCLUDED.lat, lon = EXCLUDED.lon,
+    geohash = EXCLUDED.geohash, earth = EXCLUDED.earth, updated_at = EXCLUDED.updated_at
+"""
+
+
+def upgrade():
+    # Approved listings only, with the searchable columns and the precomputed earth point
+    op.create_table(
+        'approved_property_search',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text, nullable=False),
+        sa.Column('location', sa.String(255), nullable=False),
+        sa.Column('price', sa.Numeric(10, 2), nullable=False),
+        sa.Column('house_type', sa.String(50)),
+        sa.Column('amenities', postgresql.JSONB, nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column('photos', postgresql.JSONB, nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column('lat', sa.Float),
+        sa.Column('lon', sa.Float),
+        sa.Column('geohash', sa.String(12, collation='C')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute("ALTER TABLE approved_property_search ADD COLUMN earth earth")
+    op.create_index('idx_approved_property_search_price', 'approved_property_search', ['price'])
+    op.create_index('idx_approved_property_search_house_type', 'approved_property_search', ['house_type'])
+    op.create_index('idx_approved_property_search_geohash', 'approved_property_search', ['geohash'])
+    op.execute("CREATE INDEX idx_approved_property_search_earth ON approved_property_search USING GIST (earth)")
+
+    # Row-level sync from properties (runs after update_geohash has set NEW.geohash)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION sync_approved_property_search() RETURNS trigger AS $$
+        BEGIN
+          IF TG_OP = 'DELETE' THEN
+            DELETE FROM approved_property_search WHERE id = OLD.id;
+            RETURN OLD;
+          END IF;
+          IF NEW.status <> 'APPROVED' THEN
+            DELETE FROM approved_property_search WHERE id = NEW.id;
+            RETURN NEW;
+          END IF;
+          INSERT INTO approved_property_search ({SEARCH_COLUMNS})
+          VALUES (NEW.id, NEW.user_id, NEW.title, NEW.description, NEW.location, NEW.price, NEW.house_type,
+                  COALESCE(NEW.amenities, '[]'::jsonb), COALESCE(NEW.photos, '[]'::jsonb), NEW.lat, NEW.lon, NEW.geohash,
+                  CASE WHEN NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL THEN ll_to_earth(NEW.lat, NEW.lon) END,
+                  NEW.updated_at)
+          ON CONFLICT (id) DO UPDATE SET {UPSERT_SET};
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP TRIGGER IF EXISTS sync_approved_property_search ON properties")
+    op.execute("""
+        CREATE TRIGGER sync_approved_property_search
+        AFTER INSERT OR DELETE OR UPDATE OF user_id, title, description, location, price, house_type,
+                                          amenities, photos, status, lat, lon ON properties
+        FOR EACH ROW EXECUTE PROCEDURE sync_approved_property_search()
+    """)
+
+    # Catch-up keyed on updated_at (backfill below; also for loads that bypass triggers)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION refresh_approved_property_search() RETURNS integer AS $$
+        DECLARE
+          removed integer;
+          changed integer;
+        BEGIN
+          DELETE FROM approved_property_search s
+          WHERE NOT EXISTS (SELECT 1 FROM properties p WHERE p.id = s.id AND p.status = 'APPROVED');
+          GET DIAGNOSTICS removed = ROW_COUNT;
+          INSERT INTO approved_property_search ({SEARCH_COLUMNS})
+          SELECT p.id, p.user_id, p.title, p.description, p.location, p.price, p.house_type,
+                 COALESCE(p.amenities, '[]'::jsonb), COALESCE(p.photos, '[]'::jsonb), p.lat, p.lon, p.geohash,
+                 CASE WHEN p.lat IS NOT NULL AND p.lon IS NOT NULL THEN ll_to_earth(p.lat, p.lon) END,
+                 p.updated_at
+          FROM properties p
+          LEFT JOIN approved_property_search s ON s.id = p.id
+          WHERE p.status = 'APPROVED' AND (s.id IS NULL OR s.updated_at < p.updated_at)
+          ON CONFLICT (id) DO UPDATE SET {UPSERT_SET};
+          GET DIAGNOSTICS changed = ROW_COUNT;
+          RETURN removed + changed;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("SELECT refresh_approved_property_search()")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS sync_approved_property_search ON properties")
+    op.execute("DROP FUNCTION IF EXISTS sync_approved_property_search()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_approved_property_search()")
+    op.drop_table('approved_property_search')
@@ -0,0 +1,75 @@
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_18_add_properties_geohash'
+down_revision = '2026_10_18_add_saved_search_matches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # "C" collation so every geohash prefix is one contiguous btree range
+    op.add_column('properties', sa.Column('geohash', sa.String(12, collation='C'), nullable=True))
+    op.execute("""
+        CREATE OR REPLACE FUNCTION geohash_encode(lat double precision, lon double precision, len integer DEFAULT 9)
+        RETURNS text AS $$
+        DECLARE
+          alphabet CONSTANT text := '0123456789bcdefghjkmnpqrstuvwxyz';
+          lat_lo double precision := -90;
+          lat_hi double precision := 90;
+          lon_lo double precision := -180;
+          lon_hi double precision := 180;
+          mid double precision;
+          result text := '';
+          ch integer := 0;
+          nbits integer := 0;
+          even boolean := true;
+        BEGIN
+          WHILE length(result) < len LOOP
+            IF even THEN
+              mid := (lon_lo + lon_hi) / 2;
+              IF lon >= mid THEN ch := ch * 2 + 1; lon_lo := mid; ELSE ch := ch * 2; lon_hi := mid; END IF;
+            ELSE
+              mid := (lat_lo + lat_hi) / 2;
+              IF lat >= mid THEN ch := ch * 2 + 1; lat_lo := mid; ELSE ch := ch * 2; lat_hi := mid; END IF;
+            END IF;
+            even := NOT even;
+            nbits := nbits + 1;
+            IF nbits = 5 THEN
+              result := result || substr(alphabet, ch + 1, 1);
+              ch := 0;
+              nbits := 0;
+            END IF;
+          END LOOP;
+          RETURN result;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE STRICT;
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_geohash_column() RETURNS trigger AS $$
+        BEGIN
+          NEW.geohash := geohash_encode(NEW.lat, NEW.lon, 9);
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP TRIGGER IF EXISTS update_geohash ON properties")
+    op.execute("""
+        CREATE TRIGGER update_geohash
+        BEFORE INSERT OR UPDATE OF lat, lon ON properties
+        FOR EACH ROW EXECUTE PROCEDURE update_geohash_column()
+    """)
+    # Backfill without bumping updated_at, recomputing search vectors or publishing a change per row
+    op.execute("ALTER TABLE properties DISABLE TRIGGER USER")
+    op.execute("UPDATE properties SET geohash = geohash_encode(lat, lon, 9) WHERE lat IS NOT NULL AND lon IS NOT NULL")
+    op.execute("ALTER TABLE properties ENABLE TRIGGER USER")
+    op.create_index('idx_properties_geohash', 'properties', ['geohash'])
+
+
+def downgrade():
+    op.drop_index('idx_properties_geohash', table_name='properties')
+    op.execute("DROP TRIGGER IF EXISTS update_geohash ON properties")
+    op.execute("DROP FUNCTION IF EXISTS update_geohash_column()")
+    op.execute("DROP FUNCTION IF EXISTS geohash_encode(double precision, double precision, integer)")
+    op.drop_column('properties', 'geohash')
@@ -0,0 +1,55 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_18_add_saved_search_matches'
+down_revision = '2025_11_11_add_max_distance_km_to_saved_searches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'saved_search_matches',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('saved_search_id', sa.Integer, sa.ForeignKey('SavedSearches.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('property_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('matched_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('notified_at', sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint('saved_search_id', 'property_id', name='uq_saved_search_matches_search_property'),
+    )
+    op.create_index(
+        'ix_saved_search_matches_pending', 'saved_search_matches', ['matched_at'],
+        postgresql_where=sa.text('notified_at IS NULL'),
+    )
+    # Change feed: every properties row change is published on the property_changes channel
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_property_change() RETURNS trigger AS $$
+        BEGIN
+          IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify('property_changes', json_build_object(
+              'op', TG_OP, 'id', OLD.id, 'status', NULL, 'old_status', OLD.status)::text);
+            RETURN OLD;
+          END IF;
+          PERFORM pg_notify('property_changes', json_build_object(
+            'op', TG_OP, 'id', NEW.id, 'status', NEW.status,
+            'old_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status ELSE NULL END)::text);
+          RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP TRIGGER IF EXISTS property_changes ON properties")
+    op.execute("""
+        CREATE TRIGGER property_changes
+        AFTER INSERT OR UPDATE OR DELETE ON properties
+        FOR EACH ROW EXECUTE PROCEDURE notify_property_change()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS property_changes ON properties")
+    op.execute("DROP FUNCTION IF EXISTS notify_property_change()")
+    op.drop_index('ix_saved_search_matches_pending', table_name='saved_search_matches')
+    op.drop_table('saved_search_matches')
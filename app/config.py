@@ -14,6 +14,132 @@ class Settings(BaseSettings):
     ROUTES_DATA_PATH: str = "data/routes.json"
     # Public base URL for generating absolute links (e.g., http://localhost:8005)
     BASE_URL: str = "http://localhost:8005"
+    # Shared SQLAlchemy pool (one engine per process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Multi-worker mode (gunicorn.conf.py): worker processes per replica (0 = one per CPU). When set,
+    # DB_MAX_CONNECTIONS is the budget for all workers together, split evenly into each worker's pool
+    # (DB_POOL_SIZE at most, the rest overflow); REDIS_MAX_CONNECTIONS caps each worker's Redis pools
+    WEB_CONCURRENCY: int = 0
+    DB_MAX_CONNECTIONS: int = 0
+    REDIS_MAX_CONNECTIONS: int = 0
+    # /health/ready: per-check timeout, how long a result is reused across probes, and the share of
+    # DB connections (pool + overflow) checked out at which the replica reports itself degraded
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 1.0
+    HEALTH_CACHE_SECONDS: float = 2.0
+    HEALTH_POOL_SATURATION: float = 1.0
+    # Startup warm-up (bounded per step; failures are reported, not fatal) and shutdown drain: on SIGTERM
+    # readiness turns 503 and the server keeps accepting for DELAY (so the load balancer stops routing
+    # here), then requests in flight get DRAIN before it stops listening
+    STARTUP_STEP_TIMEOUT_SECONDS: float = 5.0
+    STARTUP_WARM_CACHES: bool = True
+    STARTUP_WARM_TIMEOUT_SECONDS: float = 30.0
+    SHUTDOWN_DELAY_SECONDS: float = 5.0
+    SHUTDOWN_DRAIN_SECONDS: float = 10.0
+    # Upstream circuit breakers (per host): open after this many failures in a row, retry after RESET_SECONDS
+    UPSTREAM_BREAKER_FAILURES: int = 5
+    UPSTREAM_BREAKER_RESET_SECONDS: float = 30.0
+    # Request profiling (off when both are 0): fraction of requests to profile,
+    # and latency above which a request's SQL timings are always captured
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_SLOW_MS: float = 0.0
+    PROFILING_BUFFER_SIZE: int = 50
+    # Per-property cache, in-process and Redis (dropped on change via the property change feed),
+    # not-found markers for unknown ids, and POST /properties/batch size
+    PROPERTY_CACHE_TTL_SECONDS: int = 600
+    PROPERTY_NEGATIVE_TTL_SECONDS: int = 60
+    PROPERTY_LOCAL_CACHE_SIZE: int = 2000
+    PROPERTY_LOCAL_TTL_SECONDS: float = 30.0
+    PROPERTY_BATCH_MAX_IDS: int = 100
+    # Per-user saved-search list cache (invalidated on save)
+    SAVED_SEARCH_CACHE_TTL_SECONDS: int = 300
+    # Serialize search rows with orjson directly instead of re-validating each through SearchResponse
+    FAST_SERIALIZATION: bool = True
+    # Prefilter radius/map queries with btree ranges on properties.geohash before the exact predicate
+    GEOHASH_PREFILTER: bool = True
+    GEOHASH_MAX_RANGES: int = 16
+    # Responses smaller than this (bytes) are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # /search/facets: price histogram bucket width and cumulative distance rings (km)
+    FACET_PRICE_BUCKET: float = 5000.0
+    FACET_DISTANCE_RINGS_KM: str = "1,2,5,10,20"
+    # /search/map clustering: markers are cached per tile; each tile is a GRID x GRID lattice,
+    # and from MAP_POINTS_MIN_ZOOM individual listings are sent (up to the per-tile cap)
+    MAP_MAX_TILES: int = 16
+    MAP_CLUSTER_GRID: int = 8
+    MAP_POINTS_MIN_ZOOM: int = 16
+    MAP_MAX_POINTS_PER_TILE: int = 200
+    MAP_CLUSTER_TTL_SECONDS: int = 300
+    # Saved-search alerts: match newly approved properties and notify tenants
+    ALERTS_ENABLED: bool = True
+    ALERT_BATCH_SIZE: int = 100
+    ALERT_BATCH_INTERVAL_SECONDS: float = 5.0
+    ALERT_RETRY_INTERVAL_SECONDS: float = 60.0
+    ALERT_PRICE_BUCKET: float = 5000.0
+    ALERT_GEOHASH_PRECISION: int = 5
+    # Full reload of the saved-search index (picks up edits and deletions)
+    ALERT_INDEX_REBUILD_SECONDS: float = 300.0
+    NOTIFICATION_BATCH_PATH: str = "/api/v1/notifications/batch"
+    # Owner contact on listings: "db" reads the users table, "user_service" calls the user-management
+    # bulk endpoint. Either way one lookup per result page, cached per user (unknown users briefly)
+    OWNER_CONTACT_SOURCE: str = "db"
+    OWNER_CONTACT_TTL_SECONDS: int = 900
+    OWNER_CONTACT_NEGATIVE_TTL_SECONDS: int = 120
+    OWNER_CONTACT_LOCAL_CACHE_SIZE: int = 5000
+    OWNER_CONTACT_LOCAL_TTL_SECONDS: float = 60.0
+    # Results and property rows built while the contact source failed are cached only this long
+    OWNER_CONTACT_OUTAGE_TTL_SECONDS: int = 30
+    USER_BULK_LOOKUP_PATH: str = "/users/bulk"
+    USER_BULK_LOOKUP_BATCH: int = 100
+    # /onm route and Matrix caches: coordinates snapped to ROUTE_COORD_PRECISION decimals (4 is ~11 m),
+    # ONM waypoints keyed as a sorted set, and Matrix cells also kept per origin->destination leg
+    ROUTE_COORD_PRECISION: int = 4
+    ONM_CACHE_TTL_SECONDS: int = 86400
+    MATRIX_CACHE_TTL_SECONDS: int = 86400
+    ROUTE_LOCAL_CACHE_SIZE: int = 1000
+    ROUTE_LOCAL_TTL_SECONDS: float = 300.0
+    # Precomputed routes-dataset distance matrix (python -m app.services.route_matrix); /onm/nearest
+    # snaps the origin to the closest dataset nodes within ROUTE_MATRIX_SNAP_KM and ranks from it
+    ROUTE_MATRIX_PATH: str = "data/route_matrix.npy"
+    ROUTE_MATRIX_SNAP_KM: float = 2.0
+    ROUTE_MATRIX_SNAP_NODES: int = 3
+    # /search?commute_to=: the SEARCH_COMMUTE_TOP_K listings nearest (straight line) to up to MAX_DESTINATIONS
+    # destinations are ranked by travel time from cached Matrix legs; time is distance at SPEED_KMH
+    # when the Matrix API sends no durations
+    SEARCH_COMMUTE_MAX_DESTINATIONS: int = 3
+    SEARCH_COMMUTE_TOP_K: int = 27
+    SEARCH_COMMUTE_SPEED_KMH: float = 25.0
+    # Background jobs (app/core/jobs.py): schedules are jittered by +/- JOBS_JITTER of the interval;
+    # leader-only jobs run on one replica (Redis lock). Warm-ups run well inside the 1h cache TTLs
+    JOBS_ENABLED: bool = True
+    JOBS_JITTER: float = 0.1
+    JOBS_SHUTDOWN_GRACE_SECONDS: float = 10.0
+    WARM_APPROVED_INTERVAL_SECONDS: float = 1800.0
+    WARM_TILES_INTERVAL_SECONDS: float = 1800.0
+    WARM_TILE_ZOOMS: str = "13,14,15"
+    WARM_TILE_RADIUS: int = 1
+    LOCAL_CACHE_PRUNE_INTERVAL_SECONDS: float = 60.0
+    # Catch approved_property_search up with properties (loads that bypassed its trigger); 0 = manual only
+    SEARCH_TABLE_REFRESH_INTERVAL_SECONDS: float = 3600.0
+    # Popular searches: /search criteria are counted per worker, flushed to a Redis sorted set every
+    # FLUSH_SECONDS and decayed with HALF_LIFE_SECONDS; every REFRESH_SECONDS the TOP_N are recomputed
+    # when their cache entry would expire within two refresh intervals
+    SEARCH_POPULAR_TOP_N: int = 50
+    SEARCH_POPULAR_MAX_TRACKED: int = 2000
+    SEARCH_POPULAR_MAX_PENDING: int = 5000
+    SEARCH_POPULAR_HALF_LIFE_SECONDS: float = 21600.0
+    SEARCH_POPULAR_FLUSH_SECONDS: float = 10.0
+    SEARCH_POPULAR_REFRESH_SECONDS: float = 600.0
+    # Rate limiting: in-process token buckets per route and user (client IP when unauthenticated),
+    # pushed to shared Redis counters every RATE_LIMIT_SYNC_SECONDS. Requests served from cache pay
+    # RATE_LIMIT_HIT_COST of a token; role multipliers and RATE_LIMIT_SCALE raise the per-route limits
+    RATE_LIMIT_HIT_COST: float = 0.2
+    RATE_LIMIT_SYNC_SECONDS: float = 1.0
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_ROLE_MULTIPLIERS: str = "admin:10,landlord:2"
+    RATE_LIMIT_SCALE: float = 1.0
+    # Per client IP across all per-user limited routes, charged before the token is verified
+    RATE_LIMIT_PRE_AUTH_PER_MINUTE: int = 300
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
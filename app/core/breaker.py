@@ -0,0 +1,89 @@
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from structlog import get_logger
+
+from app.config import settings
+
+logger = get_logger()
+
+
+class CircuitOpenError(httpx.TransportError):
+    """
+    Raised instead of calling an upstream whose circuit is open. It is an httpx.RequestError,
+    so callers' existing "upstream unavailable" handling applies unchanged.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one upstream host. After `failure_threshold` failures in a row
+    (transport errors or 5xx) calls fail fast for `reset_seconds`; then a single trial call decides
+    whether the circuit closes again or stays open for another period.
+    """
+
+    def __init__(self, host: str, failure_threshold: int, reset_seconds: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial = False
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self.state == "closed":
+            return True
+        if self.state == "open" and now - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self.trial = False
+        if self.state == "half_open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def record(self, ok: bool, now: Optional[float] = None) -> None:
+        if ok:
+            if self.state != "closed":
+                logger.info("Upstream circuit closed", host=self.host)
+            self.state, self.failures, self.trial = "closed", 0, False
+            return
+        self.failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            logger.warning("Upstream circuit opened", host=self.host, failures=self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic() if now is None else now
+            self.trial = False
+
+    def abandon(self) -> None:
+        # A cancelled trial call proves nothing; let the next caller try
+        self.trial = False
+
+    def status(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        retry_in = None
+        if self.state == "open":
+            retry_in = round(max(0.0, self.reset_seconds - (now - self.opened_at)), 3)
+        return {"state": self.state, "failures": self.failures, "retry_in_seconds": retry_in}
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    breaker = _BREAKERS.get(host)
+    if breaker is None:
+        breaker = _BREAKERS[host] = CircuitBreaker(
+            host, settings.UPSTREAM_BREAKER_FAILURES, settings.UPSTREAM_BREAKER_RESET_SECONDS
+        )
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {host: breaker.status() for host, breaker in sorted(_BREAKERS.items())}
+
+
+def reset_breakers() -> None:
+    _BREAKERS.clear()
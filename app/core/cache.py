@@ -0,0 +1,75 @@
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+_MISS = object()
+
+# Every LocalCache, for periodic pruning of expired entries
+_INSTANCES: "weakref.WeakSet[LocalCache]" = weakref.WeakSet()
+# Named caches, which can be invalidated on every worker (app/core/invalidation.py)
+_NAMED: Dict[str, "LocalCache"] = {}
+
+
+class LocalCache:
+    """
+    In-process TTL + LRU cache. Each worker has its own copy, so keep TTLs short
+    and invalidate explicitly where the data can change.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        _INSTANCES.add(self)
+        if name:
+            _NAMED[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISS)
+        if entry is _MISS:
+            return default
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def prune(self) -> int:
+        """
+        Drop expired entries (get() only drops the ones it is asked for). Returns how many.
+        """
+        now = time.monotonic()
+        expired = [key for key, (expires, _) in self._data.items() if expires <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+
+def prune_local_caches() -> int:
+    return sum(cache.prune() for cache in list(_INSTANCES))
+
+
+def get_local_cache(name: str) -> Optional[LocalCache]:
+    return _NAMED.get(name)
+
+
+def local_cache_names() -> List[str]:
+    return sorted(_NAMED)
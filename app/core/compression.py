@@ -0,0 +1,31 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+try:  # brotli-asgi negotiates br and falls back to gzip for other clients
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover - optional dependency
+    BrotliMiddleware = None
+
+# Map tiles are already-compressed PNGs; compressing them again only costs CPU
+_SKIP_PREFIXES = ("/api/v1/map/tile/",)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses larger than COMPRESSION_MINIMUM_SIZE (brotli if available, else gzip).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(app, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(_SKIP_PREFIXES):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
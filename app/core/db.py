@@ -0,0 +1,64 @@
+import os
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import settings
+
+# Single pooled engine shared by every service module. Creating an engine per
+# call (as the services used to) throws the pool away after each request and
+# leaves nothing to report pool statistics on.
+_ENGINE: Optional[AsyncEngine] = None
+
+
+def worker_count() -> int:
+    """
+    Worker processes per replica: WEB_CONCURRENCY, or one per CPU.
+    """
+    return settings.WEB_CONCURRENCY or os.cpu_count() or 1
+
+
+def pool_limits() -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) for this process. With DB_MAX_CONNECTIONS set, each worker gets an
+    equal share of that budget instead of the full DB_POOL_SIZE + DB_MAX_OVERFLOW.
+    """
+    if settings.DB_MAX_CONNECTIONS <= 0:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    share = max(1, settings.DB_MAX_CONNECTIONS // worker_count())
+    pool_size = min(settings.DB_POOL_SIZE, share)
+    return pool_size, share - pool_size
+
+
+def get_engine() -> AsyncEngine:
+    global _ENGINE
+    if _ENGINE is None:
+        pool_size, max_overflow = pool_limits()
+        _ENGINE = create_async_engine(
+            settings.DATABASE_URL,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+        )
+    return _ENGINE
+
+
+def asyncpg_dsn() -> str:
+    """
+    DATABASE_URL in the form asyncpg.connect() expects (no SQLAlchemy driver suffix).
+    """
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def peek_engine() -> Optional[AsyncEngine]:
+    """
+    Return the shared engine if it has been created, without creating it.
+    """
+    return _ENGINE
+
+
+async def dispose_engine() -> None:
+    global _ENGINE
+    if _ENGINE is not None:
+        await _ENGINE.dispose()
+        _ENGINE = None
@@ -0,0 +1,92 @@
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.breaker import CircuitOpenError, get_breaker
+from app.core.metrics import UPSTREAM_REQUEST_SECONDS, status_class
+
+# Known upstream endpoints, matched by path prefix. Anything else is reported as
+# "other" so that ids embedded in paths (tiles, user ids) never become labels.
+_ENDPOINTS = (
+    ("/tiles/", "tiles"),
+    ("/staticmap", "staticmap"),
+    ("/geocode", "geocode"),
+    ("/api/route/onm", "onm"),
+    ("/api/route/matrix", "matrix"),
+    ("/auth/verify", "auth_verify"),
+    ("/users", "users"),
+)
+
+
+def classify_endpoint(path: str) -> str:
+    for prefix, name in _ENDPOINTS:
+        if path.startswith(prefix):
+            return name
+    return "other"
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps an httpx transport and records latency/status of every upstream call.
+    Calls go through the host's circuit breaker and fail fast while it is open.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host or "unknown"
+        endpoint = classify_endpoint(request.url.path)
+        breaker = get_breaker(host)
+        if not breaker.allow():
+            UPSTREAM_REQUEST_SECONDS.labels(host=host, endpoint=endpoint, status="circuit_open").observe(0.0)
+            raise CircuitOpenError(f"Circuit open for {host}", request=request)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = status_class(response.status_code)
+            breaker.record(response.status_code < 500)
+            return response
+        except Exception:
+            breaker.record(False)
+            raise
+        except BaseException:
+            breaker.abandon()
+            raise
+        finally:
+            UPSTREAM_REQUEST_SECONDS.labels(host=host, endpoint=endpoint, status=status).observe(
+                time.perf_counter() - start
+            )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Transport every upstream client sends through; None means real network I/O.
+# Benchmarks and tests install an httpx.MockTransport here to stub Gebeta and
+# the user-management service.
+_BASE_TRANSPORT: Optional[httpx.AsyncBaseTransport] = None
+
+
+def use_transport(transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    global _BASE_TRANSPORT
+    _BASE_TRANSPORT = transport
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    # Clients close their transport on exit; the shared stub must outlive them
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+
+def upstream_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Build an httpx client for calling Gebeta / sibling services with metrics attached.
+    """
+    inner = _SharedTransport(_BASE_TRANSPORT) if _BASE_TRANSPORT is not None else None
+    return httpx.AsyncClient(transport=InstrumentedTransport(inner), **kwargs)
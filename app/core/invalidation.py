@@ -0,0 +1,99 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from structlog import get_logger
+
+from app.core import jobs
+from app.core.cache import get_local_cache, local_cache_names
+from app.core.redis import get_redis
+
+logger = get_logger()
+
+# In-process caches exist once per worker. Invalidations are applied locally and published
+# on this Redis channel; every other worker (and replica) applies them on receipt.
+CHANNEL = "local_cache_invalidation"
+
+_listener_task: Optional[asyncio.Task] = None
+
+
+def apply_invalidation(message: Dict[str, Any]) -> int:
+    """
+    Drop `keys` (all entries when None) from the named cache, or from every named cache when
+    `cache` is None. Returns how many caches were touched.
+    """
+    names = [message["cache"]] if message.get("cache") else local_cache_names()
+    touched = 0
+    for name in names:
+        cache = get_local_cache(name)
+        if cache is None:
+            continue
+        keys = message.get("keys")
+        if keys is None:
+            cache.clear()
+        else:
+            for key in keys:
+                cache.delete(key)
+        touched += 1
+    return touched
+
+
+async def invalidate_local(cache: Optional[str] = None, keys: Optional[List[str]] = None) -> int:
+    """
+    Invalidate in this process and publish to the other workers. Returns how many listeners
+    received it (0 when Redis is unavailable; their entries then expire with their TTL).
+    """
+    message = {"origin": jobs.INSTANCE_ID, "cache": cache, "keys": keys}
+    apply_invalidation(message)
+    try:
+        return await get_redis().publish(CHANNEL, json.dumps(message))
+    except Exception as e:
+        logger.warning("Cache invalidation not published", cache=cache, error=str(e))
+        return 0
+
+
+async def _listen_forever() -> None:
+    delay = 1.0
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub()
+            await pubsub.subscribe(CHANNEL)
+            delay = 1.0
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                except ValueError:
+                    logger.warning("Malformed cache invalidation", data=str(message["data"])[:200])
+                    continue
+                if data.get("origin") != jobs.INSTANCE_ID:
+                    apply_invalidation(data)
+            logger.warning("Cache invalidation subscription ended; resubscribing")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cache invalidation listener failed; retrying", error=str(e), retry_in=delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+        finally:
+            if pubsub is not None:
+                await pubsub.close()
+
+
+def start_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.get_running_loop().create_task(_listen_forever())
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
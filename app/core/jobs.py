@@ -0,0 +1,230 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from structlog import get_logger
+
+from app.config import settings
+from app.core.metrics import JOB_RUN_SECONDS, JOB_RUNS
+from app.core.redis import get_redis
+
+logger = get_logger()
+
+def _instance_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# Identifies this process as lock holder. Workers forked from a preloaded master get their own
+INSTANCE_ID = _instance_id()
+
+
+def _reset_instance_id() -> None:
+    global INSTANCE_ID
+    INSTANCE_ID = _instance_id()
+
+
+os.register_at_fork(after_in_child=_reset_instance_id)
+
+
+class Job:
+    """
+    A coroutine function run every `interval` seconds (+/- `jitter` of it), at most `concurrency`
+    runs at a time in this process. Leader jobs run on one replica per interval: a run first takes
+    (or renews) a Redis lock held for the interval. interval=None means admin-triggered only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: Optional[float],
+        jitter: float,
+        concurrency: int = 1,
+        leader: bool = True,
+        timeout: Optional[float] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.leader = leader
+        self.timeout = timeout
+        self.running = 0
+        self.runs = 0
+        self.failures = 0
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_result: Any = None
+        self.last_started: Optional[float] = None
+        self.last_finished: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.next_run: Optional[float] = None
+
+    def delay(self) -> float:
+        return max(0.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval,
+            "leader_only": self.leader,
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_duration_ms": self.last_duration_ms,
+            "next_run": self.next_run,
+        }
+
+
+_JOBS: Dict[str, Job] = {}
+_loops: List[asyncio.Task] = []
+_runs: Set[asyncio.Task] = set()
+
+
+def register_job(
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+    interval: Optional[float],
+    concurrency: int = 1,
+    leader: bool = True,
+    timeout: Optional[float] = None,
+) -> Job:
+    job = Job(name, func, interval, settings.JOBS_JITTER, concurrency, leader, timeout)
+    _JOBS[name] = job
+    return job
+
+
+def get_job(name: str) -> Optional[Job]:
+    return _JOBS.get(name)
+
+
+def list_jobs() -> List[Dict[str, Any]]:
+    return [job.status() for job in _JOBS.values()]
+
+
+def clear_jobs() -> None:
+    _JOBS.clear()
+
+
+def lock_key(name: str) -> str:
+    return f"jobs:lock:{name}"
+
+
+async def acquire_leadership(job: Job) -> bool:
+    """
+    Take the job's lock for one interval, or renew it if this process already holds it.
+    """
+    redis = get_redis()
+    ttl_ms = max(1000, int(job.interval * 1000))
+    if await redis.set(lock_key(job.name), INSTANCE_ID, nx=True, px=ttl_ms):
+        return True
+    if await redis.get(lock_key(job.name)) == INSTANCE_ID:
+        await redis.pexpire(lock_key(job.name), ttl_ms)
+        return True
+    return False
+
+
+async def run_job(job: Job, check_leader: bool = True) -> str:
+    """
+    One run of a job, recorded in its status and metrics. Returns ok, error, timeout, busy or not_leader.
+    """
+    if job.running >= job.concurrency:
+        JOB_RUNS.labels(job=job.name, status="busy").inc()
+        return "busy"
+    job.running += 1
+    try:
+        if check_leader and job.leader and job.interval:
+            try:
+                if not await acquire_leadership(job):
+                    JOB_RUNS.labels(job=job.name, status="not_leader").inc()
+                    return "not_leader"
+            except Exception as e:
+                # Without the lock every replica might run it; skip this round instead
+                logger.warning("Job lock unavailable; skipping run", job=job.name, error=str(e))
+                JOB_RUNS.labels(job=job.name, status="error").inc()
+                return "error"
+
+        job.last_started = time.time()
+        start = time.perf_counter()
+        try:
+            job.last_result = await asyncio.wait_for(job.func(), timeout=job.timeout)
+            job.last_status, job.last_error = "ok", None
+        except asyncio.TimeoutError:
+            job.failures += 1
+            job.last_status, job.last_error = "timeout", f"Exceeded {job.timeout}s"
+            logger.error("Job timed out", job=job.name, timeout=job.timeout)
+        except Exception as e:
+            job.failures += 1
+            job.last_status, job.last_error = "error", str(e)
+            logger.error("Job failed", job=job.name, error=str(e))
+        duration = time.perf_counter() - start
+        job.runs += 1
+        job.last_finished = time.time()
+        job.last_duration_ms = round(duration * 1000, 3)
+        JOB_RUNS.labels(job=job.name, status=job.last_status).inc()
+        JOB_RUN_SECONDS.labels(job=job.name).observe(duration)
+        return job.last_status
+    finally:
+        job.running -= 1
+
+
+def trigger_job(job: Job) -> asyncio.Task:
+    """
+    Run a job now in the background on this replica, without the leader lock.
+    """
+    task = asyncio.get_running_loop().create_task(run_job(job, check_leader=False))
+    _runs.add(task)
+    task.add_done_callback(_runs.discard)
+    return task
+
+
+async def _schedule(job: Job) -> None:
+    while True:
+        delay = job.delay()
+        job.next_run = time.time() + delay
+        await asyncio.sleep(delay)
+        # Runs are separate tasks, so a slow run never delays the schedule (busy runs are skipped)
+        task = asyncio.get_running_loop().create_task(run_job(job))
+        _runs.add(task)
+        task.add_done_callback(_runs.discard)
+
+
+def start_jobs() -> None:
+    if _loops:
+        return
+    loop = asyncio.get_running_loop()
+    for job in _JOBS.values():
+        if job.interval:
+            _loops.append(loop.create_task(_schedule(job)))
+    logger.info("Job scheduler started", jobs=[job.name for job in _JOBS.values()], instance=INSTANCE_ID)
+
+
+async def stop_jobs() -> None:
+    """
+    Stop scheduling, give running jobs JOBS_SHUTDOWN_GRACE_SECONDS to finish, then cancel them.
+    """
+    for task in _loops:
+        task.cancel()
+    await asyncio.gather(*_loops, return_exceptions=True)
+    _loops.clear()
+    running = list(_runs)
+    if running:
+        _, pending = await asyncio.wait(running, timeout=settings.JOBS_SHUTDOWN_GRACE_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            logger.warning("Cancelled running jobs on shutdown", count=len(pending))
+    for job in _JOBS.values():
+        job.next_run = None
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from structlog import get_logger
+
+from app.config import settings
+from app.core.metrics import STARTUP_SECONDS, in_flight_requests
+
+logger = get_logger()
+
+# Startup timings and shutdown state of this process, reported by /health/ready
+_STATE: Dict[str, Any] = {"phase": "starting", "started_at": None, "duration_ms": None, "steps": {}}
+
+
+def begin_startup() -> None:
+    _STATE.update(phase="starting", started_at=time.perf_counter(), duration_ms=None, steps={})
+
+
+async def startup_step(name: str, action: Callable[[], Union[Any, Awaitable[Any]]], timeout: Optional[float] = None) -> bool:
+    """
+    Run one warm-up step, timed and bounded by STARTUP_STEP_TIMEOUT_SECONDS. A failure is logged and
+    recorded but does not stop startup: the dependency may come up later and readiness reports it.
+    """
+    start = time.perf_counter()
+    try:
+        result = action()
+        if asyncio.iscoroutine(result):
+            await asyncio.wait_for(result, timeout=timeout or settings.STARTUP_STEP_TIMEOUT_SECONDS)
+        outcome = "ok"
+    except asyncio.TimeoutError:
+        outcome = "fail: timeout"
+    except Exception as e:
+        outcome = f"fail: {str(e)}"
+    duration = time.perf_counter() - start
+    _STATE["steps"][name] = {"status": outcome, "duration_ms": round(duration * 1000, 3)}
+    STARTUP_SECONDS.labels(step=name).set(duration)
+    if outcome != "ok":
+        logger.warning("Startup step failed", step=name, error=outcome)
+    return outcome == "ok"
+
+
+def finish_startup() -> None:
+    duration = time.perf_counter() - _STATE["started_at"]
+    _STATE.update(phase="ready", duration_ms=round(duration * 1000, 3))
+    STARTUP_SECONDS.labels(step="total").set(duration)
+    logger.info("Startup complete", duration_ms=_STATE["duration_ms"], steps=_STATE["steps"])
+
+
+def draining() -> bool:
+    return _STATE["phase"] == "draining"
+
+
+def startup_report() -> Dict[str, Any]:
+    return {"phase": _STATE["phase"], "duration_ms": _STATE["duration_ms"], "steps": dict(_STATE["steps"])}
+
+
+def begin_draining() -> None:
+    if not draining():
+        logger.info("Draining", in_flight=in_flight_requests())
+    _STATE["phase"] = "draining"
+
+
+async def drain_requests(timeout: float, delay: float = 0.0) -> int:
+    """
+    Mark the process as draining (readiness turns 503), keep serving for `delay` seconds so the load
+    balancer can stop routing here, then wait up to `timeout` seconds for requests in flight to
+    finish. Returns how many were still running.
+    """
+    begin_draining()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    deadline = time.monotonic() + timeout
+    while in_flight_requests() > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    remaining = in_flight_requests()
+    if remaining:
+        logger.warning("Shutting down with requests in flight", count=remaining)
+    return remaining
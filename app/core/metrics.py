@@ -0,0 +1,218 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.db import peek_engine
+
+# Every label used below takes its values from a fixed set (or is folded into
+# "other"), so the number of time series stays bounded no matter what clients
+# send us.
+#
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py) before this module is
+# imported: every worker writes its values to files there and /metrics adds them up, so the
+# gauges declare how the workers' values combine.
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+CACHE_NAMESPACES = ("search", "saved_searches", "map", "property", "property_local", "owner", "geocode", "tile", "onm", "onm_local", "matrix", "matrix_local")
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+# In-process tiers sit in front of a shared one, so their misses alone mean no backend work
+LOCAL_CACHE_NAMESPACES = ("property_local", "onm_local", "matrix_local")
+SEARCH_STAGES = ("cache_lookup", "sql", "enrichment", "serialization", "cache_write")
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests handled by the service",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+SEARCH_STAGE_SECONDS = Histogram(
+    "search_stage_duration_seconds",
+    "Latency of each stage of the search pipeline",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups per key namespace",
+    ["namespace", "result"],
+    registry=REGISTRY,
+)
+
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to upstream services",
+    ["host", "endpoint", "status"],
+    buckets=_LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+JOB_RUNS = Counter(
+    "job_runs_total",
+    "Background job runs by outcome (ok, error, timeout, busy, not_leader)",
+    ["job", "status"],
+    registry=REGISTRY,
+)
+
+JOB_RUN_SECONDS = Histogram(
+    "job_run_duration_seconds",
+    "Duration of background job runs",
+    ["job"],
+    buckets=_LATENCY_BUCKETS + (30.0, 60.0, 300.0),
+    registry=REGISTRY,
+)
+
+STARTUP_SECONDS = Gauge(
+    "startup_duration_seconds",
+    "Time spent in each startup warm-up step of this process (step=total for the whole startup)",
+    ["step"],
+    registry=REGISTRY,
+    multiprocess_mode="liveall",
+)
+
+# Requests currently being handled by this process (drained on shutdown)
+_in_flight = 0
+
+
+def in_flight_requests() -> int:
+    return _in_flight
+
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter",
+    ["route"],
+    registry=REGISTRY,
+)
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def stage_timer(stage: str):
+    """
+    Context manager timing one stage of the search pipeline.
+    """
+    return SEARCH_STAGE_SECONDS.labels(stage=stage).time()
+
+
+_cache_outcome: ContextVar[Optional[Dict[str, bool]]] = ContextVar("cache_outcome", default=None)
+
+
+def track_cache_outcome() -> Dict[str, bool]:
+    """
+    Start recording, for the current request, whether any cache lookup missed (read it after the handler).
+    """
+    outcome = {"miss": False}
+    _cache_outcome.set(outcome)
+    return outcome
+
+
+def record_cache(namespace: str, hit: bool) -> None:
+    if namespace not in CACHE_NAMESPACES:
+        namespace = "other"
+    CACHE_REQUESTS.labels(namespace=namespace, result="hit" if hit else "miss").inc()
+    if not hit and namespace not in LOCAL_CACHE_NAMESPACES:
+        outcome = _cache_outcome.get()
+        if outcome is not None:
+            outcome["miss"] = True
+
+
+class DBPoolCollector:
+    """
+    Reports the shared SQLAlchemy pool state at scrape time.
+    """
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        engine = peek_engine()
+        if engine is None:
+            return []
+        pool = engine.pool
+        families = []
+        for name, doc, getter in (
+            ("db_pool_size", "Configured size of the DB connection pool", "size"),
+            ("db_pool_checked_out", "Connections currently checked out of the pool", "checkedout"),
+            ("db_pool_checked_in", "Idle connections currently in the pool", "checkedin"),
+            ("db_pool_overflow", "Connections opened beyond the pool size", "overflow"),
+        ):
+            fn = getattr(pool, getter, None)
+            if fn is None:
+                continue
+            family = GaugeMetricFamily(name, doc)
+            family.add_metric([], float(fn()))
+            families.append(family)
+        return families
+
+    def describe(self) -> Iterable[GaugeMetricFamily]:
+        return []
+
+
+_DB_POOL_COLLECTOR = DBPoolCollector()
+REGISTRY.register(_DB_POOL_COLLECTOR)
+
+
+def scrape_registry() -> CollectorRegistry:
+    """
+    Registry to expose on /metrics: this process's, or, in multiprocess mode, the values every
+    worker wrote to PROMETHEUS_MULTIPROC_DIR (plus the DB pool of the worker serving the scrape).
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(_DB_POOL_COLLECTOR)
+    return registry
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency by route template (not raw path).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["code"] = message["status"]
+            await send(message)
+
+        global _in_flight
+        _in_flight += 1
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight -= 1
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                method=scope["method"] if scope["method"] in HTTP_METHODS else "OTHER",
+                route=getattr(route, "path", "unmatched"),
+                status=status_class(status_holder["code"]),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,194 @@
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from structlog import get_logger
+
+from app.config import settings
+
+try:  # pyinstrument understands asyncio tasks; cProfile is the stdlib fallback
+    from pyinstrument import Profiler as _AsyncProfiler
+except ImportError:  # pragma: no cover - optional dependency
+    _AsyncProfiler = None
+
+logger = get_logger()
+
+# SQL statements executed by the current request, when a request is being captured
+_sql_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("profiling_sql_log", default=None)
+
+_PROFILES: Deque[Dict[str, Any]] = deque(maxlen=settings.PROFILING_BUFFER_SIZE)
+_ids = itertools.count(1)
+_hooks_installed = False
+# cProfile hooks the whole thread, so only one request is profiled at a time with it
+_cprofile_busy = False
+
+_SKIP_PATHS = ("/metrics", "/api/v1/health", "/api/v1/admin")
+
+
+def profiling_enabled() -> bool:
+    return settings.PROFILING_SAMPLE_RATE > 0 or settings.PROFILING_SLOW_MS > 0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _sql_log.get() is not None:
+        conn.info.setdefault("profiling_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = _sql_log.get()
+    if log is None:
+        return
+    starts = conn.info.get("profiling_query_start")
+    if not starts:
+        return
+    log.append({
+        "statement": " ".join(statement.split())[:2000],
+        "duration_ms": round((time.perf_counter() - starts.pop()) * 1000.0, 3),
+    })
+
+
+def install_sql_hooks() -> None:
+    """
+    Listen on every engine's cursor events. Only called when profiling is enabled.
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _hooks_installed = True
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """
+    Newest-first summaries of captured requests (without the profile text and SQL).
+    """
+    summaries = []
+    for p in reversed(_PROFILES):
+        summary = {k: v for k, v in p.items() if k not in ("profile", "sql")}
+        summary["sql_count"] = len(p["sql"])
+        summaries.append(summary)
+    return summaries
+
+
+def get_profile(profile_id: int) -> Optional[Dict[str, Any]]:
+    for p in _PROFILES:
+        if p["id"] == profile_id:
+            return p
+    return None
+
+
+def clear_profiles() -> int:
+    count = len(_PROFILES)
+    _PROFILES.clear()
+    return count
+
+
+class _Capture:
+    """
+    Wall-clock profile of one request: pyinstrument when installed, else cProfile.
+    """
+
+    def __init__(self):
+        global _cprofile_busy
+        self.kind = None
+        self._profiler = None
+        if _AsyncProfiler is not None:
+            self.kind = "pyinstrument"
+            self._profiler = _AsyncProfiler(async_mode="enabled")
+        elif not _cprofile_busy:
+            _cprofile_busy = True
+            self.kind = "cprofile"
+            self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        elif self.kind == "cprofile":
+            self._profiler.enable()
+
+    def stop(self) -> Optional[str]:
+        global _cprofile_busy
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=False, color=False)
+        if self.kind == "cprofile":
+            self._profiler.disable()
+            _cprofile_busy = False
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(40)
+            return out.getvalue()
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Captures a profile for a random sample of requests (PROFILING_SAMPLE_RATE) and
+    SQL timings for any request slower than PROFILING_SLOW_MS, into a bounded ring buffer.
+
+    Slow requests that were not sampled get their SQL statements and timings but no
+    call profile, since profiling cannot be started retroactively.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        install_sql_hooks()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(_SKIP_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not sampled and settings.PROFILING_SLOW_MS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["code"] = message["status"]
+            await send(message)
+
+        sql: List[Dict[str, Any]] = []
+        token = _sql_log.set(sql)
+        capture = _Capture() if sampled else None
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        if capture:
+            capture.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile_text = capture.stop() if capture else None
+            duration_ms = (time.perf_counter() - start) * 1000.0
+            _sql_log.reset(token)
+            slow = settings.PROFILING_SLOW_MS > 0 and duration_ms >= settings.PROFILING_SLOW_MS
+            if sampled or slow:
+                route = scope.get("route")
+                _PROFILES.append({
+                    "id": next(_ids),
+                    "started_at": started_at.isoformat(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status_holder["code"],
+                    "duration_ms": round(duration_ms, 3),
+                    "reason": "sampled" if sampled else "slow",
+                    "profiler": capture.kind if capture else None,
+                    "sql_total_ms": round(sum(q["duration_ms"] for q in sql), 3),
+                    "sql": sql,
+                    "profile": profile_text,
+                })
+                if slow:
+                    logger.info("Slow request captured", path=scope["path"], duration_ms=round(duration_ms, 1), sql_count=len(sql))
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from app.config import settings
+
+# Process-wide Redis clients (each owns a connection pool). Text values use the
+# decoding client; binary payloads such as map tiles use the raw one.
+_TEXT_CLIENT: Optional[Redis] = None
+_BINARY_CLIENT: Optional[Redis] = None
+
+
+def _client(**kwargs) -> Redis:
+    if settings.REDIS_MAX_CONNECTIONS > 0:
+        # Callers wait for a free connection instead of failing with "Too many connections"
+        pool = BlockingConnectionPool.from_url(settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS, **kwargs)
+        return Redis(connection_pool=pool)
+    return Redis.from_url(settings.REDIS_URL, **kwargs)
+
+
+def get_redis() -> Redis:
+    global _TEXT_CLIENT
+    if _TEXT_CLIENT is None:
+        _TEXT_CLIENT = _client(encoding="utf-8", decode_responses=True)
+    return _TEXT_CLIENT
+
+
+def get_binary_redis() -> Redis:
+    global _BINARY_CLIENT
+    if _BINARY_CLIENT is None:
+        _BINARY_CLIENT = _client(decode_responses=False)
+    return _BINARY_CLIENT
+
+
+def use_clients(text_client: Redis, binary_client: Optional[Redis] = None) -> None:
+    """
+    Swap in other clients (e.g. fakeredis for benchmarks and tests).
+    """
+    global _TEXT_CLIENT, _BINARY_CLIENT
+    _TEXT_CLIENT = text_client
+    _BINARY_CLIENT = binary_client or text_client
+
+
+async def close_redis() -> None:
+    global _TEXT_CLIENT, _BINARY_CLIENT
+    for client in {id(c): c for c in (_TEXT_CLIENT, _BINARY_CLIENT) if c is not None}.values():
+        await client.close()
+    _TEXT_CLIENT = None
+    _BINARY_CLIENT = None
@@ -0,0 +1,22 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any) -> Any:
+    # asyncpg returns NUMERIC columns as Decimal
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+class TrustedJSONResponse(ORJSONResponse):
+    """
+    orjson response for rows we built ourselves (DB or our own cache). Skips the
+    per-item response_model validation; route response_model still drives OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
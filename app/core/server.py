@@ -0,0 +1,47 @@
+import asyncio
+import signal
+from types import FrameType
+from typing import Optional
+
+import uvicorn
+
+from app.config import settings
+from app.core.lifecycle import drain_requests
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    uvicorn server that drains on SIGTERM while it still accepts connections: readiness turns 503,
+    the load balancer gets SHUTDOWN_DELAY_SECONDS to stop routing here, and requests in flight get
+    SHUTDOWN_DRAIN_SECONDS. Only then does uvicorn stop listening and run the lifespan shutdown.
+    SIGINT, or a second signal, exits at once.
+    """
+
+    _drain: Optional[asyncio.Task] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        if sig != signal.SIGTERM or self._drain is not None or self.should_exit:
+            if self._drain is not None:
+                self._drain.cancel()
+            super().handle_exit(sig, frame)
+            return
+        self._drain = asyncio.get_event_loop().create_task(self._drain_then_exit(sig, frame))
+
+    async def _drain_then_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        try:
+            await drain_requests(settings.SHUTDOWN_DRAIN_SECONDS, delay=settings.SHUTDOWN_DELAY_SECONDS)
+        finally:
+            super().handle_exit(sig, frame)
+
+
+def run(app: str = "app.main:app", host: str = "0.0.0.0", port: int = 8000) -> None:
+    """
+    Single-process equivalent of `uvicorn app.main:app` with the SIGTERM drain.
+    """
+    DrainingServer(uvicorn.Config(app, host=host, port=port)).run()
+
+
+if __name__ == "__main__":
+    import os
+
+    run(port=int(os.environ.get("PORT", "8000")))
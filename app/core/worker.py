@@ -0,0 +1,24 @@
+"""
+gunicorn worker class (`worker_class` must be an importable path, so it cannot live in gunicorn.conf.py).
+"""
+import sys
+
+from gunicorn.arbiter import Arbiter
+from uvicorn.workers import UvicornWorker
+
+from app.core.server import DrainingServer
+
+
+class DrainingUvicornWorker(UvicornWorker):
+    """
+    UvicornWorker serving through DrainingServer, so SIGTERM from the master drains this worker
+    (readiness 503, SHUTDOWN_DELAY_SECONDS, then in-flight requests) before it stops listening.
+    """
+
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
@@ -1,14 +1,15 @@
-from fastapi import HTTPException, Security
+from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import httpx
 from app.config import settings
+from app.core.http import upstream_client
 from structlog import get_logger
 
 logger = get_logger()
 security = HTTPBearer()
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
-    async with httpx.AsyncClient() as client:
+    async with upstream_client() as client:
         try:
             logger.info("Verifying token with user management service", url=f"{settings.USER_MANAGEMENT_URL}/auth/verify")
 
@@ -26,3 +27,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
         except httpx.RequestError as e:
             logger.error("User management service is unavailable", error=str(e))
             raise HTTPException(status_code=503, detail="User management service is unavailable")
+
+
+async def require_admin(user: dict = Depends(get_current_user)):
+    if (user.get("role") or "").lower() != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
@@ -0,0 +1,246 @@
+import asyncio
+import time
+from collections import OrderedDict
+from math import ceil
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request
+from structlog import get_logger
+
+from app.config import settings
+from app.core.metrics import RATE_LIMIT_REJECTIONS, track_cache_outcome
+from app.core.redis import get_redis
+from app.dependencies.auth import get_current_user
+
+logger = get_logger()
+
+
+class TokenBucket:
+    """
+    `capacity` tokens refilled at `rate` per second. Tokens may go negative (down to -capacity)
+    when a request turns out dearer than its upfront charge or other workers used the same key.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "unsynced", "synced_total")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+        # Spent here since the last Redis sync, and the shared total seen at that sync
+        self.unsynced = 0.0
+        self.synced_total: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """
+        Spend cost if the bucket holds it and return 0; otherwise spend nothing and return the wait in seconds.
+        """
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            self.unsynced += cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def charge(self, cost: float, now: float) -> None:
+        """
+        Spend cost unconditionally (work already done).
+        """
+        self._refill(now)
+        self.tokens = max(self.tokens - cost, -self.capacity)
+        self.unsynced += cost
+
+    def absorb(self, spent: float, now: float) -> None:
+        """
+        Account for tokens other workers spent on the same key.
+        """
+        self._refill(now)
+        self.tokens = max(self.tokens - spent, -self.capacity)
+
+    def idle(self, now: float) -> bool:
+        return self.unsynced == 0 and self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+# (method, route, identity) -> bucket, least recently used first
+_BUCKETS: "OrderedDict[str, TokenBucket]" = OrderedDict()
+_sync_task: Optional[asyncio.Task] = None
+
+
+def reset_buckets() -> None:
+    _BUCKETS.clear()
+
+
+def _bucket(key: str, capacity: float, rate: float, now: float) -> TokenBucket:
+    bucket = _BUCKETS.get(key)
+    if bucket is None:
+        bucket = _BUCKETS[key] = TokenBucket(capacity, rate, now)
+        while len(_BUCKETS) > settings.RATE_LIMIT_MAX_KEYS:
+            _BUCKETS.popitem(last=False)
+    else:
+        _BUCKETS.move_to_end(key)
+    return bucket
+
+
+def role_multipliers() -> Dict[str, float]:
+    """
+    RATE_LIMIT_ROLE_MULTIPLIERS ("admin:5,landlord:2") as role -> multiplier; other roles get 1.
+    """
+    out: Dict[str, float] = {}
+    for part in settings.RATE_LIMIT_ROLE_MULTIPLIERS.split(","):
+        role, _, value = part.partition(":")
+        if role.strip() and value.strip():
+            out[role.strip().lower()] = float(value)
+    return out
+
+
+def client_ip(request: Request) -> str:
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _rejected(path: str, wait: float) -> HTTPException:
+    RATE_LIMIT_REJECTIONS.labels(route=path).inc()
+    return HTTPException(status_code=429, detail="Too Many Requests", headers={"Retry-After": str(max(1, ceil(wait)))})
+
+
+def _route_path(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", request.url.path)
+
+
+class RateLimit:
+    """
+    Per-client limit of `times` requests per `seconds`, enforced by an in-process token bucket
+    (no Redis round-trip on the request path). A request pays `hit_cost` upfront and the rest of
+    a full token afterwards only if one of its cache lookups missed; hit_cost defaults to
+    RATE_LIMIT_HIT_COST, pass 1.0 for routes that always do the work.
+    """
+
+    def __init__(self, times: int, seconds: int, hit_cost: Optional[float] = None):
+        self.times = times
+        self.seconds = seconds
+        self.hit_cost = hit_cost
+
+    def acquire(self, request: Request, identity: str, multiplier: float = 1.0) -> Tuple[TokenBucket, float, Dict[str, bool]]:
+        path = _route_path(request)
+        capacity = self.times * multiplier * settings.RATE_LIMIT_SCALE
+        hit_cost = min(self.hit_cost if self.hit_cost is not None else settings.RATE_LIMIT_HIT_COST, 1.0)
+        now = time.monotonic()
+        bucket = _bucket(f"{request.method}:{path}:{identity}", capacity, capacity / self.seconds, now)
+        wait = bucket.take(hit_cost, now)
+        if wait:
+            raise _rejected(path, wait)
+        return bucket, hit_cost, track_cache_outcome()
+
+    @staticmethod
+    def settle(bucket: TokenBucket, hit_cost: float, outcome: Dict[str, bool]) -> None:
+        if hit_cost < 1.0 and outcome["miss"]:
+            bucket.charge(1.0 - hit_cost, time.monotonic())
+
+    async def __call__(self, request: Request):
+        bucket, hit_cost, outcome = self.acquire(request, f"ip:{client_ip(request)}")
+        try:
+            yield
+        finally:
+            self.settle(bucket, hit_cost, outcome)
+
+
+async def limit_before_auth(request: Request) -> None:
+    """
+    Per client IP bucket shared by every UserRateLimit route and charged before the token is
+    verified, so a flood of missing or invalid tokens is throttled without a verify call each.
+    """
+    capacity = settings.RATE_LIMIT_PRE_AUTH_PER_MINUTE * settings.RATE_LIMIT_SCALE
+    now = time.monotonic()
+    wait = _bucket(f"auth:ip:{client_ip(request)}", capacity, capacity / 60.0, now).take(1.0, now)
+    if wait:
+        raise _rejected(_route_path(request), wait)
+
+
+class UserRateLimit(RateLimit):
+    """
+    RateLimit keyed on the verified user instead of the client address, scaled by role. The client
+    address pays limit_before_auth first; sub-dependencies resolve in order, so that happens
+    before get_current_user calls user management.
+    """
+
+    async def __call__(self, request: Request, _: None = Depends(limit_before_auth), user: dict = Depends(get_current_user)):
+        user_id = user.get("user_id") or user.get("sub") or user.get("id")
+        identity = f"user:{user_id}" if user_id else f"ip:{client_ip(request)}"
+        multiplier = role_multipliers().get((user.get("role") or "").lower(), 1.0)
+        bucket, hit_cost, outcome = self.acquire(request, identity, multiplier)
+        try:
+            yield
+        finally:
+            self.settle(bucket, hit_cost, outcome)
+
+
+async def sync_buckets() -> int:
+    """
+    Push each bucket's spend since the last sync into a shared Redis counter (one pipeline for all)
+    and take off whatever other workers spent on the same keys meanwhile. Returns buckets synced.
+    """
+    now = time.monotonic()
+    for key in [key for key, bucket in _BUCKETS.items() if bucket.idle(now)]:
+        del _BUCKETS[key]
+    items: List[Tuple[str, TokenBucket, float]] = []
+    for key, bucket in _BUCKETS.items():
+        items.append((key, bucket, bucket.unsynced))
+        bucket.unsynced = 0.0
+    if not items:
+        return 0
+
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for key, bucket, spent in items:
+                pipe.incrbyfloat(f"ratelimit:{key}", spent)
+                pipe.expire(f"ratelimit:{key}", max(1, ceil(2 * bucket.capacity / bucket.rate)))
+            results = await pipe.execute()
+    except Exception:
+        for _, bucket, spent in items:
+            bucket.unsynced += spent
+        raise
+
+    now = time.monotonic()
+    for (key, bucket, spent), total in zip(items, results[::2]):
+        total = float(total)
+        previous = bucket.synced_total
+        # First sync of a key, or the counter expired in between: nothing to attribute to others
+        others = total - spent - previous if previous is not None and total - spent >= previous else 0.0
+        bucket.synced_total = total
+        if others > 0:
+            bucket.absorb(others, now)
+    return len(items)
+
+
+async def _sync_forever() -> None:
+    while True:
+        await asyncio.sleep(settings.RATE_LIMIT_SYNC_SECONDS)
+        try:
+            await sync_buckets()
+        except Exception as e:
+            logger.warning("Rate limit sync failed", error=str(e))
+
+
+def start_rate_limit_sync() -> None:
+    global _sync_task
+    if _sync_task is None or _sync_task.done():
+        _sync_task = asyncio.get_running_loop().create_task(_sync_forever())
+
+
+async def stop_rate_limit_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
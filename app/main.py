@@ -1,15 +1,99 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import search
 from app.routers import onm
 from app.routers import health
 from app.routers import map_preview
+from app.routers import metrics
+from app.routers import admin
+from app.core.compression import CompressionMiddleware
+from app.core.db import dispose_engine, get_engine
+from app.core.lifecycle import begin_startup, drain_requests, finish_startup, startup_step
+from app.core.invalidation import start_invalidation_listener, stop_invalidation_listener
+from app.core.jobs import start_jobs, stop_jobs
 from app.core.logging import setup_logging
-from fastapi_limiter import FastAPILimiter
-from redis.asyncio import Redis
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware, profiling_enabled
+from app.core.redis import close_redis, get_redis
+from app.dependencies.ratelimit import start_rate_limit_sync, stop_rate_limit_sync
+from app.services.alerts import start_alerts
+from app.services.changes import start_change_feed, stop_change_feed, subscribe, subscribe_resync
+from app.services.maintenance import register_jobs, warm_caches
+from app.services.onm import destination_index, load_routes_dataset
+from app.services.popular import flush_queries
+from app.services.properties import invalidate_property, resync_property_cache
+from app.services.route_matrix import get_route_matrix
 from app.config import settings
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+logger = get_logger()
+
+async def _open_database() -> None:
+    # Opens the shared pool's first connection so the first request does not pay for it
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def _open_redis() -> None:
+    await get_redis().ping()
+
+def _load_routes() -> None:
+    load_routes_dataset()
+    destination_index()
+    get_route_matrix()
+
+def preload() -> None:
+    """
+    Load read-only state (routes dataset, its index and the route matrix; the amenity vocabulary is
+    built at import). gunicorn.conf.py calls this in the master so forked workers share the pages.
+    """
+    _load_routes()
 
-app = FastAPI(title="Search & Filters Microservice")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up before serving (pools, routes dataset, hot caches), then start the background tasks.
+    On shutdown, drain in-flight requests (already done on SIGTERM under app.core.server), stop the
+    tasks and close the pools.
+    """
+    setup_logging()
+    begin_startup()
+    await asyncio.gather(
+        startup_step("database", _open_database),
+        startup_step("redis", _open_redis),
+    )
+    # Loaded in a thread so STARTUP_STEP_TIMEOUT_SECONDS bounds it like the other steps
+    await startup_step("routes_dataset", lambda: asyncio.to_thread(_load_routes))
+    register_jobs()
+    if settings.STARTUP_WARM_CACHES:
+        await startup_step("caches", warm_caches, timeout=settings.STARTUP_WARM_TIMEOUT_SECONDS)
+    start_rate_limit_sync()
+    if settings.ALERTS_ENABLED:
+        start_alerts()
+    subscribe(invalidate_property)
+    subscribe_resync(resync_property_cache)
+    start_change_feed()
+    start_invalidation_listener()
+    if settings.JOBS_ENABLED:
+        start_jobs()
+    finish_startup()
+
+    yield
+
+    await drain_requests(settings.SHUTDOWN_DRAIN_SECONDS)
+    await stop_jobs()
+    await flush_queries()
+    await stop_change_feed()
+    await stop_invalidation_listener()
+    await stop_rate_limit_sync()
+    await dispose_engine()
+    await close_redis()
+    logger.info("Shutdown complete")
+
+app = FastAPI(title="Search & Filters Microservice", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["https://*.onrender.com", "https://*.vercel.app"],
@@ -17,13 +101,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Only installed when sampling or a slow threshold is configured, so it costs nothing otherwise
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
 app.include_router(search.router)
 app.include_router(onm.router)
 app.include_router(health.router)
 app.include_router(map_preview.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
-@app.on_event("startup")
-async def startup_event():
-    setup_logging()
-    redis = await Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-    await FastAPILimiter.init(redis)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, func, Enum, Text, Numeric
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, func, Enum, Text, Numeric
 from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.types import NullType
 # Import Base from the common models file
 from app.models import Base
 
@@ -21,6 +22,30 @@ class Property(Base):
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     fts = Column(TSVECTOR) # Full-text search vector, managed by triggers in SQL
+    geohash = Column(String(12, collation="C")) # Geohash of lat/lon, managed by the update_geohash trigger
+    amenity_mask = Column(BigInteger, nullable=False, server_default="0") # Bits of app/utils/amenities.py, managed by the update_amenity_mask trigger
 
     # Note: fts column is managed by triggers in the SQL schema, so we don't need to define its update logic here.
     # The 'onupdate' for updated_at is also handled by a trigger.
+
+
+class ApprovedPropertySearch(Base):
+    """
+    Read-only search copy of approved properties, maintained by the sync_approved_property_search trigger.
+    """
+    __tablename__ = "approved_property_search"
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    location = Column(String(255), nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
+    house_type = Column(String(50))
+    amenities = Column(JSONB, nullable=False)
+    amenity_mask = Column(BigInteger, nullable=False, server_default="0")
+    photos = Column(JSONB, nullable=False)
+    lat = Column(Float)
+    lon = Column(Float)
+    geohash = Column(String(12, collation="C"))
+    earth = Column(NullType) # earthdistance point (ll_to_earth(lat, lon)), only used in SQL
+    updated_at = Column(DateTime(timezone=True), nullable=False) # properties.updated_at at the last sync
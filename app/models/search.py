@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ARRAY
+from sqlalchemy import Column, Integer, String, Float, DateTime, ARRAY, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from app.models import Base # Import Base from the common models file
@@ -16,4 +16,14 @@ class SavedSearch(Base):
     max_distance_km = Column(Float, nullable=True)
     user_id = Column(UUID(as_uuid=True), nullable=True)  # No FK constraint - users table is in another service
     photos = Column(JSONB, nullable=False)  # Store photo URLs as JSONB array
-    property_id = Column(UUID(as_uuid=True), nullable=True)  # Reference to the property this search is based on
\ No newline at end of file
+    property_id = Column(UUID(as_uuid=True), nullable=True)  # Reference to the property this search is based on
+
+class SavedSearchMatch(Base):
+    __tablename__ = "saved_search_matches"
+    __table_args__ = (UniqueConstraint("saved_search_id", "property_id", name="uq_saved_search_matches_search_property"),)
+    id = Column(Integer, primary_key=True)
+    saved_search_id = Column(Integer, ForeignKey('SavedSearches.id', ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    property_id = Column(UUID(as_uuid=True), nullable=False)
+    matched_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    notified_at = Column(DateTime(timezone=True), nullable=True)  # NULL until the notification service accepted it
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from structlog import get_logger
+
+from app.core.cache import local_cache_names
+from app.core.invalidation import invalidate_local
+from app.core.jobs import get_job, list_jobs, trigger_job
+from app.core.profiling import clear_profiles, get_profile, list_profiles, profiling_enabled
+from app.dependencies.auth import require_admin
+from app.services.popular import popular_queries
+
+logger = get_logger()
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def profiles():
+    """
+    List captured request profiles, newest first.
+    """
+    return {"enabled": profiling_enabled(), "profiles": list_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+async def profile_detail(profile_id: int):
+    """
+    Full capture for one request: SQL statements with timings and the call profile.
+    """
+    item = get_profile(profile_id)
+    if not item:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return item
+
+
+@router.delete("/profiles")
+async def delete_profiles():
+    cleared = clear_profiles()
+    logger.info("Profiles cleared", count=cleared)
+    return {"status": "ok", "cleared": cleared}
+
+
+@router.get("/jobs")
+async def jobs():
+    """
+    Background jobs with schedule, last run outcome and timings (this replica's view).
+    """
+    return {"jobs": list_jobs()}
+
+
+@router.post("/jobs/{name}/run", status_code=status.HTTP_202_ACCEPTED)
+async def run_job_now(name: str):
+    """
+    Start a job now on this replica (no leader lock; still bounded by the job's concurrency).
+    """
+    job = get_job(name)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    trigger_job(job)
+    logger.info("Job triggered", job=name)
+    return {"status": "started", "job": name}
+
+
+@router.get("/popular-searches")
+async def popular_searches(limit: int = Query(20, ge=1, le=500)):
+    """
+    Most requested /search criteria by decayed count, with the remaining TTL of each cached result.
+    """
+    try:
+        return {"searches": await popular_queries(limit)}
+    except Exception as e:
+        logger.error("Popular searches lookup failed", error=str(e))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Popular searches unavailable")
+
+
+@router.delete("/local-caches")
+async def clear_local_caches(cache: Optional[str] = Query(None, description="One named cache; all of them when omitted")):
+    """
+    Empty in-process caches on every worker and replica (published over Redis).
+    """
+    if cache is not None and cache not in local_cache_names():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cache not found")
+    receivers = await invalidate_local(cache)
+    logger.info("Local caches cleared", cache=cache, receivers=receivers)
+    return {"status": "ok", "caches": [cache] if cache else local_cache_names(), "receivers": receivers}
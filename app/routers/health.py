@@ -1,43 +1,113 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse
 from structlog import get_logger
-from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.sql import text
 
 from app.config import settings
+from app.core.breaker import breaker_states
+from app.core.db import get_engine, pool_limits
+from app.core.lifecycle import draining, startup_report
+from app.core.redis import get_redis
+from app.services.maintenance import clear_search_cache
 
 logger = get_logger()
 router = APIRouter(prefix="/api/v1", tags=["health"]) 
 
+# Last readiness report (monotonic time it was taken) and the check in flight, which
+# concurrent probes share so a probe storm costs one round of checks
+_READY: Dict[str, Any] = {"at": 0.0, "report": None, "task": None}
+
 @router.get("/health")
 async def health():
     return {"status": "ok"}
 
-@router.get("/health/ready")
-async def readiness():
-    details = {"status": "ok", "checks": {}}
-
-    # Redis check
+async def _check(name: str, probe: Awaitable[Any]) -> str:
     try:
-        redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-        pong = await redis.ping()
-        details["checks"]["redis"] = "ok" if pong else "fail"
+        await asyncio.wait_for(probe, timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        return "ok"
+    except asyncio.TimeoutError:
+        logger.warning("health check timed out", check=name)
+        return "fail: timeout"
     except Exception as e:
-        logger.warning("health redis fail", error=str(e))
-        details["checks"]["redis"] = f"fail: {str(e)}"
+        logger.warning(f"health {name} fail", error=str(e))
+        return f"fail: {str(e)}"
+
+async def _ping_redis() -> None:
+    if not await get_redis().ping():
+        raise RuntimeError("no PONG")
+
+async def _ping_database() -> None:
+    # Shared pool: a probe borrows a connection instead of opening (and leaking) its own engine
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+def pool_status() -> Dict[str, Any]:
+    pool = get_engine().pool
+    pool_size, max_overflow = pool_limits()
+    capacity = pool_size + max(max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+async def check_readiness() -> Dict[str, Any]:
+    """
+    Redis and DB checks run concurrently with a short timeout; either failing, or the DB pool
+    being saturated, makes the replica not ready. Open upstream circuits are reported only: the
+    upstreams are shared by every replica, so failing readiness for them would take all of them out.
+    """
+    # Taken before the DB check borrows a connection
+    pool = pool_status()
+    redis_check, database_check = await asyncio.gather(
+        _check("redis", _ping_redis()),
+        _check("database", _ping_database()),
+    )
+    details = {
+        "status": "ok",
+        "checks": {"redis": redis_check, "database": database_check},
+        "pool": pool,
+        "upstreams": breaker_states(),
+    }
+    if redis_check != "ok" or database_check != "ok" or pool["saturation"] >= settings.HEALTH_POOL_SATURATION:
         details["status"] = "degraded"
+    return details
 
-    # Database check
+async def _refresh_readiness() -> Dict[str, Any]:
     try:
-        engine = create_async_engine(settings.DATABASE_URL)
-        async with engine.connect() as conn:
-            await conn.execute(text("SELECT 1"))
-        details["checks"]["database"] = "ok"
-    except Exception as e:
-        logger.warning("health db fail", error=str(e))
-        details["checks"]["database"] = f"fail: {str(e)}"
-        details["status"] = "degraded"
+        report = await check_readiness()
+        _READY["at"], _READY["report"] = time.monotonic(), report
+        return report
+    finally:
+        _READY["task"] = None
 
+async def cached_readiness() -> Dict[str, Any]:
+    report: Optional[Dict[str, Any]] = _READY["report"]
+    if report is not None and time.monotonic() - _READY["at"] < settings.HEALTH_CACHE_SECONDS:
+        return report
+    task = _READY["task"]
+    if task is None:
+        task = _READY["task"] = asyncio.ensure_future(_refresh_readiness())
+    # A probe that disconnects must not cancel the check the others are waiting on
+    return await asyncio.shield(task)
+
+def reset_readiness() -> None:
+    _READY.update(at=0.0, report=None, task=None)
+
+@router.get("/health/ready")
+async def readiness():
+    if draining():
+        # Shutting down: stop routing traffic here without touching dependencies
+        return JSONResponse({"status": "draining", "startup": startup_report()}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    details = {**await cached_readiness(), "startup": startup_report()}
+    if details["status"] != "ok":
+        return JSONResponse(details, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
     return details
 
 @router.post("/cache/clear")
@@ -47,21 +117,8 @@ async def clear_cache():
     Use this after deploying changes to search queries.
     """
     try:
-        redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-        
-        # Clear all search-related cache keys
-        keys = await redis.keys("search:*")
-        all_approved_key = await redis.keys("all_approved_properties")
-        
-        all_keys = keys + all_approved_key
-        
-        if all_keys:
-            deleted = await redis.delete(*all_keys)
-            logger.info("Cache cleared", deleted_keys=deleted)
-            return {"status": "ok", "cleared_keys": deleted}
-        else:
-            logger.info("No cache keys to clear")
-            return {"status": "ok", "cleared_keys": 0}
+        deleted = await clear_search_cache()
+        return {"status": "ok", "cleared_keys": deleted}
     except Exception as e:
         logger.error("Failed to clear cache", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
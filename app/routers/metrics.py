@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.metrics import scrape_registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint (all workers of this replica in multiprocess mode).
+    """
+    return Response(content=generate_latest(scrape_registry()), media_type=CONTENT_TYPE_LATEST)
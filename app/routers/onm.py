@@ -1,16 +1,19 @@
 from typing import List, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi_limiter.depends import RateLimiter
 from structlog import get_logger
 
+from app.dependencies.ratelimit import RateLimit
 from app.schemas.onm import ONMRouteRequest, NearestRequest, NearestResponse, DestinationOut
 from app.services.onm import (
     resolve_destinations_by_name,
     onm_route,
-    matrix,
+    origin_matrix,
+    distance_km,
+    distance_rows,
     get_destinations_from_dataset,
 )
+from app.services.route_matrix import rank_from_store
 
 logger = get_logger()
 router = APIRouter(prefix="/api/v1/onm", tags=["onm"])
@@ -26,7 +29,7 @@ def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return R * c
 
 
-@router.post("/route", dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/route", dependencies=[Depends(RateLimit(times=10, seconds=60))])
 async def compute_route(req: ONMRouteRequest):
     # Resolve destinations: use provided lat/lon or lookup by name in dataset
     waypoints: List[Tuple[float, float]] = []
@@ -50,36 +53,34 @@ async def compute_route(req: ONMRouteRequest):
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to compute route via Gebeta ONM")
 
 
-@router.post("/nearest", response_model=NearestResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/nearest", response_model=NearestResponse, dependencies=[Depends(RateLimit(times=10, seconds=60))])
 async def nearest(req: NearestRequest):
     dataset = get_destinations_from_dataset()
 
-    # Try Matrix API first (best for travel distance/time). On error, fallback to haversine.
+    # Precomputed matrix first, then the Matrix API (best for travel distance/time); on error, haversine.
     coords: List[Tuple[float, float]] = [(req.origin_lat, req.origin_lon)] + [
         (float(x["dest_lat"]), float(x["dest_lon"])) for x in dataset
     ]
 
     ranking: List[Tuple[int, float]] = []  # (index in dataset, distance_km)
-    used_matrix = False
-    try:
-        resp = await matrix(coords[: min(len(coords), 10)])  # respect <=10 limit
-        # Matrix schema can vary; attempt to read distances matrix (first row is origin to others)
-        # Expect something like {"distances": [[0, d1, d2, ...]]} in kilometers or meters.
-        distances = None
-        if isinstance(resp, dict):
-            distances = resp.get("distances") or resp.get("distance") or resp.get("matrix")
-        if distances and isinstance(distances, list) and distances:
-            row = distances[0]
-            # pair dataset index with distance value starting from 1 (since 0 is origin)
-            for i, d in enumerate(row[1:], start=0):
-                try:
-                    dk = float(d) / 1000.0 if float(d) > 1000 else float(d)  # guess meters->km
-                except Exception:
-                    dk = float(d)
-                ranking.append((i, dk))
-            used_matrix = True
-    except Exception:
-        used_matrix = False
+    stored = rank_from_store(req.origin_lat, req.origin_lon, dataset)
+    used_matrix = stored is not None
+    if used_matrix:
+        ranking = stored
+    else:
+        try:
+            resp = await origin_matrix(coords[: min(len(coords), 10)])  # respect <=10 limit
+            # First row is origin to others
+            distances = distance_rows(resp)
+            if distances:
+                row = distances[0]
+                # pair dataset index with distance value starting from 1 (since 0 is origin)
+                for i, d in enumerate(row[1:], start=0):
+                    ranking.append((i, distance_km(d)))
+                used_matrix = True
+        except Exception:
+            ranking = []
+            used_matrix = False
 
     if not used_matrix:
         # Haversine fallback for all
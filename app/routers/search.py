@@ -1,20 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from app.schemas.search import SearchQuery, SearchResponse, SavedSearchRequest, SavedSearchResponse
-from app.services.search import search_properties, save_search, get_property_by_id, get_all_approved_properties, get_user_saved_searches, execute_saved_search
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from app.schemas.search import SearchQuery, SearchResponse, SavedSearchRequest, SavedSearchResponse, SavedSearchResultsResponse, SearchFacetsResponse, MapClustersResponse, PropertyBatchRequest, PropertyBatchResponse
+from app.services.search import parse_fields, search_properties, save_search, get_all_approved_properties, get_user_saved_searches, execute_saved_search, execute_user_saved_searches
+from app.services.clusters import map_clusters, parse_bbox
+from app.services.commute import rank_by_commute, resolve_destinations, with_coordinates
+from app.services.facets import search_facets
+from app.services.popular import track_query
+from app.services.properties import get_properties_by_ids, get_property_by_id
 from app.services.gebeta import geocode, get_map_tile
 from app.dependencies.auth import get_current_user
+from app.dependencies.ratelimit import RateLimit, UserRateLimit
 from app.config import settings
+from app.core.responses import TrustedJSONResponse
+from app.utils.amenities import parse_amenities
 from structlog import get_logger
-from fastapi_limiter.depends import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy import insert
-from typing import List
+from typing import List, Optional
 
 logger = get_logger()
 router = APIRouter(prefix="/api/v1", tags=["search"])
 
-@router.get("/search", response_model=List[SearchResponse], dependencies=[Depends(RateLimiter(times=5, seconds=60))])
-async def search(query: SearchQuery = Depends(), user: dict = Depends(get_current_user)):
+# Projected (fields=) responses bypass response_model, which documents the full row
+PROJECTION_RESPONSES = {200: {"description": "Full rows, or only the requested fields when `fields` is set"}}
+
+def _listings_response(results: List[dict], projected: bool):
+    """
+    Rows from search services are already in SearchResponse shape; send them with orjson
+    unless FAST_SERIALIZATION is off, in which case full rows go through response_model.
+    """
+    if settings.FAST_SERIALIZATION:
+        return TrustedJSONResponse(results)
+    return JSONResponse(results) if projected else results
+
+def _amenities(amenities: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Canonical amenity names; 400 listing any not in the vocabulary instead of matching nothing.
+    """
+    known, unknown = parse_amenities(amenities)
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown amenities: {', '.join(unknown)}")
+    return known or None
+
+def _commute_destinations(commute_to: Optional[List[str]]):
+    if not commute_to:
+        return None
+    if len(commute_to) > settings.SEARCH_COMMUTE_MAX_DESTINATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.SEARCH_COMMUTE_MAX_DESTINATIONS} commute destinations are allowed",
+        )
+    try:
+        return resolve_destinations(commute_to)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def _projection(fields: Optional[str]):
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/search", response_model=List[SearchResponse], responses=PROJECTION_RESPONSES, dependencies=[Depends(UserRateLimit(times=5, seconds=60))])
+async def search(
+    query: SearchQuery = Depends(),
+    commute_to: Optional[List[str]] = Query(None, description="Rank by travel time to these destinations: routes-dataset names or 'lat,lon' (repeatable)"),
+    user: dict = Depends(get_current_user),
+):
     if user.get("role").lower() != "tenant":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only Tenants can search")
 
@@ -27,26 +79,84 @@ async def search(query: SearchQuery = Depends(), user: dict = Depends(get_curren
     if query.min_price is not None and query.max_price is not None and query.min_price > query.max_price:
         logger.warning("Invalid price range", min_price=query.min_price, max_price=query.max_price)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_price cannot be greater than max_price")
+    fields = _projection(query.fields)
+    amenities = _amenities(query.amenities)
+    destinations = _commute_destinations(commute_to)
+
+    criteria = dict(
+        location=query.location,
+        min_price=query.min_price,
+        max_price=query.max_price,
+        house_type=query.house_type,
+        amenities=amenities,
+        bedrooms=query.bedrooms,
+        use_distance=query.use_distance,
+        max_distance_km=query.max_distance_km,
+        sort_by=query.sort_by,
+        fields=with_coordinates(fields) if destinations else fields
+    )
+
+    try:
+        results = await search_properties(**criteria)
+        track_query(criteria)
+        if destinations:
+            # Rows gain `commute`, which SearchResponse does not model
+            results = await rank_by_commute(results, destinations, fields)
+        logger.info("Search completed", user_id=user.get("id"), query=query.dict(), result_count=len(results))
+        return _listings_response(results, projected=fields is not None or destinations is not None)
+    except Exception as e:
+        logger.error("Search failed", query=query.dict(), error=str(e), exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Search failed")
+
+@router.get("/search/facets", response_model=SearchFacetsResponse, dependencies=[Depends(UserRateLimit(times=30, seconds=60))])
+async def facets(query: SearchQuery = Depends(), user: dict = Depends(get_current_user)):
+    """
+    Result counts per house_type, amenity, price bucket and distance ring for a search,
+    so filter UIs do not need one /search call per option.
+    """
+    if user.get("role").lower() != "tenant":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only Tenants can search")
+
+    if query.min_price is not None and query.max_price is not None and query.min_price > query.max_price:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_price cannot be greater than max_price")
+    amenities = _amenities(query.amenities)
 
     try:
-        results = await search_properties(
+        return await search_facets(
             location=query.location,
             min_price=query.min_price,
             max_price=query.max_price,
             house_type=query.house_type,
-            amenities=query.amenities,
+            amenities=amenities,
             bedrooms=query.bedrooms,
             use_distance=query.use_distance,
             max_distance_km=query.max_distance_km,
-            sort_by=query.sort_by
         )
-        logger.info("Search completed", user_id=user.get("id"), query=query.dict(), result_count=len(results))
-        return results
     except Exception as e:
-        logger.error("Search failed", query=query.dict(), error=str(e), exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Search failed")
+        logger.error("Facets failed", query=query.dict(), error=str(e), exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Facets failed")
+
+@router.get("/search/map", response_model=MapClustersResponse, dependencies=[Depends(UserRateLimit(times=60, seconds=60))])
+async def search_map(
+    bbox: str = Query(..., description="Viewport as west,south,east,north in degrees"),
+    zoom: int = Query(..., ge=0, le=20),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Server-side clustered markers for the approved listings in a map viewport.
+    """
+    try:
+        viewport = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-@router.get("/property/{id}", response_model=SearchResponse, dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+    try:
+        return await map_clusters(viewport, zoom)
+    except Exception as e:
+        logger.error("Map clustering failed", bbox=bbox, zoom=zoom, error=str(e), exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Map clustering failed")
+
+@router.get("/property/{id}", response_model=SearchResponse, dependencies=[Depends(UserRateLimit(times=10, seconds=60))])
 async def get_property(id: str, user: dict = Depends(get_current_user)):
     try:
         item = await get_property_by_id(id)
@@ -59,7 +169,22 @@ async def get_property(id: str, user: dict = Depends(get_current_user)):
         logger.error("Get property failed", id=id, error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch property")
 
-@router.post("/saved-searches", response_model=dict, dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+@router.post("/properties/batch", response_model=PropertyBatchResponse, dependencies=[Depends(UserRateLimit(times=10, seconds=60))])
+async def get_properties_batch(request: PropertyBatchRequest, user: dict = Depends(get_current_user)):
+    """
+    Fetch several properties in one call (favorites, saved-search previews).
+    Results keep the requested order; unknown ids are listed in not_found.
+    """
+    try:
+        properties, not_found = await get_properties_by_ids(request.ids)
+        logger.info("Batch property lookup", user_id=user.get("id"), requested=len(request.ids), found=len(properties))
+        content = {"properties": properties, "not_found": not_found}
+        return TrustedJSONResponse(content) if settings.FAST_SERIALIZATION else content
+    except Exception as e:
+        logger.error("Batch property lookup failed", error=str(e), exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch properties")
+
+@router.post("/saved-searches", response_model=dict, dependencies=[Depends(UserRateLimit(times=5, seconds=60, hit_cost=1.0))])
 async def save_search_endpoint(request: SavedSearchRequest, user: dict = Depends(get_current_user)):
     if user.get("role").lower() != "tenant":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only Tenants can save searches")
@@ -69,6 +194,8 @@ async def save_search_endpoint(request: SavedSearchRequest, user: dict = Depends
     if not user_id:
         logger.error("User ID not found in token", user_data=user)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user token")
+    # Stored canonical, so alerts and re-runs match listings whatever spelling they use
+    request = request.model_copy(update={"amenities": _amenities(request.amenities)})
     
     try:
         search_id = await save_search(user_id, request)
@@ -87,7 +214,7 @@ async def get_tile_endpoint(z: int, x: int, y: int):
         logger.error("Map tile fetch failed", z=z, x=x, y=y, error=str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch map tile")
 
-@router.get("/geocode/{query}", response_model=dict, dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+@router.get("/geocode/{query}", response_model=dict, dependencies=[Depends(RateLimit(times=5, seconds=60))])
 async def geocode_location_endpoint(query: str):
     try:
         result = await geocode(query)
@@ -100,21 +227,25 @@ async def geocode_location_endpoint(query: str):
         logger.error("Geocode failed unexpectedly", query=query, error=str(e), exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Geocoding failed unexpectedly")
 
-@router.get("/properties/approved", response_model=List[SearchResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
-async def list_all_approved_properties(user: dict = Depends(get_current_user)):
+@router.get("/properties/approved", response_model=List[SearchResponse], responses=PROJECTION_RESPONSES, dependencies=[Depends(UserRateLimit(times=10, seconds=60))])
+async def list_all_approved_properties(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, or 'card'"),
+    user: dict = Depends(get_current_user),
+):
     """
     Get all approved properties from the database without any filters.
     Returns all properties with status = 'APPROVED'.
     """
+    projection = _projection(fields)
     try:
-        results = await get_all_approved_properties()
+        results = await get_all_approved_properties(projection)
         logger.info("Retrieved all approved properties", user_id=user.get("id"), result_count=len(results))
-        return results
+        return _listings_response(results, projected=projection is not None)
     except Exception as e:
         logger.error("Failed to retrieve all approved properties", error=str(e), exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve approved properties")
 
-@router.get("/saved-searches", response_model=List[SavedSearchResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/saved-searches", response_model=List[SavedSearchResponse], dependencies=[Depends(UserRateLimit(times=10, seconds=60))])
 async def get_saved_searches(user: dict = Depends(get_current_user)):
     """
     Get all saved searches for the authenticated user.
@@ -137,7 +268,33 @@ async def get_saved_searches(user: dict = Depends(get_current_user)):
         logger.error("Failed to retrieve saved searches", error=str(e), exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve saved searches")
 
-@router.get("/saved-searches/{search_id}/results", response_model=List[SearchResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.get("/saved-searches/results", response_model=List[SavedSearchResultsResponse], dependencies=[Depends(UserRateLimit(times=10, seconds=60))])
+async def get_all_saved_search_results(counts_only: bool = False, user: dict = Depends(get_current_user)):
+    """
+    Execute all saved searches of the authenticated user in one call.
+    Searches with identical criteria are executed once; use counts_only=true for dashboards.
+    """
+    if user.get("role").lower() != "tenant":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only Tenants can execute saved searches")
+
+    user_id = user.get("user_id") or user.get("sub") or user.get("id")
+    if not user_id:
+        logger.error("User ID not found in token", user_data=user)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user token")
+
+    try:
+        executed = await execute_user_saved_searches(user_id)
+        content = [
+            {"search_id": saved["id"], "result_count": len(results), "results": None if counts_only else results}
+            for saved, results in executed
+        ]
+        # Result rows come from search_properties, already in SearchResponse shape
+        return TrustedJSONResponse(content) if settings.FAST_SERIALIZATION else content
+    except Exception as e:
+        logger.error("Failed to execute saved searches", user_id=user_id, error=str(e), exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to execute saved searches")
+
+@router.get("/saved-searches/{search_id}/results", response_model=List[SearchResponse], dependencies=[Depends(UserRateLimit(times=10, seconds=60))])
 async def get_saved_search_results(search_id: int, user: dict = Depends(get_current_user)):
     """
     Execute a saved search by ID and return matching properties.
@@ -158,7 +315,7 @@ async def get_saved_search_results(search_id: int, user: dict = Depends(get_curr
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Saved search not found or you don't have permission to access it")
         
         logger.info("Executed saved search", user_id=user_id, search_id=search_id, result_count=len(results))
-        return results
+        return _listings_response(results, projected=False)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from app.config import settings
+from typing import Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -17,6 +18,7 @@ class SearchQuery(BaseModel):
     max_distance_km: Optional[float] = Field(None, description="Maximum distance in kilometers from the geocoded location.")
     use_distance: Optional[bool] = Field(True, description="If false, disables distance scoping (use for price-only or other filters)")
     sort_by: Optional[SortByEnum] = Field(SortByEnum.distance, description="Field to sort results by.")
+    fields: Optional[str] = Field(None, description="Comma-separated fields to return (e.g. id,title,price), or 'card' for id,title,price,lat,lon,thumbnail. Default: full rows.")
 
     class Config:
         json_schema_extra = {
@@ -78,3 +80,43 @@ class SavedSearchResponse(BaseModel):
     created_at: datetime
     photos: List[str] = []  # Photo URLs from the property
     property_id: Optional[str] = None  # Property ID this search is based on
+
+class SavedSearchResultsResponse(BaseModel):
+    search_id: int
+    result_count: int
+    results: Optional[List[SearchResponse]] = None  # omitted when counts_only=true
+
+class PriceBucket(BaseModel):
+    min_price: float
+    max_price: float
+    count: int
+
+class DistanceRing(BaseModel):
+    max_distance_km: float
+    count: int  # listings within max_distance_km of the search center
+
+class SearchFacetsResponse(BaseModel):
+    total: int
+    house_types: Dict[str, int]
+    amenities: Dict[str, int]
+    price_buckets: List[PriceBucket]
+    distance_rings: List[DistanceRing]
+
+class MapMarker(BaseModel):
+    lat: float
+    lon: float
+    count: int
+    min_price: float
+    id: Optional[str] = None  # set when the marker is a single listing
+
+class MapClustersResponse(BaseModel):
+    zoom: int
+    tile_zoom: int  # zoom the clusters were computed at (coarser for very large viewports)
+    markers: List[MapMarker]
+
+class PropertyBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=settings.PROPERTY_BATCH_MAX_IDS)
+
+class PropertyBatchResponse(BaseModel):
+    properties: List[SearchResponse]  # in request order, duplicates removed
+    not_found: List[str]  # unknown or malformed ids
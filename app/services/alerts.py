@@ -0,0 +1,411 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+from app.config import settings
+from app.core.db import get_engine
+from app.core.http import upstream_client
+from app.core.redis import get_redis
+from app.services.changes import became_approved, subscribe, subscribe_resync
+from app.services.search import DEFAULT_CENTER
+from app.utils.amenities import amenity_mask, has_amenities, required_mask
+from app.utils.geo import bounding_box, haversine_km
+from app.utils.geohash import cells_covering, encode
+
+logger = get_logger()
+
+
+def distance_applies(search: Dict[str, Any]) -> bool:
+    # Mirrors execute_saved_search -> search_properties: distance scoping needs both
+    return bool(search.get("location")) and search.get("max_distance_km") is not None
+
+
+def listing_mask(prop: Dict[str, Any]) -> int:
+    # Rows loaded from properties carry the trigger-maintained mask
+    if prop.get("amenity_mask") is not None:
+        return int(prop["amenity_mask"])
+    return amenity_mask(prop.get("amenities"))
+
+
+def matches(search: Dict[str, Any], prop: Dict[str, Any]) -> bool:
+    """
+    Exact check of one property against one saved search (same semantics as the search SQL).
+    """
+    price = float(prop["price"])
+    if search.get("min_price") is not None and price < search["min_price"]:
+        return False
+    if search.get("max_price") is not None and price > search["max_price"]:
+        return False
+    if search.get("house_type") and prop.get("house_type") != search["house_type"]:
+        return False
+    if search.get("amenities") and not has_amenities(listing_mask(prop), required_mask(search["amenities"])):
+        return False
+    if distance_applies(search):
+        if prop.get("lat") is None or prop.get("lon") is None:
+            return False
+        if haversine_km(DEFAULT_CENTER[0], DEFAULT_CENTER[1], prop["lat"], prop["lon"]) > search["max_distance_km"]:
+            return False
+    return True
+
+
+class SavedSearchIndex:
+    """
+    In-memory index of saved searches by house_type, price bucket and geohash cell (plus each
+    search's amenity mask), so a new listing is only checked exactly against plausible candidates.
+    """
+
+    def __init__(self, price_bucket: float, precision: int, max_price_buckets: int = 200, max_cells: int = 400):
+        self.price_bucket = price_bucket
+        self.precision = precision
+        self.max_price_buckets = max_price_buckets
+        self.max_cells = max_cells
+        self.searches: Dict[int, Dict[str, Any]] = {}
+        self.last_id = 0
+        # time.monotonic() of the last full load; None until the first
+        self.loaded_at: Optional[float] = None
+        self._by_house_type: Dict[Optional[str], Set[int]] = {}
+        self._by_price: Dict[int, Set[int]] = {}
+        self._price_any: Set[int] = set()
+        self._by_cell: Dict[str, Set[int]] = {}
+        self._geo_any: Set[int] = set()
+        # Required amenity mask of searches that filter on amenities (None: unknown amenity, never matches)
+        self._amenity_masks: Dict[int, Optional[int]] = {}
+        # Where each search was filed: (house_type, price buckets or None, cells or None), for remove()
+        self._placement: Dict[int, Tuple[Optional[str], Optional[List[int]], Optional[List[str]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.searches)
+
+    def _bucket(self, price: float) -> int:
+        return min(max(int(price // self.price_bucket), 0), self.max_price_buckets)
+
+    def cell(self, prop: Dict[str, Any]) -> Optional[str]:
+        # Stored geohashes are finer; their prefix is the cell at our precision
+        if prop.get("geohash"):
+            return prop["geohash"][:self.precision]
+        if prop.get("lat") is None or prop.get("lon") is None:
+            return None
+        return encode(prop["lat"], prop["lon"], self.precision)
+
+    def _cells_for(self, search: Dict[str, Any]) -> Optional[List[str]]:
+        box = bounding_box(DEFAULT_CENTER[0], DEFAULT_CENTER[1], float(search["max_distance_km"]))
+        return cells_covering(*box, self.precision, limit=self.max_cells)
+
+    def add(self, search: Dict[str, Any]) -> None:
+        """
+        Index a saved search, or re-index it if its criteria changed.
+        """
+        sid = int(search["id"])
+        if sid in self.searches:
+            if self.searches[sid] == search:
+                return
+            self.remove(sid)
+        self.searches[sid] = search
+        self.last_id = max(self.last_id, sid)
+
+        house_type = search.get("house_type") or None
+        self._by_house_type.setdefault(house_type, set()).add(sid)
+        if search.get("amenities"):
+            self._amenity_masks[sid] = required_mask(search["amenities"])
+
+        buckets: Optional[List[int]] = None
+        if search.get("min_price") is None and search.get("max_price") is None:
+            self._price_any.add(sid)
+        else:
+            lo = self._bucket(search.get("min_price") or 0.0)
+            hi = self._bucket(search["max_price"]) if search.get("max_price") is not None else self.max_price_buckets
+            buckets = list(range(lo, hi + 1))
+            for b in buckets:
+                self._by_price.setdefault(b, set()).add(sid)
+
+        cells = self._cells_for(search) if distance_applies(search) else None
+        if cells is None:
+            self._geo_any.add(sid)
+        else:
+            for c in cells:
+                self._by_cell.setdefault(c, set()).add(sid)
+        self._placement[sid] = (house_type, buckets, cells)
+
+    def remove(self, sid: int) -> None:
+        if self.searches.pop(sid, None) is None:
+            return
+        house_type, buckets, cells = self._placement.pop(sid)
+        self._amenity_masks.pop(sid, None)
+        for index, keys, fallback in (
+            (self._by_house_type, [house_type], None),
+            (self._by_price, buckets, self._price_any),
+            (self._by_cell, cells, self._geo_any),
+        ):
+            if keys is None:
+                fallback.discard(sid)
+                continue
+            for key in keys:
+                members = index.get(key)
+                if members is not None:
+                    members.discard(sid)
+                    if not members:
+                        del index[key]
+
+    def replace_all(self, searches: Iterable[Dict[str, Any]]) -> None:
+        """
+        Make the index hold exactly these searches: changed ones are re-indexed, missing ones removed.
+        """
+        seen = set()
+        for search in searches:
+            self.add(search)
+            seen.add(int(search["id"]))
+        for sid in [sid for sid in self.searches if sid not in seen]:
+            self.remove(sid)
+        self.loaded_at = time.monotonic()
+
+    def candidates(self, prop: Dict[str, Any]) -> Set[int]:
+        by_type = self._by_house_type.get(None, set()) | self._by_house_type.get(prop.get("house_type"), set())
+        by_price = self._price_any | self._by_price.get(self._bucket(float(prop["price"])), set())
+        cell = self.cell(prop)
+        by_geo = self._geo_any | self._by_cell.get(cell, set()) if cell else self._geo_any
+        smallest, *rest = sorted((by_type, by_price, by_geo), key=len)
+        found = smallest.intersection(*rest)
+        mask = listing_mask(prop)
+        return {sid for sid in found if sid not in self._amenity_masks or has_amenities(mask, self._amenity_masks[sid])}
+
+
+def match_properties(index: SavedSearchIndex, properties: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    found = []
+    for prop in properties:
+        for sid in index.candidates(prop):
+            search = index.searches[sid]
+            if matches(search, prop):
+                found.append({
+                    "saved_search_id": sid,
+                    "user_id": search.get("user_id"),
+                    "property_id": str(prop["id"]),
+                    "title": prop.get("title"),
+                    "price": float(prop["price"]),
+                    "location": prop.get("location"),
+                })
+    return found
+
+
+_INDEX = SavedSearchIndex(settings.ALERT_PRICE_BUCKET, settings.ALERT_GEOHASH_PRECISION)
+# Ids of newly approved properties waiting to be matched. Every worker's change-feed listener adds
+# to it (a set, so once per property); the match_saved_searches leader job drains it.
+PENDING_KEY = "alerts:pending"
+
+SAVED_SEARCH_COLUMNS = """
+    SELECT id, user_id::text AS user_id, location, min_price, max_price, house_type,
+           amenities, max_distance_km
+    FROM "SavedSearches"
+"""
+
+
+async def _load_saved_searches(where: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(text(f"{SAVED_SEARCH_COLUMNS} WHERE {where} ORDER BY id"), params)
+        return [dict(row) for row in result.mappings()]
+
+
+async def refresh_index(index: SavedSearchIndex = _INDEX) -> int:
+    """
+    Reload every saved search when the index is older than ALERT_INDEX_REBUILD_SECONDS (edits and
+    deletions), else only those created since the last refresh. Returns rows loaded.
+    """
+    if index.loaded_at is None or time.monotonic() - index.loaded_at >= settings.ALERT_INDEX_REBUILD_SECONDS:
+        rows = await _load_saved_searches("TRUE", {})
+        index.replace_all(rows)
+        return len(rows)
+    rows = await _load_saved_searches("id > :last_id", {"last_id": index.last_id})
+    for row in rows:
+        index.add(row)
+    return len(rows)
+
+
+async def recheck_matches(found: List[Dict[str, Any]], properties: List[Dict[str, Any]], index: SavedSearchIndex = _INDEX) -> List[Dict[str, Any]]:
+    """
+    Re-read the saved searches that matched and keep only matches they still produce, so searches
+    edited or deleted since the last rebuild never alert. The index is updated as a side effect.
+    """
+    sids = sorted({m["saved_search_id"] for m in found})
+    if not sids:
+        return []
+    current = {row["id"]: row for row in await _load_saved_searches("id = ANY(:ids)", {"ids": sids})}
+    for sid in sids:
+        if sid in current:
+            index.add(current[sid])
+        else:
+            index.remove(sid)
+    by_id = {str(p["id"]): p for p in properties}
+    kept = []
+    for m in found:
+        search = current.get(m["saved_search_id"])
+        if search is not None and matches(search, by_id[m["property_id"]]):
+            kept.append({**m, "user_id": search.get("user_id")})
+    return kept
+
+
+async def _load_properties(property_ids: List[str]) -> List[Dict[str, Any]]:
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(
+            text("""
+                SELECT p.id::text AS id, p.title, p.location, p.price, p.house_type, p.amenities, p.amenity_mask, p.lat, p.lon, p.geohash
+                FROM properties p
+                WHERE p.id = ANY(CAST(:ids AS uuid[])) AND p.status = 'APPROVED'
+            """),
+            {"ids": property_ids},
+        )
+        return [dict(row) for row in result.mappings()]
+
+
+async def record_matches(found: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Persist matches; returns only the ones not recorded before (dedup on search + property).
+    """
+    if not found:
+        return []
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(
+            text("""
+                INSERT INTO saved_search_matches (saved_search_id, user_id, property_id)
+                SELECT * FROM unnest(CAST(:sids AS int[]), CAST(:uids AS uuid[]), CAST(:pids AS uuid[]))
+                ON CONFLICT (saved_search_id, property_id) DO NOTHING
+                RETURNING saved_search_id, property_id::text AS property_id
+            """),
+            {
+                "sids": [m["saved_search_id"] for m in found],
+                "uids": [m["user_id"] for m in found],
+                "pids": [m["property_id"] for m in found],
+            },
+        )
+        inserted = {(row["saved_search_id"], row["property_id"]) for row in result.mappings()}
+        await db.commit()
+    return [m for m in found if (m["saved_search_id"], m["property_id"]) in inserted]
+
+
+async def deliver_notifications(found: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    POST matches to the notification service in batches; returns the ones delivered.
+    """
+    delivered: List[Dict[str, Any]] = []
+    url = f"{settings.NOTIFICATION_URL}{settings.NOTIFICATION_BATCH_PATH}"
+    async with upstream_client(timeout=10.0) as client:
+        for start in range(0, len(found), settings.ALERT_BATCH_SIZE):
+            batch = found[start:start + settings.ALERT_BATCH_SIZE]
+            payload = {"notifications": [{"type": "saved_search_match", **m} for m in batch]}
+            try:
+                response = await client.post(url, json=payload)
+                response.raise_for_status()
+                delivered.extend(batch)
+            except Exception as e:
+                logger.warning("Notification batch delivery failed", url=url, size=len(batch), error=str(e))
+    return delivered
+
+
+async def _mark_notified(delivered: List[Dict[str, Any]]) -> None:
+    if not delivered:
+        return
+    async with AsyncSession(get_engine()) as db:
+        await db.execute(
+            text("""
+                UPDATE saved_search_matches m SET notified_at = NOW()
+                FROM unnest(CAST(:sids AS int[]), CAST(:pids AS uuid[])) AS d(saved_search_id, property_id)
+                WHERE m.saved_search_id = d.saved_search_id AND m.property_id = d.property_id
+            """),
+            {"sids": [m["saved_search_id"] for m in delivered], "pids": [m["property_id"] for m in delivered]},
+        )
+        await db.commit()
+
+
+async def process_properties(property_ids: List[str]) -> int:
+    """
+    Match newly approved properties against all saved searches and notify tenants.
+    """
+    if not property_ids:
+        return 0
+    await refresh_index()
+    properties, _ = await _load_properties(property_ids)
+    found = await recheck_matches(match_properties(_INDEX, properties), properties)
+    new = await record_matches(found)
+    delivered = await deliver_notifications(new)
+    await _mark_notified(delivered)
+    logger.info(
+        "Saved-search matching done",
+        properties=len(properties), saved_searches=len(_INDEX),
+        matched=len(found), new=len(new), delivered=len(delivered),
+    )
+    return len(new)
+
+
+async def deliver_pending(limit: int = 1000) -> int:
+    """
+    Retry matches whose notification has not been delivered yet.
+    """
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(
+            text("""
+                SELECT m.saved_search_id, m.user_id::text AS user_id, m.property_id::text AS property_id,
+                       p.title, p.price, p.location
+                FROM saved_search_matches m
+                JOIN properties p ON p.id = m.property_id
+                WHERE m.notified_at IS NULL
+                ORDER BY m.matched_at
+                LIMIT :limit
+            """),
+            {"limit": limit},
+        )
+        pending = [dict(row) for row in result.mappings()]
+    for m in pending:
+        m["price"] = float(m["price"])
+    delivered = await deliver_notifications(pending)
+    await _mark_notified(delivered)
+    return len(delivered)
+
+
+async def on_property_change(event: Dict[str, Any]) -> None:
+    if event.get("id") and became_approved(event):
+        await get_redis().sadd(PENDING_KEY, str(event["id"]))
+
+
+async def catch_up_approvals(gap_seconds: float) -> int:
+    """
+    Change-feed resync: queue approved properties updated during the gap (plus a margin), whose
+    NOTIFY was missed. Ones matched before are not alerted again (record_matches dedups).
+    """
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(
+            text("""
+                SELECT id::text AS id FROM properties
+                WHERE status = 'APPROVED' AND updated_at >= NOW() - make_interval(secs => :seconds)
+            """),
+            {"seconds": gap_seconds + settings.ALERT_BATCH_INTERVAL_SECONDS},
+        )
+        ids = [row["id"] for row in result.mappings()]
+    if ids:
+        await get_redis().sadd(PENDING_KEY, *ids)
+    logger.info("Queued approvals from a change-feed gap", gap_seconds=round(gap_seconds, 3), properties=len(ids))
+    return len(ids)
+
+
+async def match_pending() -> int:
+    """
+    Leader job: match queued approvals in batches of ALERT_BATCH_SIZE until the queue is empty.
+    A failed batch goes back on the queue for the next run. Returns new matches.
+    """
+    redis = get_redis()
+    new = 0
+    while True:
+        batch = await redis.spop(PENDING_KEY, settings.ALERT_BATCH_SIZE)
+        if not batch:
+            return new
+        try:
+            new += await process_properties(list(batch))
+        except Exception:
+            await redis.sadd(PENDING_KEY, *batch)
+            raise
+
+
+def start_alerts() -> None:
+    # Every worker queues approvals; matching itself runs as the match_saved_searches leader job
+    subscribe(on_property_change)
+    subscribe_resync(catch_up_approvals)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import asyncpg
+from structlog import get_logger
+
+from app.core.db import asyncpg_dsn
+
+logger = get_logger()
+
+# Change feed for the `properties` table. The `property_changes` trigger (see
+# sql/schema.sql) NOTIFYs {"op", "id", "status", "old_status"} for every row
+# change; handlers registered with subscribe() receive each event. NOTIFY is not
+# queued for a listener that is disconnected, so after a reconnect the handlers
+# registered with subscribe_resync() are called with the gap in seconds instead.
+CHANNEL = "property_changes"
+# How often the listener checks that its connection is still open
+POLL_SECONDS = 5.0
+
+PropertyChangeHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+ResyncHandler = Callable[[float], Awaitable[None]]
+
+_subscribers: List[PropertyChangeHandler] = []
+_resync_subscribers: List[ResyncHandler] = []
+_listener_task: Optional[asyncio.Task] = None
+# publish() tasks in flight; the loop only keeps weak references to tasks
+_handler_tasks: Set[asyncio.Task] = set()
+
+
+def subscribe(handler: PropertyChangeHandler) -> None:
+    if handler not in _subscribers:
+        _subscribers.append(handler)
+
+
+def subscribe_resync(handler: ResyncHandler) -> None:
+    if handler not in _resync_subscribers:
+        _resync_subscribers.append(handler)
+
+
+def became_approved(event: Dict[str, Any]) -> bool:
+    return event.get("status") == "APPROVED" and event.get("old_status") != "APPROVED"
+
+
+async def publish(event: Dict[str, Any]) -> None:
+    """
+    Dispatch one change event to every subscriber; a failing handler does not stop the others.
+    """
+    for handler in list(_subscribers):
+        try:
+            await handler(event)
+        except Exception as e:
+            logger.error("Property change handler failed", handler=getattr(handler, "__name__", str(handler)), event=event, error=str(e))
+
+
+async def resync(gap_seconds: float) -> None:
+    """
+    Let every resync subscriber catch up on changes missed while the listener was disconnected.
+    """
+    for handler in list(_resync_subscribers):
+        try:
+            await handler(gap_seconds)
+        except Exception as e:
+            logger.error("Property change resync failed", handler=getattr(handler, "__name__", str(handler)), error=str(e))
+
+
+def _on_notify(connection, pid, channel, payload) -> None:
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        logger.warning("Malformed property change payload", payload=payload[:200])
+        return
+    task = asyncio.get_running_loop().create_task(publish(event))
+    _handler_tasks.add(task)
+    task.add_done_callback(_handler_tasks.discard)
+
+
+async def _listen_forever() -> None:
+    delay = 1.0
+    # When the last listening connection was lost; None while listening and before the first one
+    lost_at: Optional[float] = None
+    while True:
+        conn = None
+        listening = False
+        try:
+            conn = await asyncpg.connect(asyncpg_dsn())
+            await conn.add_listener(CHANNEL, _on_notify)
+            listening = True
+            logger.info("Listening for property changes", channel=CHANNEL)
+            delay = 1.0
+            if lost_at is not None:
+                gap = time.monotonic() - lost_at
+                lost_at = None
+                logger.warning("Property change listener reconnected; changes made meanwhile were missed", gap_seconds=round(gap, 3))
+                await resync(gap)
+            while not conn.is_closed():
+                await asyncio.sleep(POLL_SECONDS)
+            lost_at = time.monotonic()
+            logger.warning("Property change listener connection closed; reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if listening and lost_at is None:
+                lost_at = time.monotonic()
+            logger.warning("Property change listener failed; retrying", error=str(e), retry_in=delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+
+
+def start_change_feed() -> None:
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.get_running_loop().create_task(_listen_forever())
+
+
+async def stop_change_feed() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -0,0 +1,133 @@
+import json
+from typing import Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+from app.config import settings
+from app.core.db import get_engine
+from app.core.metrics import record_cache
+from app.core.redis import get_redis
+from app.utils.geo import MAX_MERCATOR_LAT, lonlat_to_tile, tile_bounds
+from app.utils.geohash import covering_ranges, range_condition
+
+logger = get_logger()
+
+MAX_ZOOM = 20
+
+# Approved listings in one tile, grouped on a GRID x GRID lattice of snapped coordinates
+CLUSTER_SQL = """
+    SELECT FLOOR((p.lon - :west) / :cell_lon)::int AS gx,
+           FLOOR((p.lat - :south) / :cell_lat)::int AS gy,
+           COUNT(*) AS count, AVG(p.lat) AS lat, AVG(p.lon) AS lon,
+           MIN(p.price) AS min_price, MIN(p.id::text) AS id
+    FROM approved_property_search p
+    WHERE {prefilter}
+      AND p.lat >= :south AND p.lat < :north AND p.lon >= :west AND p.lon < :east
+    GROUP BY gx, gy
+"""
+
+POINTS_SQL = """
+    SELECT p.id::text AS id, p.lat, p.lon, p.price AS min_price, 1 AS count
+    FROM approved_property_search p
+    WHERE {prefilter}
+      AND p.lat >= :south AND p.lat < :north AND p.lon >= :west AND p.lon < :east
+    LIMIT :limit
+"""
+
+BBox = Tuple[float, float, float, float]
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """
+    Parse "west,south,east,north" in degrees. Raises ValueError when malformed.
+    """
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north")
+    if not (-180.0 <= west < east <= 180.0) or not (-90.0 <= south < north <= 90.0):
+        raise ValueError("bbox is out of range or empty")
+    return west, max(south, -MAX_MERCATOR_LAT), east, min(north, MAX_MERCATOR_LAT)
+
+
+def covering_tiles(bbox: BBox, zoom: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Tiles covering the bbox, at `zoom` or coarser so there are at most MAP_MAX_TILES.
+    """
+    west, south, east, north = bbox
+    tile_zoom = min(max(zoom, 0), MAX_ZOOM)
+    while True:
+        x0, y0 = lonlat_to_tile(west, north, tile_zoom)
+        x1, y1 = lonlat_to_tile(east, south, tile_zoom)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= settings.MAP_MAX_TILES or tile_zoom == 0:
+            return tile_zoom, [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+        tile_zoom -= 1
+
+
+def _marker(row: Dict) -> Dict:
+    count = int(row["count"])
+    return {
+        "lat": float(row["lat"]),
+        "lon": float(row["lon"]),
+        "count": count,
+        "min_price": float(row["min_price"]),
+        # A cell with one listing is a plain point the UI can link to
+        "id": row["id"] if count == 1 else None,
+    }
+
+
+async def _compute_tile(db: AsyncSession, zoom: int, x: int, y: int) -> List[Dict]:
+    west, south, east, north = tile_bounds(zoom, x, y)
+    params = {"west": west, "south": south, "east": east, "north": north}
+    prefilter = "TRUE"
+    if settings.GEOHASH_PREFILTER:
+        prefilter = range_condition(covering_ranges(south, west, north, east, max_ranges=settings.GEOHASH_MAX_RANGES), params)
+    if zoom >= settings.MAP_POINTS_MIN_ZOOM:
+        params["limit"] = settings.MAP_MAX_POINTS_PER_TILE + 1
+        rows = (await db.execute(text(POINTS_SQL.format(prefilter=prefilter)), params)).mappings().all()
+        if len(rows) <= settings.MAP_MAX_POINTS_PER_TILE:
+            return [_marker(row) for row in rows]
+        # Too dense to send as points even at this zoom: cluster instead
+    grid = settings.MAP_CLUSTER_GRID
+    params.update({"cell_lon": (east - west) / grid, "cell_lat": (north - south) / grid})
+    rows = (await db.execute(text(CLUSTER_SQL.format(prefilter=prefilter)), params)).mappings().all()
+    return [_marker(row) for row in rows]
+
+
+async def map_clusters(bbox: BBox, zoom: int) -> Dict:
+    """
+    Aggregated markers for a viewport. Markers are computed and cached per tile,
+    so the payload is bounded by MAP_MAX_TILES * MAP_CLUSTER_GRID^2 (or the points cap).
+    """
+    tile_zoom, tiles = covering_tiles(bbox, zoom)
+    keys = [f"map:{tile_zoom}:{x}:{y}" for x, y in tiles]
+    redis = get_redis()
+    cached = await redis.mget(keys)
+
+    markers: List[Dict] = []
+    missing = []
+    for key, tile, value in zip(keys, tiles, cached):
+        record_cache("map", value is not None)
+        if value is not None:
+            markers.extend(json.loads(value))
+        else:
+            missing.append((key, tile))
+
+    if missing:
+        async with AsyncSession(get_engine()) as db:
+            computed = [(key, await _compute_tile(db, tile_zoom, x, y)) for key, (x, y) in missing]
+        async with redis.pipeline(transaction=False) as pipe:
+            for key, tile_markers in computed:
+                pipe.setex(key, settings.MAP_CLUSTER_TTL_SECONDS, json.dumps(tile_markers))
+                markers.extend(tile_markers)
+            await pipe.execute()
+        logger.info("Map tiles clustered", zoom=tile_zoom, computed=len(missing), cached=len(tiles) - len(missing))
+
+    west, south, east, north = bbox
+    return {
+        "zoom": zoom,
+        "tile_zoom": tile_zoom,
+        "markers": [m for m in markers if west <= m["lon"] <= east and south <= m["lat"] <= north],
+    }
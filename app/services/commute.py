@@ -0,0 +1,172 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from structlog import get_logger
+
+from app.config import settings
+from app.core.metrics import record_cache
+from app.core.redis import get_redis
+from app.schemas.onm import DestRef
+from app.services.onm import Coord, distance_km, leg_cache_key, matrix, resolve_destinations_by_name, snap, square_fields
+from app.services.search import ALL_FIELDS
+from app.utils.geo import haversine_km
+
+logger = get_logger()
+
+# Matrix calls take at most 10 points: the destination plus 9 listings
+LISTINGS_PER_CALL = 9
+
+DISTANCE_FIELDS = ("distances", "distance", "matrix")
+DURATION_FIELDS = ("durations", "duration", "times", "time")
+
+Destination = Tuple[str, Coord]
+
+
+def parse_destination(value: str) -> DestRef:
+    """
+    `commute_to` value as a DestRef: "lat,lon" or a destination name from the routes dataset.
+    Raises ValueError for out-of-range coordinates.
+    """
+    parts = value.split(",")
+    if len(parts) == 2:
+        try:
+            lat, lon = float(parts[0]), float(parts[1])
+        except ValueError:
+            return DestRef(name=value.strip())
+        try:
+            return DestRef(lat=lat, lon=lon)
+        except ValidationError:
+            raise ValueError(f"Invalid commute destination: {value}")
+    return DestRef(name=value.strip())
+
+
+def resolve_destinations(values: List[str]) -> List[Destination]:
+    """
+    (label, coordinate) per `commute_to` value; raises ValueError for unknown names.
+    """
+    destinations: List[Destination] = []
+    for value in values:
+        ref = parse_destination(value)
+        if ref.lat is not None and ref.lon is not None:
+            destinations.append((value, (float(ref.lat), float(ref.lon))))
+            continue
+        resolved = resolve_destinations_by_name([ref.name]) if ref.name else []
+        if not resolved:
+            raise ValueError(f"Unknown commute destination: {value}")
+        destinations.append((ref.name, (float(resolved[0][0]), float(resolved[0][1]))))
+    return destinations
+
+
+def with_coordinates(fields: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+    """
+    Projection plus lat/lon, which commute ranking needs (dropped again afterwards).
+    """
+    if fields is None:
+        return None
+    return tuple(f for f in ALL_FIELDS if f in fields or f in ("lat", "lon"))
+
+
+def _leg_minutes(leg: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """
+    (km, minutes) of a cached leg; minutes from a duration field (seconds) when the API sent one,
+    else from the distance at SEARCH_COMMUTE_SPEED_KMH.
+    """
+    distance = next((leg[f] for f in DISTANCE_FIELDS if leg.get(f) is not None), None)
+    if distance is None:
+        return None
+    km = distance_km(distance)
+    duration = next((leg[f] for f in DURATION_FIELDS if leg.get(f) is not None), None)
+    minutes = float(duration) / 60.0 if duration is not None else km / settings.SEARCH_COMMUTE_SPEED_KMH * 60.0
+    return km, minutes
+
+
+async def _matrix_legs(origins: List[Coord], destination: Coord) -> Dict[Coord, Dict[str, Any]]:
+    """
+    Origin -> destination legs from one Matrix call (the destination first, then the origins).
+    """
+    points = [destination] + origins
+    try:
+        data = await matrix(points)
+    except Exception as e:
+        logger.warning("Commute matrix failed; using straight-line estimates", origins=len(origins), error=str(e))
+        return {}
+    fields = square_fields(data, len(points))
+    return {origin: {f: v[i + 1][0] for f, v in fields.items()} for i, origin in enumerate(origins)} if fields else {}
+
+
+async def travel_legs(origins: List[Coord], destination: Coord) -> Dict[Coord, Dict[str, Any]]:
+    """
+    Leg from each (snapped) origin to destination: one MGET of cached legs, then Matrix calls of
+    up to 9 origins for the rest. Origins the API could not answer are left out.
+    """
+    destination = snap(*destination)
+    origins = [o for o in dict.fromkeys(snap(*o) for o in origins) if o != destination]
+    legs: Dict[Coord, Dict[str, Any]] = {}
+    if not origins:
+        return legs
+    cached = await get_redis().mget([leg_cache_key(o, destination) for o in origins])
+    for origin, value in zip(origins, cached):
+        if value is not None:
+            legs[origin] = json.loads(value)
+    record_cache("matrix", len(legs) == len(origins))
+
+    missing = [o for o in origins if o not in legs]
+    batches = [missing[i:i + LISTINGS_PER_CALL] for i in range(0, len(missing), LISTINGS_PER_CALL)]
+    for found in await asyncio.gather(*(_matrix_legs(batch, destination) for batch in batches)):
+        legs.update(found)
+    return legs
+
+
+async def rank_by_commute(
+    listings: List[dict],
+    destinations: List[Destination],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> List[dict]:
+    """
+    The SEARCH_COMMUTE_TOP_K listings closest (straight line, summed over destinations) ranked by
+    total travel time, each with a `commute` entry per destination. Upstream calls are bounded by
+    K and the number of destinations; legs seen before come from the leg cache. The other listings
+    follow with `commute: None`: located ones by straight-line distance, then those without lat/lon.
+    """
+    located = [l for l in listings if l.get("lat") is not None and l.get("lon") is not None]
+    unlocated = [l for l in listings if l.get("lat") is None or l.get("lon") is None]
+
+    def straight(listing: dict) -> float:
+        return sum(haversine_km(listing["lat"], listing["lon"], lat, lon) for _, (lat, lon) in destinations)
+
+    def project(listing: dict) -> dict:
+        return {k: listing.get(k) for k in fields} if fields else dict(listing)
+
+    by_distance = sorted(located, key=straight)
+    candidates = by_distance[:settings.SEARCH_COMMUTE_TOP_K]
+    origins = [(float(l["lat"]), float(l["lon"])) for l in candidates]
+    per_destination = await asyncio.gather(*(travel_legs(origins, coord) for _, coord in destinations))
+
+    ranked = []
+    for listing, origin in zip(candidates, origins):
+        commute = []
+        for (label, coord), legs in zip(destinations, per_destination):
+            snapped = snap(*origin)
+            if snapped == snap(*coord):
+                travel: Optional[Tuple[float, float]] = (0.0, 0.0)
+            else:
+                leg = legs.get(snapped)
+                travel = _leg_minutes(leg) if leg else None
+            estimated = travel is None
+            if estimated:
+                km = haversine_km(origin[0], origin[1], coord[0], coord[1])
+                travel = (km, km / settings.SEARCH_COMMUTE_SPEED_KMH * 60.0)
+            commute.append({
+                "destination": label,
+                "distance_km": round(travel[0], 2),
+                "minutes": round(travel[1], 1),
+                "estimated": estimated,
+            })
+        row = project(listing)
+        row["commute"] = commute
+        ranked.append((sum(c["minutes"] for c in commute), straight(listing), row))
+    ranked.sort(key=lambda item: (item[0], item[1]))
+    rest = [dict(project(listing), commute=None) for listing in by_distance[len(candidates):] + unlocated]
+    return [row for _, _, row in ranked] + rest
@@ -0,0 +1,113 @@
+import json
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+from app.config import settings
+from app.core.db import get_engine
+from app.core.metrics import record_cache
+from app.core.redis import get_redis
+from app.services.search import DEFAULT_CENTER, add_attribute_filters, add_distance_filter, search_cache_key
+from app.utils.amenities import VOCABULARY
+
+logger = get_logger()
+
+# The filtered set is materialized once (a CTE referenced several times) and
+# every facet is aggregated from it, so the whole response is one table scan.
+FACETS_SQL = """
+    WITH f AS MATERIALIZED (
+        SELECT p.house_type, p.amenity_mask, p.price,
+               CASE WHEN p.lat IS NOT NULL AND p.lon IS NOT NULL
+                    THEN earth_distance(p.earth, ll_to_earth(:user_lat, :user_lon)) / 1000.0
+               END AS distance_km
+        FROM approved_property_search p
+        WHERE {where}
+    )
+    SELECT 'total' AS facet, NULL AS value, COUNT(*) AS count FROM f
+    UNION ALL
+    SELECT 'house_type', house_type, COUNT(*) FROM f WHERE house_type IS NOT NULL GROUP BY house_type
+    UNION ALL
+    SELECT 'amenity', a.name, COUNT(*) FROM f, unnest(CAST(:amenity_names AS text[]), CAST(:amenity_bits AS bigint[])) AS a(name, bit)
+    WHERE f.amenity_mask & a.bit <> 0 GROUP BY a.name
+    UNION ALL
+    SELECT 'price', (FLOOR(price / CAST(:price_bucket AS numeric)) * CAST(:price_bucket AS numeric))::text, COUNT(*) FROM f GROUP BY 2
+    UNION ALL
+    SELECT 'distance', r.km::text, COUNT(*) FROM f, unnest(CAST(:rings AS float8[])) AS r(km)
+    WHERE f.distance_km <= r.km GROUP BY r.km
+"""
+
+
+def distance_rings() -> List[float]:
+    return sorted(float(r) for r in settings.FACET_DISTANCE_RINGS_KM.split(",") if r.strip())
+
+
+def shape_facets(rows: List[dict], price_bucket: float, rings: List[float]) -> dict:
+    """
+    Turn (facet, value, count) rows into the response shape.
+    """
+    facets = {"total": 0, "house_types": {}, "amenities": {}, "price_buckets": [], "distance_rings": []}
+    ring_counts = {}
+    for row in rows:
+        facet, value, count = row["facet"], row["value"], int(row["count"])
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "house_type":
+            facets["house_types"][value] = count
+        elif facet == "amenity":
+            facets["amenities"][value] = count
+        elif facet == "price":
+            low = float(value)
+            facets["price_buckets"].append({"min_price": low, "max_price": low + price_bucket, "count": count})
+        elif facet == "distance":
+            ring_counts[float(value)] = count
+    facets["price_buckets"].sort(key=lambda b: b["min_price"])
+    # Rings are cumulative ("within N km"); empty rings are reported as 0
+    facets["distance_rings"] = [{"max_distance_km": r, "count": ring_counts.get(r, 0)} for r in rings]
+    return facets
+
+
+async def search_facets(
+    location: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    house_type: Optional[str] = None,
+    amenities: Optional[List[str]] = None,
+    bedrooms: Optional[int] = None,
+    use_distance: Optional[bool] = True,
+    max_distance_km: Optional[float] = None,
+) -> dict:
+    """
+    Counts per house_type, amenity, price bucket and distance ring for a search.
+    """
+    # Ordering does not change counts, so every sort_by shares one entry
+    cache_key = search_cache_key("facets", location, min_price, max_price, house_type, amenities, bedrooms, use_distance, max_distance_km, None)
+    redis = get_redis()
+    cached = await redis.get(cache_key)
+    record_cache("search", cached is not None)
+    if cached:
+        return json.loads(cached)
+
+    user_lat, user_lon = DEFAULT_CENTER
+    price_bucket = settings.FACET_PRICE_BUCKET
+    rings = distance_rings()
+    params = {
+        "user_lat": user_lat, "user_lon": user_lon, "price_bucket": price_bucket, "rings": rings,
+        # Amenity counts are per canonical amenity, whatever spelling a listing used
+        "amenity_names": [name for name, _, _ in VOCABULARY],
+        "amenity_bits": [1 << bit for _, bit, _ in VOCABULARY],
+    }
+    conditions = ["TRUE"]
+    # Same scoping rule as search_properties
+    if use_distance and location and max_distance_km is not None:
+        add_distance_filter(conditions, params, max_distance_km)
+    add_attribute_filters(conditions, params, min_price, max_price, house_type, amenities)
+
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(text(FACETS_SQL.format(where=" AND ".join(conditions))), params)
+        facets = shape_facets([dict(row) for row in result.mappings()], price_bucket, rings)
+
+    await redis.setex(cache_key, 3600, json.dumps(facets))
+    logger.info("Computed search facets", cache_key=cache_key, total=facets["total"])
+    return facets
@@ -1,8 +1,10 @@
 import httpx
 from app.config import settings
 from app.utils.retry import retry
+from app.core.http import upstream_client
+from app.core.metrics import record_cache
 from structlog import get_logger
-from redis.asyncio import Redis
+from app.core.redis import get_redis, get_binary_redis
 import json
 import asyncio
 
@@ -10,16 +12,17 @@ logger = get_logger()
 
 @retry(tries=3, delay=1, backoff=2)
 async def geocode(query: str) -> dict:
-    redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    redis = get_redis()
     cache_key = f"geocode:{query}"
     cached = await redis.get(cache_key)
+    record_cache("geocode", cached is not None)
     if cached:
         logger.info("Geocode cache hit", query=query)
         return json.loads(cached)
     
     logger.info("Geocode cache miss", query=query)
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream_client() as client:
             response = await client.get(
                 "https://api.gebeta.app/geocode",
                 params={"query": query},
@@ -37,18 +40,24 @@ async def geocode(query: str) -> dict:
         # Fallback to Addis Ababa center
         return {"lat": 9.03, "lon": 38.75}
 
+def tile_cache_key(z: int, x: int, y: int) -> str:
+    return f"tile:{z}:{x}:{y}"
+
 @retry(tries=3, delay=1, backoff=2)
-async def get_map_tile(z: int, x: int, y: int) -> bytes:
+async def get_map_tile(z: int, x: int, y: int, refresh: bool = False) -> bytes:
     # Use binary-safe Redis connection for tiles
-    redis = Redis.from_url(settings.REDIS_URL, decode_responses=False)
-    cache_key = f"tile:{z}:{x}:{y}"
-    cached = await redis.get(cache_key)
+    redis = get_binary_redis()
+    cache_key = tile_cache_key(z, x, y)
+    cached = None
+    if not refresh:
+        cached = await redis.get(cache_key)
+        record_cache("tile", cached is not None)
     if cached is not None:
         logger.info("Map tile cache hit", cache_key=cache_key)
         return cached  # bytes
     
     logger.info("Map tile cache miss", cache_key=cache_key)
-    async with httpx.AsyncClient() as client:
+    async with upstream_client() as client:
         try:
             # Use mapapi host with explicit PNG extension and apiKey query
             response = await client.get(
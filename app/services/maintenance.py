@@ -0,0 +1,137 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+from app.config import settings
+from app.core.cache import prune_local_caches
+from app.core.db import get_engine
+from app.core.jobs import get_job, register_job, run_job
+from app.core.redis import get_binary_redis, get_redis
+from app.services.alerts import deliver_pending, match_pending
+from app.services.gebeta import get_map_tile, tile_cache_key
+from app.services.popular import flush_queries, refresh_popular_searches
+from app.services.search import CARD_FIELDS, DEFAULT_CENTER, get_all_approved_properties
+from app.utils.geo import lonlat_to_tile
+
+logger = get_logger()
+
+# Leader jobs also run once before a replica serves; their locks keep a rolling deploy
+# from repeating warm-ups another replica has just done
+STARTUP_WARM_JOBS = ("warm_approved_properties", "refresh_popular_searches", "warm_map_tiles")
+
+# Result caches derived from listings (what clear_cache.py used to delete with KEYS)
+SEARCH_CACHE_PATTERNS = ("search:*", "facets:*", "map:*", "all_approved_properties*")
+
+
+async def clear_search_cache() -> int:
+    """
+    Delete cached search results with SCAN (non-blocking, unlike KEYS). Returns keys deleted.
+    """
+    redis = get_redis()
+    deleted = 0
+    for pattern in SEARCH_CACHE_PATTERNS:
+        batch: List[str] = []
+        async for key in redis.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                deleted += await redis.delete(*batch)
+                batch = []
+        if batch:
+            deleted += await redis.delete(*batch)
+    logger.info("Search caches cleared", deleted=deleted)
+    return deleted
+
+
+async def refresh_search_table() -> int:
+    """
+    Run refresh_approved_property_search() to repair rows a trigger-bypassing load left stale,
+    clearing the result caches if any changed. Returns rows changed.
+    """
+    async with AsyncSession(get_engine()) as db:
+        changed = (await db.execute(text("SELECT refresh_approved_property_search()"))).scalar_one()
+        await db.commit()
+    if changed:
+        logger.info("Search table caught up", changed=changed)
+        await clear_search_cache()
+    return changed
+
+
+async def warm_approved_properties() -> int:
+    """
+    Rebuild the /properties/approved caches (full rows and the card projection) before they expire.
+    """
+    rows = await get_all_approved_properties(refresh=True)
+    await get_all_approved_properties(CARD_FIELDS, refresh=True)
+    return len(rows)
+
+
+def warm_tiles() -> List[Tuple[int, int, int]]:
+    """
+    Tiles around the search center for the WARM_TILE_ZOOMS levels, WARM_TILE_RADIUS tiles each way.
+    """
+    lat, lon = DEFAULT_CENTER
+    radius = settings.WARM_TILE_RADIUS
+    tiles = []
+    for zoom in (int(z) for z in settings.WARM_TILE_ZOOMS.split(",") if z.strip()):
+        cx, cy = lonlat_to_tile(lon, lat, zoom)
+        n = 2 ** zoom
+        for x in range(max(cx - radius, 0), min(cx + radius, n - 1) + 1):
+            for y in range(max(cy - radius, 0), min(cy + radius, n - 1) + 1):
+                tiles.append((zoom, x, y))
+    return tiles
+
+
+async def warm_map_tiles() -> Dict[str, int]:
+    """
+    Fetch the warm tiles that are missing or expire within two job intervals.
+    """
+    redis = get_binary_redis()
+    tiles = warm_tiles()
+    async with redis.pipeline(transaction=False) as pipe:
+        for z, x, y in tiles:
+            pipe.ttl(tile_cache_key(z, x, y))
+        ttls = await pipe.execute()
+    stale = [tile for tile, ttl in zip(tiles, ttls) if ttl < 2 * settings.WARM_TILES_INTERVAL_SECONDS]
+    failed = 0
+    for z, x, y in stale:
+        try:
+            await get_map_tile(z, x, y, refresh=True)
+        except Exception as e:
+            failed += 1
+            logger.warning("Tile warm-up failed", z=z, x=x, y=y, error=str(e))
+    return {"tiles": len(tiles), "refreshed": len(stale) - failed, "failed": failed}
+
+
+async def prune_caches() -> int:
+    return prune_local_caches()
+
+
+def register_jobs() -> None:
+    register_job("warm_approved_properties", warm_approved_properties, settings.WARM_APPROVED_INTERVAL_SECONDS, timeout=300)
+    register_job("warm_map_tiles", warm_map_tiles, settings.WARM_TILES_INTERVAL_SECONDS, timeout=300)
+    register_job("refresh_popular_searches", refresh_popular_searches, settings.SEARCH_POPULAR_REFRESH_SECONDS, timeout=300)
+    register_job("refresh_search_table", refresh_search_table, settings.SEARCH_TABLE_REFRESH_INTERVAL_SECONDS or None, timeout=600)
+    if settings.ALERTS_ENABLED:
+        register_job("match_saved_searches", match_pending, settings.ALERT_BATCH_INTERVAL_SECONDS, timeout=300)
+        register_job("deliver_pending_alerts", deliver_pending, settings.ALERT_RETRY_INTERVAL_SECONDS, timeout=120)
+    # In-process state: every replica prunes its caches and flushes its own search counts
+    register_job("prune_local_caches", prune_caches, settings.LOCAL_CACHE_PRUNE_INTERVAL_SECONDS, leader=False)
+    register_job("flush_popular_searches", flush_queries, settings.SEARCH_POPULAR_FLUSH_SECONDS, leader=False)
+    register_job("clear_search_cache", clear_search_cache, None)
+
+
+async def warm_caches() -> Dict[str, str]:
+    """
+    Run the STARTUP_WARM_JOBS (registered by register_jobs) now. Raises if any of them failed.
+    """
+    results = {}
+    for name in STARTUP_WARM_JOBS:
+        job = get_job(name)
+        if job is not None:
+            results[name] = await run_job(job)
+    failed = [name for name, status in results.items() if status in ("error", "timeout")]
+    if failed:
+        raise RuntimeError(f"Cache warm-up failed: {', '.join(failed)}")
+    return results
@@ -3,16 +3,27 @@ from typing import List, Tuple, Dict, Any, Optional
 
 import httpx
 from structlog import get_logger
-from redis.asyncio import Redis
+from app.core.redis import get_redis
 
 from app.config import settings
 from app.utils.retry import retry
+from app.core.cache import LocalCache
+from app.core.http import upstream_client
+from app.core.metrics import record_cache
 
 logger = get_logger()
 
 
 # Utilities to load and cache the dataset in-memory
 _ROUTES_DATA: Optional[List[Dict[str, Any]]] = None
+# Name lookup for the dataset it was built from
+_DEST_INDEX: Optional[Tuple[List[Dict[str, Any]], Dict[str, Tuple[float, float]]]] = None
+
+# ONM and Matrix responses by cache key, in front of Redis
+_LOCAL = LocalCache(settings.ROUTE_LOCAL_CACHE_SIZE, settings.ROUTE_LOCAL_TTL_SECONDS, name="route")
+_MISS = object()
+
+Coord = Tuple[float, float]
 
 
 def _normalize_coord(lat: float, lon: float) -> str:
@@ -24,6 +35,70 @@ def _coords_list_param(coords: List[Tuple[float, float]]) -> str:
     return ",".join([f"{{{c[0]},{c[1]}}}" for c in coords])
 
 
+def snap(lat: float, lon: float) -> Coord:
+    """
+    Coordinate rounded to ROUTE_COORD_PRECISION decimals, so GPS jitter maps to the same cache keys.
+    """
+    return (round(float(lat), settings.ROUTE_COORD_PRECISION), round(float(lon), settings.ROUTE_COORD_PRECISION))
+
+
+def route_waypoints(waypoints: List[Coord]) -> List[Coord]:
+    """
+    Snapped, deduplicated and sorted waypoints (ONM picks the visiting order itself), at most 10.
+    """
+    points = list(dict.fromkeys(snap(*w) for w in waypoints))
+    if len(points) > 10:
+        logger.warning("Waypoints exceed limit; trimming to 10", count=len(points))
+        points = points[:10]
+    return sorted(points)
+
+
+def route_cache_key(origin: Coord, waypoints: List[Coord]) -> str:
+    return f"onm:{_normalize_coord(*origin)}:[{_coords_list_param(waypoints)}]"
+
+
+def leg_cache_key(a: Coord, b: Coord) -> str:
+    return f"leg:{_normalize_coord(*a)}>{_normalize_coord(*b)}"
+
+
+async def _cached(namespace: str, key: str) -> Any:
+    value = _LOCAL.get(key, _MISS)
+    record_cache(f"{namespace}_local", value is not _MISS)
+    if value is not _MISS:
+        return value
+    cached = await get_redis().get(key)
+    record_cache(namespace, cached is not None)
+    if cached is None:
+        return _MISS
+    value = json.loads(cached)
+    _LOCAL.set(key, value)
+    return value
+
+
+def square_fields(data: Any, size: int) -> Dict[str, list]:
+    """
+    Fields of a Matrix response that are size x size (distances, durations, ...).
+    """
+    if not isinstance(data, dict):
+        return {}
+    return {
+        field: value for field, value in data.items()
+        if isinstance(value, list) and len(value) == size and all(isinstance(row, list) and len(row) == size for row in value)
+    }
+
+
+async def _store_legs(points: List[Coord], data: Any) -> None:
+    fields = square_fields(data, len(points))
+    if not fields:
+        return
+    async with get_redis().pipeline(transaction=False) as pipe:
+        for i, a in enumerate(points):
+            for j, b in enumerate(points):
+                if a != b:
+                    pipe.setex(leg_cache_key(a, b), settings.MATRIX_CACHE_TTL_SECONDS, json.dumps({f: v[i][j] for f, v in fields.items()}))
+        await pipe.execute()
+
+
 def load_routes_dataset() -> List[Dict[str, Any]]:
     global _ROUTES_DATA
     if _ROUTES_DATA is None:
@@ -36,29 +111,28 @@ def load_routes_dataset() -> List[Dict[str, Any]]:
 async def onm_route(origin_lat: float, origin_lon: float, waypoints: List[Tuple[float, float]]) -> Dict[str, Any]:
     """
     Call Gebeta ONM API with origin and up to 10 waypoints (API limit).
-    Returns JSON response from Gebeta.
+    Returns JSON response from Gebeta plus "waypoints": the snapped, sorted coordinates
+    that were sent, which any waypoint index in the response refers to.
     """
     if len(waypoints) == 0:
         raise ValueError("At least one waypoint is required")
-    if len(waypoints) > 10:
-        logger.warning("Waypoints exceed limit; trimming to 10", count=len(waypoints))
-        waypoints = waypoints[:10]
 
-    origin_param = _normalize_coord(origin_lat, origin_lon)
-    coords_param = _coords_list_param(waypoints)
+    origin = snap(origin_lat, origin_lon)
+    points = route_waypoints(waypoints)
+    origin_param = _normalize_coord(*origin)
+    coords_param = _coords_list_param(points)
     url = (
         f"{settings.ONM_API_BASE}?json=[{coords_param}]&origin={origin_param}&apiKey={settings.GEBETA_API_KEY}"
     )
 
-    redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-    cache_key = f"onm:{origin_param}:[{coords_param}]"
-    cached = await redis.get(cache_key)
-    if cached:
+    cache_key = route_cache_key(origin, points)
+    cached = await _cached("onm", cache_key)
+    if cached is not _MISS:
         logger.info("ONM cache hit", cache_key=cache_key)
-        return json.loads(cached)
+        return {**cached, "waypoints": [list(p) for p in points]} if isinstance(cached, dict) else cached
 
     logger.info("ONM cache miss", url=url)
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with upstream_client(timeout=30) as client:
         resp = await client.get(url)
         try:
             resp.raise_for_status()
@@ -66,15 +140,32 @@ async def onm_route(origin_lat: float, origin_lon: float, waypoints: List[Tuple[
             logger.error("ONM error", status=e.response.status_code, text=e.response.text)
             raise
         data = resp.json()
-        await redis.setex(cache_key, 600, json.dumps(data))
-        return data
+        await get_redis().setex(cache_key, settings.ONM_CACHE_TTL_SECONDS, json.dumps(data))
+        _LOCAL.set(cache_key, data)
+        return {**data, "waypoints": [list(p) for p in points]} if isinstance(data, dict) else data
 
 
 @retry(tries=3, delay=1, backoff=2)
+async def fetch_matrix(points: List[Coord]) -> Dict[str, Any]:
+    """
+    Uncached Gebeta Matrix call for at most 10 coordinates, sent as given.
+    """
+    url = f"{settings.MATRIX_API_BASE}?json=[{_coords_list_param(points)}]&apiKey={settings.GEBETA_API_KEY}"
+    logger.info("Matrix request", url=url)
+    async with upstream_client(timeout=30) as client:
+        resp = await client.get(url)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error("Matrix error", status=e.response.status_code, text=e.response.text)
+            raise
+        return resp.json()
+
+
 async def matrix(coords: List[Tuple[float, float]]) -> Dict[str, Any]:
     """
-    Call Gebeta Matrix API for a set of coordinates (<= 10 as per docs).
-    Returns JSON response from Gebeta.
+    Call Gebeta Matrix API for a set of coordinates (<= 10 as per docs), snapped like ONM waypoints.
+    Returns JSON response from Gebeta; each cell is also cached as an origin->destination leg.
     """
     if len(coords) < 2:
         raise ValueError("Matrix requires at least two coordinates")
@@ -82,36 +173,78 @@ async def matrix(coords: List[Tuple[float, float]]) -> Dict[str, Any]:
         logger.warning("Matrix coords exceed limit; trimming to 10", count=len(coords))
         coords = coords[:10]
 
-    coords_param = _coords_list_param(coords)
-    url = f"{settings.MATRIX_API_BASE}?json=[{coords_param}]&apiKey={settings.GEBETA_API_KEY}"
-
-    redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-    cache_key = f"matrix:[{coords_param}]"
-    cached = await redis.get(cache_key)
-    if cached:
+    points = [snap(*c) for c in coords]
+    cache_key = f"matrix:[{_coords_list_param(points)}]"
+    cached = await _cached("matrix", cache_key)
+    if cached is not _MISS:
         logger.info("Matrix cache hit", cache_key=cache_key)
-        return json.loads(cached)
+        return cached
 
-    logger.info("Matrix cache miss", url=url)
-    async with httpx.AsyncClient(timeout=30) as client:
-        resp = await client.get(url)
-        try:
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            logger.error("Matrix error", status=e.response.status_code, text=e.response.text)
-            raise
-        data = resp.json()
-        await redis.setex(cache_key, 600, json.dumps(data))
-        return data
+    data = await fetch_matrix(points)
+    await get_redis().setex(cache_key, settings.MATRIX_CACHE_TTL_SECONDS, json.dumps(data))
+    _LOCAL.set(cache_key, data)
+    await _store_legs(points, data)
+    return data
+
+
+def distance_rows(resp: Any) -> Optional[List[list]]:
+    """
+    Distance rows of a Matrix response (the schema varies), or None.
+    """
+    if not isinstance(resp, dict):
+        return None
+    rows = resp.get("distances") or resp.get("distance") or resp.get("matrix")
+    return rows if isinstance(rows, list) and rows else None
+
+
+def distance_km(value: Any) -> float:
+    """
+    Matrix distance as km; the unit varies, so values above 1000 are taken to be metres.
+    """
+    value = float(value)
+    return value / 1000.0 if value > 1000 else value
+
+
+async def origin_matrix(coords: List[Coord]) -> Dict[str, Any]:
+    """
+    Matrix response holding at least the row of the first coordinate (the origin). Assembled from
+    cached legs when every origin->destination leg is known, otherwise a matrix() call.
+    """
+    points = [snap(*c) for c in coords[:10]]
+    if len(points) >= 2:
+        origin = points[0]
+        destinations = [p for p in points[1:] if p != origin]
+        values = await get_redis().mget([leg_cache_key(origin, p) for p in destinations]) if destinations else []
+        if all(v is not None for v in values):
+            legs = dict(zip(destinations, (json.loads(v) for v in values)))
+            fields = set.intersection(*(set(leg) for leg in legs.values())) if legs else set()
+            if fields:
+                record_cache("matrix", True)
+                logger.info("Matrix served from cached legs", legs=len(legs))
+                return {
+                    field: [[0.0 if p == origin else legs[p][field] for p in points]]
+                    for field in sorted(fields)
+                }
+    return await matrix(coords)
 
 
 def get_destinations_from_dataset() -> List[Dict[str, Any]]:
     return load_routes_dataset()
 
 
-def resolve_destinations_by_name(names: List[str]) -> List[Tuple[float, float]]:
+def destination_index() -> Dict[str, Coord]:
+    """
+    Lower-cased destination name -> coordinate, built once per loaded dataset.
+    """
+    global _DEST_INDEX
     data = load_routes_dataset()
-    idx = {item["destination"].lower(): (item["dest_lat"], item["dest_lon"]) for item in data}
+    if _DEST_INDEX is None or _DEST_INDEX[0] is not data:
+        _DEST_INDEX = (data, {item["destination"].lower(): (item["dest_lat"], item["dest_lon"]) for item in data})
+    return _DEST_INDEX[1]
+
+
+def resolve_destinations_by_name(names: List[str]) -> List[Tuple[float, float]]:
+    idx = destination_index()
     coords: List[Tuple[float, float]] = []
     for n in names:
         c = idx.get(n.lower())
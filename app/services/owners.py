@@ -0,0 +1,145 @@
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+from app.config import settings
+from app.core.cache import LocalCache
+from app.core.db import get_engine
+from app.core.metrics import record_cache
+from app.core.redis import get_redis
+from app.services.user import get_users_contact_info
+
+logger = get_logger()
+
+# Cached for users the source does not know, so listings of deleted owners do not re-query
+NOT_FOUND = "__not_found__"
+_MISS = object()
+
+_LOCAL = LocalCache(settings.OWNER_CONTACT_LOCAL_CACHE_SIZE, settings.OWNER_CONTACT_LOCAL_TTL_SECONDS, name="owner")
+
+Contact = Dict[str, Optional[str]]
+
+
+class OwnerContacts(Dict[str, Optional[Contact]]):
+    """
+    Contacts by owner id (None for owners the source does not know). `failed` holds the owners
+    whose lookup failed: rows built from them carry an empty contact that must not be cached long.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failed: Set[str] = set()
+
+    def degraded(self, owner_id: Optional[str]) -> bool:
+        return owner_id is not None and str(owner_id) in self.failed
+
+
+def owner_cache_key(user_id: str) -> str:
+    return f"owner:{user_id}"
+
+
+def empty_contact() -> Contact:
+    return {"name": None, "email": None, "phone": None}
+
+
+async def _load_from_db(user_ids: List[str]) -> Dict[str, Optional[Contact]]:
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(
+            text("""
+                SELECT id::text AS id, full_name, email, phone_number
+                FROM users
+                WHERE id = ANY(CAST(:ids AS uuid[]))
+            """),
+            {"ids": user_ids},
+        )
+        rows = {row["id"]: row for row in result.mappings()}
+    return {
+        user_id: {"name": rows[user_id]["full_name"], "email": rows[user_id]["email"], "phone": rows[user_id]["phone_number"]}
+        if user_id in rows else None
+        for user_id in user_ids
+    }
+
+
+async def _load(user_ids: List[str]) -> Dict[str, Optional[Contact]]:
+    if settings.OWNER_CONTACT_SOURCE == "user_service":
+        return await get_users_contact_info(user_ids)
+    return await _load_from_db(user_ids)
+
+
+async def get_owner_contacts(user_ids: Iterable[Optional[str]]) -> OwnerContacts:
+    """
+    Contacts for the distinct owners of a result page: in-process cache, then one Redis MGET,
+    then one lookup (DB or user service) for the rest. Unknown owners map to None.
+    A failing source is logged and leaves its owners out (listed in `failed`), without caching
+    anything for them.
+    """
+    pending = list(dict.fromkeys(str(u) for u in user_ids if u))
+    contacts = OwnerContacts()
+    if not pending:
+        return contacts
+
+    for user_id in pending:
+        value = _LOCAL.get(user_id, _MISS)
+        if value is not _MISS:
+            contacts[user_id] = value
+
+    redis = get_redis()
+    pending = [u for u in pending if u not in contacts]
+    if pending:
+        try:
+            cached = await redis.mget([owner_cache_key(u) for u in pending])
+        except Exception as e:
+            logger.warning("Owner cache read failed", error=str(e))
+            cached = [None] * len(pending)
+        for user_id, value in zip(pending, cached):
+            record_cache("owner", value is not None)
+            if value is not None:
+                contacts[user_id] = None if value == NOT_FOUND else json.loads(value)
+                _LOCAL.set(user_id, contacts[user_id])
+
+    missing = [u for u in pending if u not in contacts]
+    if missing:
+        try:
+            loaded = await _load(missing)
+        except Exception as e:
+            logger.warning("Owner contact lookup failed", source=settings.OWNER_CONTACT_SOURCE, count=len(missing), error=str(e))
+            contacts.failed.update(missing)
+            return contacts
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id in missing:
+                    contact = loaded.get(user_id)
+                    if contact is None:
+                        pipe.setex(owner_cache_key(user_id), settings.OWNER_CONTACT_NEGATIVE_TTL_SECONDS, NOT_FOUND)
+                    else:
+                        pipe.setex(owner_cache_key(user_id), settings.OWNER_CONTACT_TTL_SECONDS, json.dumps(contact))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Owner cache write failed", error=str(e))
+        for user_id in missing:
+            contact = loaded.get(user_id)
+            contacts[user_id] = contact
+            _LOCAL.set(user_id, contact, ttl=None if contact is not None else settings.OWNER_CONTACT_NEGATIVE_TTL_SECONDS)
+    return contacts
+
+
+async def owners_for(listings: List[dict], fields: Optional[Tuple[str, ...]] = None) -> Optional[OwnerContacts]:
+    """
+    Owner contacts for raw rows that carry owner_id, or None when the projection has no owner_contact.
+    """
+    if fields and "owner_contact" not in fields:
+        return None
+    return await get_owner_contacts(listing.get("owner_id") for listing in listings)
+
+
+def result_ttl(ttl: int, owners: Optional[OwnerContacts]) -> int:
+    """
+    Cache TTL for rows enriched with `owners`: OWNER_CONTACT_OUTAGE_TTL_SECONDS when some contact
+    lookups failed, so the outage's empty contacts are not served for the full TTL.
+    """
+    if owners is not None and owners.failed:
+        return min(ttl, settings.OWNER_CONTACT_OUTAGE_TTL_SECONDS)
+    return ttl
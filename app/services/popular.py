@@ -0,0 +1,130 @@
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from structlog import get_logger
+
+from app.config import settings
+from app.core.redis import get_redis
+from app.services.search import search_cache_key, search_properties
+from app.utils.amenities import canonical
+
+logger = get_logger()
+
+# Sorted set of canonical search criteria scored by decayed request counts. Kept outside search:*
+# so clearing the result caches does not forget what is popular.
+POPULAR_KEY = "popular_searches"
+DECAYED_AT_KEY = "popular_searches:decayed_at"
+# Entries decayed below this (half a request) are dropped
+MIN_SCORE = 0.5
+
+# Requests counted in this worker since the last flush
+_PENDING: Counter = Counter()
+
+
+def canonical_query(criteria: Dict[str, Any]) -> str:
+    """
+    Stable member for search_properties() keyword arguments: canonical, sorted amenities and sorted keys.
+    """
+    query = dict(criteria)
+    amenities = query.get("amenities")
+    query["amenities"] = sorted(canonical(a) or a for a in amenities) if amenities else None
+    fields = query.get("fields")
+    query["fields"] = list(fields) if fields else None
+    return json.dumps(query, sort_keys=True, separators=(",", ":"))
+
+
+def query_criteria(member: str) -> Dict[str, Any]:
+    criteria = json.loads(member)
+    if criteria.get("fields"):
+        criteria["fields"] = tuple(criteria["fields"])
+    return criteria
+
+
+def track_query(criteria: Dict[str, Any]) -> None:
+    """
+    Count one /search request. New queries are not counted while SEARCH_POPULAR_MAX_PENDING are pending.
+    """
+    member = canonical_query(criteria)
+    if member in _PENDING or len(_PENDING) < settings.SEARCH_POPULAR_MAX_PENDING:
+        _PENDING[member] += 1
+
+
+async def flush_queries() -> int:
+    """
+    Add this worker's pending counts to the shared sorted set. Returns the number of queries flushed.
+    """
+    if not _PENDING:
+        return 0
+    pending = dict(_PENDING)
+    _PENDING.clear()
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for member, count in pending.items():
+                pipe.zincrby(POPULAR_KEY, count, member)
+            await pipe.execute()
+    except Exception as e:
+        # Popularity is a heuristic; losing a few seconds of counts is fine
+        logger.warning("Popular search flush failed", queries=len(pending), error=str(e))
+        return 0
+    return len(pending)
+
+
+async def decay_queries(now: Optional[float] = None) -> float:
+    """
+    Scale every score by 0.5 per SEARCH_POPULAR_HALF_LIFE_SECONDS since the last decay, then drop
+    entries below MIN_SCORE and all but the SEARCH_POPULAR_MAX_TRACKED highest. Returns the factor.
+    """
+    redis = get_redis()
+    now = time.time() if now is None else now
+    last = await redis.get(DECAYED_AT_KEY)
+    await redis.set(DECAYED_AT_KEY, now)
+    if last is None:
+        return 1.0
+    factor = 0.5 ** (max(0.0, now - float(last)) / settings.SEARCH_POPULAR_HALF_LIFE_SECONDS)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.zunionstore(POPULAR_KEY, {POPULAR_KEY: factor})
+        pipe.zremrangebyscore(POPULAR_KEY, "-inf", f"({MIN_SCORE}")
+        pipe.zremrangebyrank(POPULAR_KEY, 0, -(settings.SEARCH_POPULAR_MAX_TRACKED + 1))
+        await pipe.execute()
+    return factor
+
+
+async def popular_queries(limit: int) -> List[Dict[str, Any]]:
+    """
+    The `limit` most popular searches with their decayed score and remaining cache TTL (None when not cached).
+    """
+    redis = get_redis()
+    top = await redis.zrevrange(POPULAR_KEY, 0, limit - 1, withscores=True)
+    criteria = [query_criteria(member) for member, _ in top]
+    keys = [search_cache_key("search", **c) for c in criteria]
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+        ttls = await pipe.execute()
+    return [
+        {"criteria": c, "score": round(score, 3), "cache_key": key, "cache_ttl_seconds": ttl if ttl >= 0 else None}
+        for c, (_, score), key, ttl in zip(criteria, top, keys, ttls)
+    ]
+
+
+async def refresh_popular_searches() -> Dict[str, int]:
+    """
+    Decay popularity, then rebuild the SEARCH_POPULAR_TOP_N cached results that are missing or
+    expire within two refresh intervals, so popular queries never go cold.
+    """
+    await decay_queries()
+    top = await popular_queries(settings.SEARCH_POPULAR_TOP_N)
+    horizon = 2 * settings.SEARCH_POPULAR_REFRESH_SECONDS
+    stale = [q for q in top if q["cache_ttl_seconds"] is None or q["cache_ttl_seconds"] < horizon]
+    failed = 0
+    # One at a time: this is background work and should not compete with requests for the pool
+    for query in stale:
+        try:
+            await search_properties(**query["criteria"], refresh=True)
+        except Exception as e:
+            failed += 1
+            logger.warning("Popular search refresh failed", cache_key=query["cache_key"], error=str(e))
+    logger.info("Popular searches refreshed", top=len(top), refreshed=len(stale) - failed, failed=failed)
+    return {"top": len(top), "refreshed": len(stale) - failed, "failed": failed}
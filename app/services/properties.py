@@ -0,0 +1,168 @@
+import json
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from structlog import get_logger
+
+from app.config import settings
+from app.core.cache import LocalCache
+from app.core.db import get_engine
+from app.core.metrics import record_cache
+from app.core.redis import get_redis
+from app.services.owners import owners_for
+from app.services.search import DEFAULT_CENTER, enrich_listings, select_columns
+from app.utils.geo import haversine_km
+
+logger = get_logger()
+
+# Cached in Redis for unknown ids so 404 floods do not reach Postgres
+NOT_FOUND = "__not_found__"
+_MISS = object()
+
+# Hot rows stay in-process; every worker's change-feed listener drops changed ids
+_LOCAL = LocalCache(settings.PROPERTY_LOCAL_CACHE_SIZE, settings.PROPERTY_LOCAL_TTL_SECONDS, name="property")
+
+
+def property_cache_key(prop_id: str) -> str:
+    return f"property:{prop_id}"
+
+
+def _normalize_ids(ids: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Split requested ids into canonical UUID strings (deduplicated, in order) and malformed ones.
+    """
+    valid: List[str] = []
+    invalid: List[str] = []
+    seen = set()
+    for raw in ids:
+        try:
+            prop_id = str(uuid.UUID(str(raw)))
+        except ValueError:
+            invalid.append(raw)
+            continue
+        if prop_id not in seen:
+            seen.add(prop_id)
+            valid.append(prop_id)
+    return valid, invalid
+
+
+async def _load_properties(prop_ids: List[str]) -> Tuple[Dict[str, dict], Set[str]]:
+    """
+    Rows by id, plus the ids whose owner contact could not be looked up (cache those briefly).
+    """
+    columns, _ = select_columns(None, "0.0")
+    async with AsyncSession(get_engine()) as db:
+        result = await db.execute(
+            text(f"""
+                SELECT {columns}
+                FROM properties p
+                WHERE p.id = ANY(CAST(:ids AS uuid[]))
+            """),
+            {"ids": prop_ids},
+        )
+        rows = [dict(row) for row in result.mappings()]
+    owners = await owners_for(rows)
+    degraded = {str(row["id"]) for row in rows if owners.degraded(row.get("owner_id"))}
+    rows = enrich_listings(rows, owners=owners)
+    for row in rows:
+        # Distance from the default center, computed here instead of per row in SQL
+        if row.get("lat") is not None and row.get("lon") is not None:
+            row["distance_km"] = haversine_km(DEFAULT_CENTER[0], DEFAULT_CENTER[1], row["lat"], row["lon"])
+    return {row["id"]: row for row in rows}, degraded
+
+
+async def get_properties_by_ids(ids: List[str]) -> Tuple[List[dict], List[str]]:
+    """
+    Properties for the requested ids in request order, plus the ids that were not found.
+    Looked up in the in-process cache, then Redis (one MGET), then one query for the rest.
+    Unknown ids are cached as not-found for a short time.
+    """
+    prop_ids, not_found = _normalize_ids(ids)
+    if not prop_ids:
+        return [], not_found
+
+    found: Dict[str, Optional[dict]] = {}
+    for prop_id in prop_ids:
+        value = _LOCAL.get(prop_id, _MISS)
+        record_cache("property_local", value is not _MISS)
+        if value is not _MISS:
+            found[prop_id] = value
+
+    redis = get_redis()
+    pending = [p for p in prop_ids if p not in found]
+    if pending:
+        try:
+            cached = await redis.mget([property_cache_key(p) for p in pending])
+        except Exception as e:
+            logger.warning("Property cache read failed", error=str(e))
+            cached = [None] * len(pending)
+        for prop_id, value in zip(pending, cached):
+            record_cache("property", value is not None)
+            if value is not None:
+                found[prop_id] = None if value == NOT_FOUND else json.loads(value)
+                _LOCAL.set(prop_id, found[prop_id])
+
+    missing = [p for p in prop_ids if p not in found]
+    if missing:
+        loaded, degraded = await _load_properties(missing)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for prop_id in missing:
+                    row = loaded.get(prop_id)
+                    found[prop_id] = row
+                    if row is None:
+                        _LOCAL.set(prop_id, row, ttl=settings.PROPERTY_NEGATIVE_TTL_SECONDS)
+                        pipe.setex(property_cache_key(prop_id), settings.PROPERTY_NEGATIVE_TTL_SECONDS, NOT_FOUND)
+                    elif prop_id in degraded:
+                        # Owner contact lookup failed: keep the empty contact only briefly
+                        _LOCAL.set(prop_id, row, ttl=settings.OWNER_CONTACT_OUTAGE_TTL_SECONDS)
+                        pipe.setex(property_cache_key(prop_id), settings.OWNER_CONTACT_OUTAGE_TTL_SECONDS, json.dumps(row, default=str))
+                    else:
+                        _LOCAL.set(prop_id, row)
+                        pipe.setex(property_cache_key(prop_id), settings.PROPERTY_CACHE_TTL_SECONDS, json.dumps(row, default=str))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Property cache write failed", error=str(e))
+            for prop_id in missing:
+                found[prop_id] = loaded.get(prop_id)
+
+    properties = [found[p] for p in prop_ids if found.get(p) is not None]
+    not_found.extend(p for p in prop_ids if found.get(p) is None)
+    return properties, not_found
+
+
+async def get_property_by_id(prop_id: str) -> Optional[dict]:
+    properties, _ = await get_properties_by_ids([prop_id])
+    return properties[0] if properties else None
+
+
+async def resync_property_cache(gap_seconds: float) -> int:
+    """
+    Change-feed resync: changes made while the listener was disconnected are unknown, so drop
+    every cached row (in-process and, with SCAN, in Redis). Returns Redis keys deleted.
+    """
+    _LOCAL.clear()
+    redis = get_redis()
+    deleted = 0
+    batch: List[str] = []
+    async for key in redis.scan_iter(match=property_cache_key("*"), count=500):
+        batch.append(key)
+        if len(batch) >= 500:
+            deleted += await redis.delete(*batch)
+            batch = []
+    if batch:
+        deleted += await redis.delete(*batch)
+    logger.info("Property caches dropped after a change-feed gap", gap_seconds=round(gap_seconds, 3), deleted=deleted)
+    return deleted
+
+
+async def invalidate_property(event: Dict[str, Any]) -> None:
+    """
+    Change-feed subscriber: drop the cached row (or not-found marker) of a changed property.
+    """
+    if event.get("id"):
+        prop_id = str(event["id"])
+        _LOCAL.delete(prop_id)
+        await get_redis().delete(property_cache_key(prop_id))
@@ -0,0 +1,189 @@
+import argparse
+import ast
+import asyncio
+import json
+import mmap
+import os
+import struct
+import sys
+from math import isnan, nan
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from structlog import get_logger
+
+from app.config import settings
+from app.services.onm import Coord, distance_km, distance_rows, fetch_matrix, load_routes_dataset, snap
+from app.utils.geo import haversine_km
+
+logger = get_logger()
+
+# Matrix calls take at most 10 points: pairs of 5-node blocks cover every pair of nodes
+MATRIX_POINTS = 10
+BLOCK = MATRIX_POINTS // 2
+
+NPY_MAGIC = b"\x93NUMPY"
+
+_STORE: Optional["RouteMatrix"] = None
+_LOADED = False
+
+
+def dataset_nodes(dataset: List[Dict[str, Any]]) -> List[Coord]:
+    """
+    Distinct snapped destinations of the routes dataset, in dataset order.
+    """
+    return list(dict.fromkeys(snap(item["dest_lat"], item["dest_lon"]) for item in dataset))
+
+
+def nodes_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def write_npy(path: str, rows: List[List[float]]) -> None:
+    """
+    Square float32 matrix as a NumPy .npy (v1.0) file, written with the standard library.
+    """
+    size = len(rows)
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (size, size)
+    header += " " * (-(len(NPY_MAGIC) + 4 + len(header) + 1) % 64) + "\n"
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1"))
+        for row in rows:
+            f.write(struct.pack(f"<{size}f", *row))
+    os.replace(tmp, path)
+
+
+class RouteMatrix:
+    """
+    Node-to-node travel distances (km) memory-mapped from a float32 .npy file; rows are read
+    on demand, so workers share the pages and load nothing up front.
+    """
+
+    def __init__(self, path: str, nodes: List[Coord]):
+        if sys.byteorder != "little":
+            raise ValueError("Route matrix files are little-endian float32")
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:6] != NPY_MAGIC:
+            raise ValueError(f"{path} is not a .npy file")
+        if self._mmap[6] == 1:
+            (header_len,) = struct.unpack_from("<H", self._mmap, 8)
+            offset = 10
+        else:
+            (header_len,) = struct.unpack_from("<I", self._mmap, 8)
+            offset = 12
+        header = ast.literal_eval(self._mmap[offset:offset + header_len].decode("latin1"))
+        shape = header["shape"]
+        if header["descr"] != "<f4" or header["fortran_order"] or len(shape) != 2 or shape != (len(nodes), len(nodes)):
+            raise ValueError(f"{path} does not hold a {len(nodes)}x{len(nodes)} float32 matrix")
+        self.nodes = nodes
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self._values = memoryview(self._mmap)[offset + header_len:].cast("f")
+
+    def row(self, i: int) -> List[float]:
+        size = len(self.nodes)
+        return self._values[i * size:(i + 1) * size].tolist()
+
+
+def get_route_matrix() -> Optional[RouteMatrix]:
+    """
+    The store at ROUTE_MATRIX_PATH, loaded once; None when missing or built for another dataset.
+    """
+    global _STORE, _LOADED
+    if not _LOADED:
+        _LOADED = True
+        path = settings.ROUTE_MATRIX_PATH
+        try:
+            with open(nodes_path(path), "r", encoding="utf-8") as f:
+                nodes = [tuple(node) for node in json.load(f)["nodes"]]
+            if nodes != dataset_nodes(load_routes_dataset()):
+                logger.warning("Route matrix does not match the routes dataset; rebuild it", path=path)
+            else:
+                _STORE = RouteMatrix(path, nodes)
+        except FileNotFoundError:
+            logger.info("No route matrix; /onm/nearest uses the live Matrix API", path=path)
+        except Exception as e:
+            logger.warning("Route matrix could not be loaded", path=path, error=str(e))
+    return _STORE
+
+
+def reset_route_matrix() -> None:
+    global _STORE, _LOADED
+    _STORE = None
+    _LOADED = False
+
+
+def rank_from_store(origin_lat: float, origin_lon: float, dataset: List[Dict[str, Any]]) -> Optional[List[Tuple[int, float]]]:
+    """
+    (dataset index, km) for every destination without an upstream call: the origin is snapped to the
+    ROUTE_MATRIX_SNAP_NODES closest nodes within ROUTE_MATRIX_SNAP_KM, and each destination scores
+    the best straight approach plus stored travel distance. None when no store or no node is close.
+    """
+    store = get_route_matrix()
+    if store is None:
+        return None
+    near = sorted((haversine_km(origin_lat, origin_lon, lat, lon), i) for i, (lat, lon) in enumerate(store.nodes))
+    near = [(km, i) for km, i in near[:settings.ROUTE_MATRIX_SNAP_NODES] if km <= settings.ROUTE_MATRIX_SNAP_KM]
+    if not near:
+        return None
+    rows = {i: store.row(i) for _, i in near}
+
+    ranking: List[Tuple[int, float]] = []
+    for idx, item in enumerate(dataset):
+        j = store.index[snap(item["dest_lat"], item["dest_lon"])]
+        scores = [km + (0.0 if i == j else rows[i][j]) for km, i in near if i == j or not isnan(rows[i][j])]
+        if scores:
+            ranking.append((idx, min(scores)))
+        else:
+            ranking.append((idx, haversine_km(origin_lat, origin_lon, float(item["dest_lat"]), float(item["dest_lon"]))))
+    return ranking
+
+
+async def build_route_matrix(
+    nodes: List[Coord],
+    fetch: Callable[[List[Coord]], Awaitable[Dict[str, Any]]] = fetch_matrix,
+) -> List[List[float]]:
+    """
+    Node-to-node distances (km, NaN where the API gave none) from Matrix calls of at most 10 points.
+    """
+    size = len(nodes)
+    rows = [[0.0 if i == j else nan for j in range(size)] for i in range(size)]
+    blocks = [list(range(start, min(start + BLOCK, size))) for start in range(0, size, BLOCK)]
+    if len(blocks) <= 2:
+        batches = [list(range(size))] if size > 1 else []
+    else:
+        batches = [a + b for n, a in enumerate(blocks) for b in blocks[n + 1:]]
+
+    for count, batch in enumerate(batches, start=1):
+        distances = distance_rows(await fetch([nodes[i] for i in batch]))
+        if not distances or len(distances) != len(batch):
+            logger.warning("Matrix response without a full distance table", batch=count)
+            continue
+        for a, row in zip(batch, distances):
+            for b, value in zip(batch, row):
+                if a != b and value is not None:
+                    rows[a][b] = distance_km(value)
+        logger.info("Route matrix batch done", batch=count, batches=len(batches))
+    return rows
+
+
+async def build(path: str) -> int:
+    nodes = dataset_nodes(load_routes_dataset())
+    rows = await build_route_matrix(nodes)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    write_npy(path, rows)
+    with open(nodes_path(path), "w", encoding="utf-8") as f:
+        json.dump({"nodes": [list(node) for node in nodes]}, f)
+    return len(nodes)
+
+
+def cli(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute the routes-dataset distance matrix for /onm/nearest")
+    parser.add_argument("--output", default=settings.ROUTE_MATRIX_PATH, help="Target .npy file (node list goes next to it as .json)")
+    args = parser.parse_args(argv)
+    count = asyncio.run(build(args.output))
+    print(f"Wrote {count}x{count} route matrix to {args.output}")
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,15 +1,223 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
 from app.config import settings
+from app.core.db import get_engine
+from app.core.metrics import record_cache, stage_timer
 from structlog import get_logger
-from redis.asyncio import Redis
+from app.core.redis import get_redis
+import asyncio
 import json
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from app.schemas.search import SavedSearchRequest # Added this import
 from app.models.search import SavedSearch
+from app.utils.geo import bounding_box
+from app.utils.amenities import canonical, required_mask
+from app.utils.geohash import covering_ranges, range_condition
+from app.services.owners import empty_contact, owners_for, result_ttl
 
 logger = get_logger()
 
+# Distance scoping is relative to Adama center until locations are geocoded
+DEFAULT_CENTER = (8.5408, 39.2682)
+
+# Columns a client can select with `fields=`, mapped to their SELECT expression
+# (distance_km depends on the query). map_url, preview_url and owner_contact
+# are derived after the query; thumbnail is the first photo only.
+FIELD_COLUMNS = {
+    "id": "p.id::text as id",
+    "title": "p.title",
+    "description": "p.description",
+    "location": "p.location",
+    "price": "p.price",
+    "house_type": "p.house_type",
+    "amenities": "p.amenities",
+    "photos": "p.photos",
+    "thumbnail": "p.photos->>0 AS thumbnail",
+    "lat": "p.lat",
+    "lon": "p.lon",
+    "distance_km": None,
+}
+DERIVED_FIELDS = ("map_url", "preview_url", "owner_contact")
+ALL_FIELDS = tuple(FIELD_COLUMNS) + DERIVED_FIELDS
+# What a request without `fields=` returns (the full SearchResponse)
+FULL_FIELDS = tuple(f for f in ALL_FIELDS if f != "thumbnail")
+# Compact preset for map/list screens
+CARD_FIELDS = ("id", "title", "price", "lat", "lon", "thumbnail")
+# Lifetime of search:* result entries
+SEARCH_CACHE_TTL_SECONDS = 3600
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse `fields=` ("card" or a comma-separated list) into a canonical tuple; None means the full row.
+    Raises ValueError for unknown fields.
+    """
+    if not fields or not fields.strip():
+        return None
+    if fields.strip() == "card":
+        return CARD_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - set(ALL_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # id is always returned so clients can open the full property
+    return tuple(f for f in ALL_FIELDS if f in requested or f == "id")
+
+def select_columns(fields: Optional[Tuple[str, ...]], distance_sql: str) -> Tuple[str, bool]:
+    """
+    SELECT list for a projection, and whether owner contacts are needed (looked up
+    per page by app.services.owners from the selected owner_id, not joined).
+    """
+    wanted = set(fields or FULL_FIELDS)
+    if wanted & {"map_url", "preview_url"}:
+        wanted |= {"lat", "lon"}
+    columns = []
+    for name, column in FIELD_COLUMNS.items():
+        if name in wanted:
+            columns.append(f"{distance_sql} AS distance_km" if name == "distance_km" else column)
+    needs_owner = "owner_contact" in wanted
+    if needs_owner:
+        columns.append("p.user_id::text AS owner_id")
+    return ", ".join(columns), needs_owner
+
+def map_links(lat: Optional[float], lon: Optional[float]) -> Tuple[Optional[str], Optional[str]]:
+    if lat is None or lon is None:
+        return None, None
+    return (
+        f"https://mapapi.gebeta.app/staticmap?center={lat},{lon}&zoom=14&size=600x300&apiKey={settings.GEBETA_API_KEY}",
+        f"/api/v1/map/preview?lat={lat}&lon={lon}&zoom=14",
+    )
+
+def enrich_listings(
+    listings: List[dict],
+    fields: Optional[Tuple[str, ...]] = None,
+    owners: Optional[Dict[str, Optional[dict]]] = None,
+) -> List[dict]:
+    """
+    Add map links and owner contact (from `owners`, keyed by owner_id) to fresh rows,
+    then trim them to the projection.
+    """
+    wanted = fields or FULL_FIELDS
+    with_links = "map_url" in wanted or "preview_url" in wanted
+    with_owner = "owner_contact" in wanted
+    projected = []
+    for listing in listings:
+        coerce_numbers(listing)
+        if with_links:
+            # Ensure map link is centered on the property but scoped in context of Adama
+            listing["map_url"], listing["preview_url"] = map_links(listing.get("lat"), listing.get("lon"))
+        if with_owner:
+            # Owners unknown to the user source keep an empty contact, as a missed join did
+            contact = (owners or {}).get(listing.pop("owner_id", None))
+            listing["owner_contact"] = dict(contact) if contact else empty_contact()
+        projected.append({k: listing.get(k) for k in fields} if fields else listing)
+    return projected
+
+def coerce_numbers(listing: dict) -> bool:
+    """
+    NUMERIC columns arrive as Decimal (and older cache entries hold them as strings);
+    store plain floats so cached rows can be serialized without validation.
+    """
+    changed = False
+    for key in ("price", "distance_km"):
+        value = listing.get(key)
+        if value is not None and not isinstance(value, float):
+            listing[key] = float(value)
+            changed = True
+    return changed
+
+def refresh_cached_links(listings: List[dict], fields: Optional[Tuple[str, ...]] = None) -> bool:
+    """
+    Bring map links in cached rows up to date (API key changes, older cache entries).
+    Returns True if anything changed.
+    """
+    wanted = fields or FULL_FIELDS
+    if "map_url" not in wanted and "preview_url" not in wanted:
+        return False
+    changed = False
+    for listing in listings:
+        lat = listing.get("lat")
+        lon = listing.get("lon")
+        if lat is None and lon is None and fields:
+            # Projection without coordinates: links were computed before trimming
+            continue
+        expected_map, expected_preview = map_links(lat, lon)
+        if "map_url" in wanted and listing.get("map_url") != expected_map:
+            listing["map_url"] = expected_map
+            changed = True
+        if "preview_url" in wanted and expected_preview is None and listing.get("preview_url") is not None:
+            listing["preview_url"] = None
+            changed = True
+        if "preview_url" in wanted and expected_preview is not None and not listing.get("preview_url"):
+            listing["preview_url"] = expected_preview
+            changed = True
+    return changed
+
+def search_cache_key(
+    namespace: str,
+    location: Optional[str],
+    min_price: Optional[float],
+    max_price: Optional[float],
+    house_type: Optional[str],
+    amenities: Optional[List[str]],
+    bedrooms: Optional[int],
+    use_distance: Optional[bool],
+    max_distance_km: Optional[float],
+    sort_by: str,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> str:
+    """
+    Canonical cache key for a set of search criteria; shared by every search-derived cache.
+    """
+    # Aliases and spelling variants of the same amenity share an entry
+    amenities_str = ','.join(sorted(canonical(a) or a for a in amenities)) if amenities else ''
+    # SortByEnum from the router and the plain string replayed by the popular-search refresher must match
+    sort_by = getattr(sort_by, "value", sort_by)
+    key = f"{namespace}:{location}:{min_price}:{max_price}:{house_type}:{amenities_str}:{bedrooms}:{use_distance}:{max_distance_km}:{sort_by}"
+    if fields:
+        key += f":fields={','.join(fields)}"
+    return key
+
+def add_attribute_filters(
+    conditions: List[str],
+    params: dict,
+    min_price: Optional[float],
+    max_price: Optional[float],
+    house_type: Optional[str],
+    amenities: Optional[List[str]],
+) -> None:
+    if min_price is not None:
+        conditions.append("p.price >= :min_price")
+        params["min_price"] = min_price
+    if max_price is not None:
+        conditions.append("p.price <= :max_price")
+        params["max_price"] = max_price
+    if house_type:
+        conditions.append("p.house_type = :house_type")
+        params["house_type"] = house_type
+    if amenities:
+        # All requested amenities present: one integer check on the trigger-maintained mask.
+        # Routers reject unknown amenities; older saved searches holding one match nothing.
+        required = required_mask(amenities)
+        if required is None:
+            conditions.append("FALSE")
+        else:
+            conditions.append("(p.amenity_mask & :amenity_mask) = :amenity_mask")
+            params["amenity_mask"] = required
+
+def add_distance_filter(conditions: List[str], params: dict, max_distance_km: float) -> None:
+    """
+    Restrict to listings within max_distance_km of DEFAULT_CENTER (binds user_lat/user_lon).
+    """
+    user_lat, user_lon = DEFAULT_CENTER
+    params["user_lat"] = user_lat
+    params["user_lon"] = user_lon
+    if settings.GEOHASH_PREFILTER:
+        # Index range scans on the geohash cells of the enclosing box; earth_distance below stays exact
+        box = bounding_box(user_lat, user_lon, float(max_distance_km))
+        conditions.append(range_condition(covering_ranges(*box, max_ranges=settings.GEOHASH_MAX_RANGES), params))
+    conditions.append("earth_distance(p.earth, ll_to_earth(:user_lat, :user_lon)) <= :max_distance_meters")
+    params["max_distance_meters"] = float(max_distance_km) * 1000.0
+
 async def search_properties(
     location: Optional[str] = None,
     min_price: Optional[float] = None,
@@ -19,42 +227,30 @@ async def search_properties(
     bedrooms: Optional[int] = None,  # kept for backward compatibility; not used in query
     use_distance: Optional[bool] = True,
     max_distance_km: Optional[float] = None,
-    sort_by: str = "distance" # Default sort by distance
+    sort_by: str = "distance", # Default sort by distance
+    fields: Optional[Tuple[str, ...]] = None,  # projection from parse_fields(); None = full rows
+    refresh: bool = False,  # skip the cached entry and rebuild it (popular-search refresher)
 ) -> List[dict]:
     
-    amenities_str = ','.join(sorted(amenities)) if amenities else ''
-    cache_key = f"search:{location}:{min_price}:{max_price}:{house_type}:{amenities_str}:{bedrooms}:{use_distance}:{max_distance_km}:{sort_by}"
-    redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    cache_key = search_cache_key("search", location, min_price, max_price, house_type, amenities, bedrooms, use_distance, max_distance_km, sort_by, fields)
+    redis = get_redis()
     
-    cached = await redis.get(cache_key)
+    cached = None
+    if not refresh:
+        with stage_timer("cache_lookup"):
+            cached = await redis.get(cache_key)
+        record_cache("search", cached is not None)
     if cached:
         logger.info("Search cache hit", cache_key=cache_key)
         try:
-            listings = json.loads(cached)
+            with stage_timer("serialization"):
+                listings = json.loads(cached)
             # Ensure preview_url and map_url exist for each item (backward-compat for older cache)
-            changed = False
-            for listing in listings:
-                lat = listing.get("lat")
-                lon = listing.get("lon")
-                if lat is not None and lon is not None:
-                    expected_map = (
-                        f"https://mapapi.gebeta.app/staticmap?center={lat},{lon}&zoom=14&size=600x300&apiKey={settings.GEBETA_API_KEY}"
-                    )
-                    if listing.get("map_url") != expected_map:
-                        listing["map_url"] = expected_map
-                        changed = True
-                    if not listing.get("preview_url"):
-                        listing["preview_url"] = f"/api/v1/map/preview?lat={lat}&lon={lon}&zoom=14"
-                        changed = True
-                else:
-                    if listing.get("map_url") is not None:
-                        listing["map_url"] = None
-                        changed = True
-                    if listing.get("preview_url") is not None:
-                        listing["preview_url"] = None
-                        changed = True
+            changed = refresh_cached_links(listings, fields)
+            changed = any([coerce_numbers(listing) for listing in listings]) or changed
             if changed:
-                await redis.setex(cache_key, 3600, json.dumps(listings, default=str))
+                with stage_timer("cache_write"):
+                    await redis.setex(cache_key, SEARCH_CACHE_TTL_SECONDS, json.dumps(listings, default=str))
             return listings
         except Exception:
             # If cache is corrupted, ignore and rebuild
@@ -62,130 +258,65 @@ async def search_properties(
     
     logger.info("Search cache miss", cache_key=cache_key)
 
-    async_engine = create_async_engine(settings.DATABASE_URL)
-    async with AsyncSession(async_engine) as db:
+    async with AsyncSession(get_engine()) as db:
         params = {}
         conditions = []
         
         # Only apply distance filtering if use_distance is True and location/coordinates are provided
-        if use_distance and location and max_distance_km is not None:
+        with_distance = bool(use_distance and location and max_distance_km is not None)
+        if with_distance:
             # Use Adama center as default if no specific location coordinates provided
             # In a full implementation, you would geocode the location parameter here
-            user_lat, user_lon = 8.5408, 39.2682
-            params["user_lon"] = user_lon
-            params["user_lat"] = user_lat
-            
-            query_str = """
-                SELECT p.id::text as id, p.title, p.description, p.location, p.price, p.house_type, p.amenities, p.photos, p.lat, p.lon,
-                (earth_distance(ll_to_earth(p.lat, p.lon), ll_to_earth(:user_lat, :user_lon)) / 1000.0) AS distance_km,
-                u.full_name as owner_name, u.email as owner_email, u.phone_number as owner_phone
-                FROM properties p
-                LEFT JOIN users u ON p.user_id = u.id
-                WHERE p.status = 'APPROVED'
-            """
-            conditions.append("earth_distance(ll_to_earth(p.lat, p.lon), ll_to_earth(:user_lat, :user_lon)) <= :max_distance_meters")
-            params["max_distance_meters"] = float(max_distance_km) * 1000.0
+            distance_sql = "(earth_distance(p.earth, ll_to_earth(:user_lat, :user_lon)) / 1000.0)"
+            add_distance_filter(conditions, params, max_distance_km)
         else:
             # No distance filtering - search all approved properties
-            query_str = """
-                SELECT p.id::text as id, p.title, p.description, p.location, p.price, p.house_type, p.amenities, p.photos, p.lat, p.lon,
-                0.0 AS distance_km,
-                u.full_name as owner_name, u.email as owner_email, u.phone_number as owner_phone
-                FROM properties p
-                LEFT JOIN users u ON p.user_id = u.id
-                WHERE p.status = 'APPROVED'
-            """
-
-
-        if min_price is not None:
-            conditions.append("p.price >= :min_price")
-            params["min_price"] = min_price
-        if max_price is not None:
-            conditions.append("p.price <= :max_price")
-            params["max_price"] = max_price
-        if house_type:
-            conditions.append("p.house_type = :house_type")
-            params["house_type"] = house_type
-        if amenities:
-            # Assuming amenities is stored as a JSONB array or similar in PostgreSQL
-            # This condition checks if all provided amenities are present in the property's amenities
-            conditions.append("p.amenities @> :amenities_json")
-            params["amenities_json"] = json.dumps(amenities) # Pass as JSON string for @> operator
+            distance_sql = "0.0"
+
+        # Only the projected columns are read, from the approved-only search table (earth points
+        # precomputed); owner contacts are looked up once per page below
+        columns, _ = select_columns(fields, distance_sql)
+        query_str = f"SELECT {columns} FROM approved_property_search p"
+
+        add_attribute_filters(conditions, params, min_price, max_price, house_type, amenities)
         
         if conditions:
-            query_str += " AND " + " AND ".join(conditions)
+            query_str += " WHERE " + " AND ".join(conditions)
         
         # Add ordering
-        if sort_by == "distance" and use_distance and location and max_distance_km is not None:
-            query_str += " ORDER BY distance_km"
+        if sort_by == "distance" and with_distance:
+            query_str += f" ORDER BY {distance_sql}"
         elif sort_by == "price":
             query_str += " ORDER BY p.price"
         else:
             # Default ordering by ID for consistent results
             query_str += " ORDER BY p.id"
 
-        result = await db.execute(text(query_str), params)
-        listings = [dict(row) for row in result.mappings()]
+        with stage_timer("sql"):
+            result = await db.execute(text(query_str), params)
+            listings = [dict(row) for row in result.mappings()]
+
+    with stage_timer("enrichment"):
+        owners = await owners_for(listings, fields)
+        listings = enrich_listings(listings, fields, owners)
+
+    with stage_timer("serialization"):
+        payload = json.dumps(listings, default=str)
+    with stage_timer("cache_write"):
+        await redis.setex(cache_key, result_ttl(SEARCH_CACHE_TTL_SECONDS, owners), payload)
+    return listings
+
+def saved_searches_cache_key(user_id: str) -> str:
+    return f"saved_searches:{user_id}"
+
+async def invalidate_saved_searches(user_id: str) -> None:
+    try:
+        await get_redis().delete(saved_searches_cache_key(user_id))
+    except Exception as e:
+        logger.warning("Saved search cache invalidation failed", user_id=user_id, error=str(e))
 
-        for listing in listings:
-            if listing.get("lat") is not None and listing.get("lon") is not None:
-                # Ensure map link is centered on the property but scoped in context of Adama
-                listing["map_url"] = (
-                    f"https://mapapi.gebeta.app/staticmap?center={listing['lat']},{listing['lon']}&zoom=14&size=600x300&apiKey={settings.GEBETA_API_KEY}"
-                )
-                listing["preview_url"] = f"/api/v1/map/preview?lat={listing['lat']}&lon={listing['lon']}&zoom=14"
-            else:
-                listing["map_url"] = None # Or a default map URL
-                listing["preview_url"] = None
-            
-            # Add owner contact information from joined user data
-            listing["owner_contact"] = {
-                "name": listing.pop("owner_name", None),
-                "email": listing.pop("owner_email", None),
-                "phone": listing.pop("owner_phone", None)
-            }
-
-        await redis.setex(cache_key, 3600, json.dumps(listings, default=str))
-        return listings
-
-async def get_property_by_id(prop_id: str) -> Optional[dict]:
-    async_engine = create_async_engine(settings.DATABASE_URL)
-    async with AsyncSession(async_engine) as db:
-        # Compute distance from Adama center as context
-        query_str = """
-            SELECT p.id::text as id, p.title, p.description, p.location, p.price, p.house_type, p.amenities, p.photos, p.lat, p.lon,
-            (earth_distance(ll_to_earth(p.lat, p.lon), ll_to_earth(:user_lat, :user_lon)) / 1000.0) AS distance_km,
-            u.full_name as owner_name, u.email as owner_email, u.phone_number as owner_phone
-            FROM properties p
-            LEFT JOIN users u ON p.user_id = u.id
-            WHERE p.id = :pid
-        """
-        params = {"pid": prop_id, "user_lat": 8.5408, "user_lon": 39.2682}
-        result = await db.execute(text(query_str), params)
-        row = result.mappings().first()
-        if not row:
-            return None
-        item = dict(row)
-        if item.get("lat") is not None and item.get("lon") is not None:
-            item["map_url"] = (
-                f"https://mapapi.gebeta.app/staticmap?center={item['lat']},{item['lon']}&zoom=14&size=600x300&apiKey={settings.GEBETA_API_KEY}"
-            )
-            item["preview_url"] = f"/api/v1/map/preview?lat={item['lat']}&lon={item['lon']}&zoom=14"
-        else:
-            item["map_url"] = None
-            item["preview_url"] = None
-        
-        # Add owner contact information from joined user data
-        item["owner_contact"] = {
-            "name": item.pop("owner_name", None),
-            "email": item.pop("owner_email", None),
-            "phone": item.pop("owner_phone", None)
-        }
-        
-        return item
 async def save_search(user_id: str, request: SavedSearchRequest) -> int:
-    async_engine = create_async_engine(settings.DATABASE_URL)
-    async with AsyncSession(async_engine) as db:
+    async with AsyncSession(get_engine()) as db:
         saved_search = SavedSearch(
             user_id=user_id,
             location=request.location,
@@ -202,14 +333,25 @@ async def save_search(user_id: str, request: SavedSearchRequest) -> int:
         await db.commit()
         await db.refresh(saved_search)
         logger.info("Search saved successfully", search_id=saved_search.id, user_id=user_id, property_id=request.property_id)
-        return saved_search.id
+    await invalidate_saved_searches(user_id)
+    return saved_search.id
 
 async def get_user_saved_searches(user_id: str) -> List[dict]:
     """
-    Retrieve all saved searches for a specific user.
+    Retrieve all saved searches for a specific user (cached per user until the next save).
     """
-    async_engine = create_async_engine(settings.DATABASE_URL)
-    async with AsyncSession(async_engine) as db:
+    redis = get_redis()
+    cache_key = saved_searches_cache_key(user_id)
+    try:
+        cached = await redis.get(cache_key)
+    except Exception as e:
+        logger.warning("Saved search cache read failed", user_id=user_id, error=str(e))
+        cached = None
+    record_cache("saved_searches", cached is not None)
+    if cached:
+        return json.loads(cached)
+
+    async with AsyncSession(get_engine()) as db:
         query_str = """
             SELECT id, user_id::text, location, min_price, max_price, house_type, 
                    amenities, bedrooms, max_distance_km, created_at, photos, property_id::text
@@ -220,81 +362,85 @@ async def get_user_saved_searches(user_id: str) -> List[dict]:
         result = await db.execute(text(query_str), {"user_id": user_id})
         searches = [dict(row) for row in result.mappings()]
         logger.info("Retrieved saved searches", user_id=user_id, count=len(searches))
-        return searches
+
+    # Round-trip through JSON so cache hits and misses return the same shapes
+    payload = json.dumps(searches, default=str)
+    try:
+        await redis.setex(cache_key, settings.SAVED_SEARCH_CACHE_TTL_SECONDS, payload)
+    except Exception as e:
+        logger.warning("Saved search cache write failed", user_id=user_id, error=str(e))
+    return json.loads(payload)
+
+def saved_search_criteria(saved_search: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    search_properties() arguments for a saved search.
+    """
+    return {
+        "location": saved_search["location"],
+        "min_price": saved_search["min_price"],
+        "max_price": saved_search["max_price"],
+        "house_type": saved_search["house_type"],
+        "amenities": sorted(saved_search["amenities"]) if saved_search["amenities"] else None,
+        "bedrooms": saved_search["bedrooms"],
+        "use_distance": saved_search["max_distance_km"] is not None,
+        "max_distance_km": saved_search["max_distance_km"],
+        "sort_by": "distance",
+    }
+
+def criteria_key(criteria: Dict[str, Any]) -> Tuple:
+    return tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in sorted(criteria.items()))
 
 async def execute_saved_search(search_id: int, user_id: str) -> List[dict]:
     """
     Execute a saved search by ID and return property results.
     Verifies that the saved search belongs to the user.
     """
-    async_engine = create_async_engine(settings.DATABASE_URL)
-    async with AsyncSession(async_engine) as db:
-        # Retrieve the saved search
-        query_str = """
-            SELECT id, user_id::text, location, min_price, max_price, house_type, 
-                   amenities, bedrooms, max_distance_km, photos, property_id::text
-            FROM "SavedSearches"
-            WHERE id = :search_id AND user_id = :user_id
-        """
-        result = await db.execute(text(query_str), {"search_id": search_id, "user_id": user_id})
-        saved_search = result.mappings().first()
-        
-        if not saved_search:
-            logger.warning("Saved search not found or unauthorized", search_id=search_id, user_id=user_id)
-            return None
-        
-        # Execute the search with saved criteria
-        results = await search_properties(
-            location=saved_search["location"],
-            min_price=saved_search["min_price"],
-            max_price=saved_search["max_price"],
-            house_type=saved_search["house_type"],
-            amenities=saved_search["amenities"],
-            bedrooms=saved_search["bedrooms"],
-            use_distance=True if saved_search["max_distance_km"] is not None else False,
-            max_distance_km=saved_search["max_distance_km"],
-            sort_by="distance"
-        )
-        
-        logger.info("Executed saved search", search_id=search_id, user_id=user_id, property_id=saved_search.get("property_id"), result_count=len(results))
-        return results
+    saved_search = next((s for s in await get_user_saved_searches(user_id) if s["id"] == search_id), None)
+    if not saved_search:
+        logger.warning("Saved search not found or unauthorized", search_id=search_id, user_id=user_id)
+        return None
+
+    results = await search_properties(**saved_search_criteria(saved_search))
+    logger.info("Executed saved search", search_id=search_id, user_id=user_id, property_id=saved_search.get("property_id"), result_count=len(results))
+    return results
+
+async def execute_user_saved_searches(user_id: str) -> List[Tuple[dict, List[dict]]]:
+    """
+    Execute all of a user's saved searches; identical criteria run only once.
+    """
+    saved_searches = await get_user_saved_searches(user_id)
+    unique: Dict[Tuple, Dict[str, Any]] = {}
+    for saved_search in saved_searches:
+        criteria = saved_search_criteria(saved_search)
+        unique.setdefault(criteria_key(criteria), criteria)
 
-async def get_all_approved_properties() -> List[dict]:
+    keys = list(unique)
+    outcomes = await asyncio.gather(*(search_properties(**unique[k]) for k in keys))
+    results_by_key = dict(zip(keys, outcomes))
+    logger.info("Executed saved searches", user_id=user_id, count=len(saved_searches), unique=len(keys))
+    return [(s, results_by_key[criteria_key(saved_search_criteria(s))]) for s in saved_searches]
+
+async def get_all_approved_properties(fields: Optional[Tuple[str, ...]] = None, refresh: bool = False) -> List[dict]:
     """
     Retrieve all approved properties from the database without any filters.
-    Returns all properties with status = 'APPROVED'.
+    Returns all properties with status = 'APPROVED'. refresh=True skips the cache read (warm-up job).
     """
     cache_key = "all_approved_properties"
-    redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    if fields:
+        cache_key += f":fields={','.join(fields)}"
+    redis = get_redis()
     
     # Check cache first
-    cached = await redis.get(cache_key)
+    cached = None if refresh else await redis.get(cache_key)
+    if not refresh:
+        record_cache("search", cached is not None)
     if cached:
         logger.info("All approved properties cache hit")
         try:
             listings = json.loads(cached)
             # Ensure preview_url and map_url exist for each item
-            changed = False
-            for listing in listings:
-                lat = listing.get("lat")
-                lon = listing.get("lon")
-                if lat is not None and lon is not None:
-                    expected_map = (
-                        f"https://mapapi.gebeta.app/staticmap?center={lat},{lon}&zoom=14&size=600x300&apiKey={settings.GEBETA_API_KEY}"
-                    )
-                    if listing.get("map_url") != expected_map:
-                        listing["map_url"] = expected_map
-                        changed = True
-                    if not listing.get("preview_url"):
-                        listing["preview_url"] = f"/api/v1/map/preview?lat={lat}&lon={lon}&zoom=14"
-                        changed = True
-                else:
-                    if listing.get("map_url") is not None:
-                        listing["map_url"] = None
-                        changed = True
-                    if listing.get("preview_url") is not None:
-                        listing["preview_url"] = None
-                        changed = True
+            changed = refresh_cached_links(listings, fields)
+            changed = any([coerce_numbers(listing) for listing in listings]) or changed
             if changed:
                 await redis.setex(cache_key, 3600, json.dumps(listings, default=str))
             return listings
@@ -303,38 +449,13 @@ async def get_all_approved_properties() -> List[dict]:
     
     logger.info("All approved properties cache miss")
     
-    async_engine = create_async_engine(settings.DATABASE_URL)
-    async with AsyncSession(async_engine) as db:
-        query_str = """
-            SELECT p.id::text as id, p.title, p.description, p.location, p.price, p.house_type, p.amenities, p.photos, p.lat, p.lon,
-            0.0 AS distance_km,
-            u.full_name as owner_name, u.email as owner_email, u.phone_number as owner_phone
-            FROM properties p
-            LEFT JOIN users u ON p.user_id = u.id
-            WHERE p.status = 'APPROVED'
-            ORDER BY p.id
-        """
-        result = await db.execute(text(query_str))
+    async with AsyncSession(get_engine()) as db:
+        columns, _ = select_columns(fields, "0.0")
+        result = await db.execute(text(f"SELECT {columns} FROM approved_property_search p ORDER BY p.id"))
         listings = [dict(row) for row in result.mappings()]
-        
-        # Add map URLs and preview URLs
-        for listing in listings:
-            if listing.get("lat") is not None and listing.get("lon") is not None:
-                listing["map_url"] = (
-                    f"https://mapapi.gebeta.app/staticmap?center={listing['lat']},{listing['lon']}&zoom=14&size=600x300&apiKey={settings.GEBETA_API_KEY}"
-                )
-                listing["preview_url"] = f"/api/v1/map/preview?lat={listing['lat']}&lon={listing['lon']}&zoom=14"
-            else:
-                listing["map_url"] = None
-                listing["preview_url"] = None
-            
-            # Add owner contact information from joined user data
-            listing["owner_contact"] = {
-                "name": listing.pop("owner_name", None),
-                "email": listing.pop("owner_email", None),
-                "phone": listing.pop("owner_phone", None)
-            }
-        
-        # Cache for 1 hour
-        await redis.setex(cache_key, 3600, json.dumps(listings, default=str))
-        return listings
\ No newline at end of file
+    owners = await owners_for(listings, fields)
+    listings = enrich_listings(listings, fields, owners)
+
+    # Cache for 1 hour
+    await redis.setex(cache_key, result_ttl(3600, owners), json.dumps(listings, default=str))
+    return listings
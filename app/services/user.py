@@ -1,50 +1,37 @@
 import httpx
 from app.config import settings
+from app.core.http import upstream_client
 from structlog import get_logger
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 logger = get_logger()
 
+def contact_from_user(user_data: dict) -> Dict[str, Optional[str]]:
+    """
+    Owner contact (name, email, phone) from a user-management user record.
+    """
+    return {
+        "name": user_data.get("name") or user_data.get("full_name") or user_data.get("username"),
+        "email": user_data.get("email"),
+        "phone": user_data.get("phone") or user_data.get("phone_number")
+    }
+
 async def get_user_contact_info(user_id: str) -> Optional[Dict[str, str]]:
     """
     Fetch user contact information from the User Management service.
     Returns a dict with name, email, and phone, or None if the request fails.
     """
     try:
-        # Try the /users/{id} endpoint first
         url = f"{settings.USER_MANAGEMENT_URL}/users/{user_id}"
-        logger.info("Fetching user contact info", user_id=user_id, url=url)
-        
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstream_client(timeout=10.0) as client:
             response = await client.get(
                 url,
                 headers={"Content-Type": "application/json"}
             )
-            
-            logger.info(
-                "User service response",
-                user_id=user_id,
-                status_code=response.status_code,
-                response_text=response.text[:200] if response.text else None
-            )
-            
             if response.status_code == 200:
-                user_data = response.json()
-                contact_info = {
-                    "name": user_data.get("name") or user_data.get("full_name") or user_data.get("username"),
-                    "email": user_data.get("email"),
-                    "phone": user_data.get("phone") or user_data.get("phone_number")
-                }
-                logger.info("Successfully fetched user contact", user_id=user_id, contact_info=contact_info)
-                return contact_info
-            else:
-                logger.warning(
-                    "Failed to fetch user contact info",
-                    user_id=user_id,
-                    status_code=response.status_code,
-                    response_body=response.text[:500] if response.text else None
-                )
-                return None
+                return contact_from_user(response.json())
+            logger.warning("Failed to fetch user contact info", user_id=user_id, status_code=response.status_code)
+            return None
     except httpx.TimeoutException as e:
         logger.error(
             "Timeout fetching user contact info",
@@ -60,3 +47,25 @@ async def get_user_contact_info(user_id: str) -> Optional[Dict[str, str]]:
             error_type=type(e).__name__
         )
         return None
+
+async def get_users_contact_info(user_ids: List[str]) -> Dict[str, Optional[Dict[str, str]]]:
+    """
+    Contact info for many users with one call per USER_BULK_LOOKUP_BATCH ids.
+    Users the service does not return map to None; raises if the service cannot be reached,
+    so callers do not mistake an outage for missing users.
+    """
+    url = f"{settings.USER_MANAGEMENT_URL}{settings.USER_BULK_LOOKUP_PATH}"
+    contacts: Dict[str, Optional[Dict[str, str]]] = {}
+    async with upstream_client(timeout=10.0) as client:
+        for start in range(0, len(user_ids), settings.USER_BULK_LOOKUP_BATCH):
+            batch = user_ids[start:start + settings.USER_BULK_LOOKUP_BATCH]
+            response = await client.post(url, json={"ids": batch})
+            response.raise_for_status()
+            body = response.json()
+            users = body.get("users", []) if isinstance(body, dict) else body
+            by_id = {str(user.get("id")): user for user in users}
+            for user_id in batch:
+                user = by_id.get(user_id)
+                contacts[user_id] = contact_from_user(user) if user else None
+    logger.debug("Fetched user contacts", requested=len(user_ids), found=sum(1 for c in contacts.values() if c))
+    return contacts
@@ -0,0 +1,87 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+# Canonical amenities with their bit in properties.amenity_mask and accepted
+# aliases. Bits are stored in the database: append new amenities, never
+# renumber. Names match after lowercasing and dropping everything but [a-z0-9]
+# ("Wi-Fi", "wifi" and "WiFi" are the same key). Keep amenity_bits() in
+# sql/schema.sql and the Alembic revision in sync with this list.
+VOCABULARY: Tuple[Tuple[str, int, Tuple[str, ...]], ...] = (
+    ("WiFi", 0, ("wireless", "internet")),
+    ("Parking", 1, ("garage", "carparking")),
+    ("Security", 2, ("guard", "securityguard")),
+    ("Generator", 3, ("backuppower",)),
+    ("24/7 Water", 4, ("water", "watertank")),
+    ("Balcony", 5, ()),
+    ("Garden", 6, ()),
+    ("Elevator", 7, ("lift",)),
+    ("Furnished", 8, ()),
+    ("Kitchenette", 9, ()),
+    ("Gym", 10, ("fitness",)),
+    ("Swimming Pool", 11, ("pool",)),
+    ("Sauna", 12, ()),
+    ("Jacuzzi", 13, ()),
+    ("Rooftop Terrace", 14, ("rooftop", "terrace")),
+    ("Shared Kitchen", 15, ()),
+    ("Loading Dock", 16, ()),
+    ("Main Road Access", 17, ("mainroad",)),
+)
+
+_NON_KEY = re.compile(r"[^a-z0-9]+")
+
+
+def amenity_key(name: str) -> str:
+    return _NON_KEY.sub("", name.lower())
+
+
+_BY_KEY = {}
+for _name, _bit, _aliases in VOCABULARY:
+    for _alias in (_name,) + _aliases:
+        _BY_KEY[amenity_key(_alias)] = (_name, _bit)
+
+
+def canonical(name: str) -> Optional[str]:
+    """
+    Canonical name for an amenity or alias; None if it is not in the vocabulary.
+    """
+    found = _BY_KEY.get(amenity_key(name))
+    return found[0] if found else None
+
+
+def parse_amenities(names: Optional[Iterable[str]]) -> Tuple[List[str], List[str]]:
+    """
+    Split requested amenities into canonical names (deduplicated, in vocabulary order) and unknown ones.
+    """
+    bits = set()
+    unknown: List[str] = []
+    for name in names or []:
+        found = _BY_KEY.get(amenity_key(name))
+        if found:
+            bits.add(found[1])
+        elif name not in unknown:
+            unknown.append(name)
+    return [name for name, bit, _ in VOCABULARY if bit in bits], unknown
+
+
+def amenity_mask(names: Optional[Iterable[str]]) -> int:
+    """
+    Bitmask of the known amenities in names (unknown ones are ignored), as amenity_bits() in SQL.
+    """
+    mask = 0
+    for name in names or []:
+        found = _BY_KEY.get(amenity_key(name))
+        if found:
+            mask |= 1 << found[1]
+    return mask
+
+
+def required_mask(names: Optional[Iterable[str]]) -> Optional[int]:
+    """
+    Mask a listing must contain to have all of names; None if any is unknown (nothing can match).
+    """
+    _, unknown = parse_amenities(names)
+    return None if unknown else amenity_mask(names)
+
+
+def has_amenities(mask: int, required: Optional[int]) -> bool:
+    return required is not None and (mask & required) == required
@@ -0,0 +1,47 @@
+from math import asin, atan, cos, degrees, log, pi, radians, sin, sinh, sqrt, tan
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float):
+    """
+    (min_lat, min_lon, max_lat, max_lon) enclosing a circle of radius_km.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = radius_km / (KM_PER_DEGREE_LAT * max(cos(radians(lat)), 1e-6))
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+# Web-mercator (slippy map) tiles, same scheme as the /map/tile proxy
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def lonlat_to_tile(lon: float, lat: float, zoom: int):
+    """
+    (x, y) of the zoom-level tile containing the point.
+    """
+    lat = min(max(lat, -MAX_MERCATOR_LAT), MAX_MERCATOR_LAT)
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - log(tan(radians(lat)) + 1.0 / cos(radians(lat))) / pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(zoom: int, x: int, y: int):
+    """
+    (west, south, east, north) of a tile in degrees.
+    """
+    n = 2 ** zoom
+
+    def lat(row: int) -> float:
+        return degrees(atan(sinh(pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
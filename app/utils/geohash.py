@@ -0,0 +1,136 @@
+from typing import List, Optional, Tuple
+
+# Geohash: interleaved lon/lat bisection bits, 5 per base32 character. Cells
+# sharing a prefix are contained in the prefix's cell, and with byte-wise
+# ("C" collation) ordering every cell is one contiguous key range, so a
+# btree on properties.geohash can serve spatial prefilters.
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+STORED_PRECISION = 9  # ~4.8m x 4.8m, what the properties trigger stores
+
+_INDEX = {c: i for i, c in enumerate(BASE32)}
+
+
+def encode(lat: float, lon: float, precision: int = STORED_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    ch = bit = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch, lon_lo = ch * 2 + 1, mid
+            else:
+                ch, lon_hi = ch * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = ch * 2 + 1, mid
+            else:
+                ch, lat_hi = ch * 2, mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(BASE32[ch])
+            ch = bit = 0
+    return "".join(chars)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, min_lon, max_lat, max_lon) of a cell.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for c in geohash:
+        value = _INDEX[c]
+        for shift in range(4, -1, -1):
+            on = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if on else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if on else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """
+    (lat degrees, lon degrees) of a cell at this precision.
+    """
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** (bits - bits // 2)
+
+
+def cells_covering(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int, limit: Optional[int] = None) -> Optional[List[str]]:
+    """
+    Sorted cells of the given precision that intersect the box; None if there are more than `limit`.
+    """
+    dlat, dlon = cell_size(precision)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0 - 1e-9)
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 180.0 - 1e-9)
+    rows = int(max_lat // dlat) - int(min_lat // dlat) + 1
+    cols = int(max_lon // dlon) - int(min_lon // dlon) + 1
+    if limit is not None and rows * cols > limit:
+        return None
+    cells = set()
+    for r in range(rows):
+        lat = min(min_lat + r * dlat, max_lat)
+        for c in range(cols):
+            cells.add(encode(lat, min(min_lon + c * dlon, max_lon), precision))
+    # Row/column stepping from the box corner can skip the last partial cell
+    cells.add(encode(max_lat, max_lon, precision))
+    return sorted(cells)
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Smallest string greater than every geohash starting with prefix (None: unbounded).
+    """
+    stripped = prefix.rstrip(BASE32[-1])
+    if not stripped:
+        return None
+    return stripped[:-1] + BASE32[_INDEX[stripped[-1]] + 1]
+
+
+def covering_ranges(min_lat: float, min_lon: float, max_lat: float, max_lon: float, max_ranges: int = 16) -> List[Tuple[str, Optional[str]]]:
+    """
+    Half-open [low, high) geohash key ranges covering the box, using the finest
+    precision that keeps at most max_ranges ranges. A superset: always pair with the exact predicate.
+    """
+    best: List[Tuple[str, Optional[str]]] = [("", None)]
+    for precision in range(1, STORED_PRECISION + 1):
+        cells = cells_covering(min_lat, min_lon, max_lat, max_lon, precision, limit=max_ranges * 8)
+        if cells is None:
+            break
+        ranges: List[Tuple[str, Optional[str]]] = []
+        for cell in cells:
+            if ranges and ranges[-1][1] is not None and ranges[-1][1] == cell.rstrip(BASE32[0]):
+                ranges[-1] = (ranges[-1][0], prefix_upper_bound(cell))
+            else:
+                ranges.append((cell, prefix_upper_bound(cell)))
+        if len(ranges) > max_ranges:
+            break
+        best = ranges
+    return best
+
+
+def range_condition(ranges: List[Tuple[str, Optional[str]]], params: dict, column: str = "p.geohash", name: str = "gh") -> str:
+    """
+    SQL disjunction of key ranges (binds added to params), e.g. for a WHERE clause.
+    """
+    parts = []
+    for i, (low, high) in enumerate(ranges):
+        if not low and high is None:
+            return "TRUE"
+        params[f"{name}_lo_{i}"] = low
+        if high is None:
+            parts.append(f"{column} >= :{name}_lo_{i}")
+        else:
+            params[f"{name}_hi_{i}"] = high
+            parts.append(f"({column} >= :{name}_lo_{i} AND {column} < :{name}_hi_{i})")
+    return "(" + " OR ".join(parts) + ")"
@@ -0,0 +1,95 @@
+"""
+Per-request cost of rate limiting: fastapi-limiter's RateLimiter (one Redis Lua
+call per request) vs the in-process token bucket in app.dependencies.ratelimit,
+with an unlimited route as the baseline. Each limiter guards an otherwise empty
+route on a bare FastAPI app and is set high enough never to reject. Use
+--redis-url for a real Redis; the default in-memory fakeredis has no network
+round-trip and understates the old limiter's cost.
+
+    python -m benchmarks.bench_ratelimit --requests 5000 --concurrency 20 --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict
+
+from benchmarks.run import run_scenario
+
+LIMIT = 10 ** 9
+
+
+def build_app():
+    from fastapi import Depends, FastAPI
+    from fastapi_limiter.depends import RateLimiter
+
+    from app.dependencies.ratelimit import RateLimit
+
+    app = FastAPI()
+
+    @app.get("/none")
+    async def none():
+        return {}
+
+    @app.get("/fastapi-limiter", dependencies=[Depends(RateLimiter(times=LIMIT, seconds=60))])
+    async def redis_limited():
+        return {}
+
+    @app.get("/token-bucket", dependencies=[Depends(RateLimit(times=LIMIT, seconds=60))])
+    async def bucket_limited():
+        return {}
+
+    return app
+
+
+async def main(args) -> Dict:
+    from fastapi_limiter import FastAPILimiter
+    from httpx import AsyncClient
+
+    from app.core.redis import get_redis, use_clients
+    from app.dependencies.ratelimit import reset_buckets, sync_buckets
+
+    if args.redis_url:
+        from redis.asyncio import Redis
+        use_clients(
+            Redis.from_url(args.redis_url, encoding="utf-8", decode_responses=True),
+            Redis.from_url(args.redis_url, decode_responses=False),
+        )
+    else:
+        import fakeredis
+        server = fakeredis.FakeServer()
+        use_clients(
+            fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+            fakeredis.FakeAsyncRedis(server=server, decode_responses=False),
+        )
+    await FastAPILimiter.init(get_redis())
+    reset_buckets()
+
+    app = build_app()
+    results: Dict[str, Dict] = {}
+    try:
+        async with AsyncClient(app=app, base_url="http://bench") as client:
+            for path in ("none", "fastapi-limiter", "token-bucket"):
+                await run_scenario(client, lambda i: ("GET", f"/{path}", None), args.warmup, args.concurrency)
+                results[path] = await run_scenario(client, lambda i: ("GET", f"/{path}", None), args.requests, args.concurrency)
+                print(f"{path:>16} {json.dumps(results[path])}", file=sys.stderr)
+        # What the background task adds per sync interval, whatever the request rate
+        results["sync_buckets"] = {"keys": await sync_buckets()}
+    finally:
+        await FastAPILimiter.close()
+        await get_redis().flushdb()
+    return {"requests": args.requests, "concurrency": args.concurrency, "redis": "real" if args.redis_url else "fakeredis", "results": results}
+
+
+def cli(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default="", help="Dedicated Redis DB (flushed!); fakeredis when empty")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(main(args)), indent=2))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,94 @@
+"""
+Serialization cost of search responses: FastAPI's validated response_model path
+(List[SearchResponse] -> JSONResponse) vs the trusted orjson path used when
+FAST_SERIALIZATION is on. Needs no database or Redis.
+
+    python -m benchmarks.bench_serialization --rows 100,1000,5000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from decimal import Decimal
+from typing import Dict, List
+
+from benchmarks.catalog import generate_properties, generate_users
+
+
+def search_rows(count: int, seed: int = 42) -> List[dict]:
+    """
+    Rows as search_properties returns them for `count` approved listings.
+    """
+    from app.services.search import enrich_listings
+
+    users = generate_users(max(count // 20, 1), seed)
+    owners = {u[0]: u for u in users}
+    rows = []
+    for prop in generate_properties(count, list(owners), seed):
+        owner = owners[prop[1]]
+        rows.append({
+            "id": str(prop[0]), "title": prop[2], "description": prop[3], "location": prop[4],
+            "price": Decimal(str(prop[5])), "house_type": prop[6],
+            "amenities": json.loads(prop[7]), "photos": json.loads(prop[8]),
+            "lat": prop[10], "lon": prop[11], "distance_km": Decimal("0.0"),
+            "owner_id": str(owner[0]),
+        })
+    contacts = {str(u[0]): {"name": u[1], "email": u[2], "phone": u[3]} for u in users}
+    return enrich_listings(rows, owners=contacts)
+
+
+async def _validated(field, rows: List[dict]) -> bytes:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    content = await serialize_response(field=field, response_content=rows, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+def _fast(rows: List[dict]) -> bytes:
+    from app.core.responses import TrustedJSONResponse
+
+    return TrustedJSONResponse(rows).body
+
+
+def _best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    from app.main import app
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/api/v1/search")
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for size in sizes:
+            rows = search_rows(size)
+            validated = _best_of(lambda: loop.run_until_complete(_validated(route.response_field, rows)), repeat)
+            fast = _best_of(lambda: _fast(rows), repeat)
+            results[str(size)] = {
+                "validated_ms": round(validated * 1000, 3),
+                "fast_ms": round(fast * 1000, 3),
+                "speedup": round(validated / fast, 2) if fast else 0.0,
+                "bytes": len(_fast(rows)),
+            }
+    finally:
+        loop.close()
+    return results
+
+
+def cli(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100,1000,5000", help="Comma-separated response sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per size; the best is reported")
+    args = parser.parse_args(argv)
+    print(json.dumps(run([int(s) for s in args.rows.split(",")], args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    cli()
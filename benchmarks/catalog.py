@@ -0,0 +1,182 @@
+"""
+Synthetic property catalogs for benchmarks.
+
+Listings are clustered around real neighbourhoods of Addis Ababa and Adama with
+house types, prices and amenities drawn from distributions that resemble the
+seed data. Generation is deterministic for a given seed.
+"""
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# (name, lat, lon, spread in degrees, weight)
+AREAS = [
+    ("Bole, Addis Ababa", 9.0054, 38.7904, 0.012, 8),
+    ("Kazanchis, Addis Ababa", 9.0200, 38.7600, 0.008, 4),
+    ("CMC, Addis Ababa", 9.0350, 38.8400, 0.010, 4),
+    ("Ayat, Addis Ababa", 9.0400, 38.8800, 0.012, 3),
+    ("Piassa, Addis Ababa", 9.0330, 38.7500, 0.006, 2),
+    ("Megenagna, Addis Ababa", 9.0200, 38.8000, 0.008, 3),
+    ("Jemo, Addis Ababa", 8.9600, 38.7200, 0.010, 3),
+    ("Old Airport, Addis Ababa", 8.9800, 38.7500, 0.008, 2),
+    ("Adama", 8.5408, 39.2682, 0.020, 6),
+    ("Adama, Bole Sub-city", 8.5550, 39.2850, 0.010, 2),
+]
+
+# (house_type, weight, min price, max price)
+HOUSE_TYPES = [
+    ("apartment", 10, 6000, 45000),
+    ("studio", 5, 4000, 15000),
+    ("house", 6, 12000, 80000),
+    ("condominium", 6, 5000, 20000),
+    ("room", 4, 2500, 8000),
+    ("villa", 1, 50000, 150000),
+    ("office", 2, 8000, 60000),
+]
+
+AMENITIES = [
+    ("WiFi", 0.55), ("Parking", 0.45), ("Security", 0.40), ("Generator", 0.25),
+    ("24/7 Water", 0.30), ("Balcony", 0.20), ("Garden", 0.15), ("Elevator", 0.12),
+    ("Furnished", 0.18), ("Kitchenette", 0.10), ("Gym", 0.05), ("Swimming Pool", 0.03),
+]
+
+_FIRST = ["Abebe", "Almaz", "Dawit", "Hana", "Kebede", "Meron", "Selam", "Tesfaye", "Yonas", "Liya"]
+_LAST = ["Bekele", "Girma", "Haile", "Tadesse", "Mengistu", "Alemu", "Wolde", "Kassa"]
+
+
+def _weighted(rng: random.Random, items, weight_index: int):
+    return rng.choices(items, weights=[i[weight_index] for i in items], k=1)[0]
+
+
+def generate_users(count: int, seed: int = 42) -> List[Tuple]:
+    rng = random.Random(seed)
+    users = []
+    for i in range(count):
+        name = f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"
+        users.append((
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            name,
+            f"owner{i}@example.et",
+            f"+2519{rng.randrange(10000000, 99999999)}",
+        ))
+    return users
+
+
+def generate_properties(count: int, user_ids: List[uuid.UUID], seed: int = 42) -> Iterator[Tuple]:
+    """
+    Yield property rows in `properties` column order (see PROPERTY_COLUMNS).
+    """
+    rng = random.Random(seed + 1)
+    for i in range(count):
+        area, lat, lon, spread, _ = _weighted(rng, AREAS, 4)
+        house_type, _, low, high = _weighted(rng, HOUSE_TYPES, 1)
+        amenities = [name for name, p in AMENITIES if rng.random() < p]
+        price = round(rng.uniform(low, high) / 500) * 500
+        status = "APPROVED" if rng.random() < 0.8 else rng.choice(["PENDING", "REJECTED"])
+        photos = [f"https://cdn.example.et/p{i}_{n}.jpg" for n in range(rng.randrange(0, 6))]
+        yield (
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            rng.choice(user_ids),
+            f"{house_type.title()} in {area.split(',')[0]} #{i}",
+            f"A {house_type} with {', '.join(amenities) or 'basic finishing'} close to {area}.",
+            area,
+            float(price),
+            house_type,
+            json.dumps(amenities),
+            json.dumps(photos),
+            status,
+            lat + rng.gauss(0, spread),
+            lon + rng.gauss(0, spread),
+        )
+
+
+PROPERTY_COLUMNS = [
+    "id", "user_id", "title", "description", "location", "price",
+    "house_type", "amenities", "photos", "status", "lat", "lon",
+]
+
+USER_COLUMNS = ["id", "full_name", "email", "phone_number"]
+
+
+def generate_routes_dataset(count: int = 40, seed: int = 42) -> List[Dict]:
+    """
+    Minibus-route style records shaped like the ROUTES_DATA_PATH dataset.
+    """
+    rng = random.Random(seed + 2)
+    routes = []
+    for i in range(count):
+        area, lat, lon, spread, _ = _weighted(rng, AREAS, 4)
+        routes.append({
+            "source": "Adama" if area.startswith("Adama") else "Addis Ababa",
+            "destination": f"{area.split(',')[0]} stop {i}",
+            "kilometer": round(rng.uniform(1, 25), 1),
+            "price": round(rng.uniform(5, 60), 1),
+            "dest_lat": round(lat + rng.gauss(0, spread), 6),
+            "dest_lon": round(lon + rng.gauss(0, spread), 6),
+        })
+    return routes
+
+
+async def load_catalog(conn, size: int, seed: int = 42) -> None:
+    """
+    Recreate the schema on an asyncpg connection and bulk-load `size` properties.
+    The target database is wiped, so point this at a dedicated benchmark database.
+    """
+    schema_sql = (Path(__file__).resolve().parent.parent / "sql" / "schema.sql").read_text()
+    await conn.execute('DROP TABLE IF EXISTS properties, approved_property_search, users, "SavedSearches" CASCADE')
+    await conn.execute(schema_sql)
+    await conn.execute(
+        """
+        CREATE TABLE users (
+            id UUID PRIMARY KEY,
+            full_name VARCHAR(255),
+            email VARCHAR(255),
+            phone_number VARCHAR(32)
+        )
+        """
+    )
+    await conn.execute(
+        """
+        CREATE TABLE "SavedSearches" (
+            id SERIAL PRIMARY KEY,
+            location VARCHAR(255),
+            min_price FLOAT,
+            max_price FLOAT,
+            house_type VARCHAR(50),
+            amenities VARCHAR[],
+            bedrooms INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            max_distance_km FLOAT,
+            user_id UUID,
+            photos JSONB NOT NULL DEFAULT '[]'::jsonb,
+            property_id UUID
+        )
+        """
+    )
+    users = generate_users(max(10, size // 20), seed)
+    await conn.copy_records_to_table("users", records=users, columns=USER_COLUMNS)
+    user_ids = [u[0] for u in users]
+
+    batch: List[Tuple] = []
+    for row in generate_properties(size, user_ids, seed):
+        batch.append(row)
+        if len(batch) >= 10000:
+            await _copy_properties(conn, batch)
+            batch = []
+    if batch:
+        await _copy_properties(conn, batch)
+    await conn.execute("ANALYZE")
+
+
+async def _copy_properties(conn, rows: List[Tuple]) -> None:
+    # COPY bypasses casts, so JSONB/enum columns go through a staging insert
+    await conn.executemany(
+        """
+        INSERT INTO properties (id, user_id, title, description, location, price,
+                                house_type, amenities, photos, status, lat, lon)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8::jsonb, $9::jsonb, $10::propertystatus, $11, $12)
+        """,
+        rows,
+    )
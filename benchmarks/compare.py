@@ -0,0 +1,63 @@
+"""
+Compare two benchmark JSON reports and flag regressions.
+
+    python -m benchmarks.compare base.json head.json --tolerance 0.10
+
+Exits non-zero when any p95/p99 latency grows, or throughput drops, by more
+than the tolerance.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+# metric -> True when larger is worse
+METRICS = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "throughput_rps": False}
+GATED = ("p95_ms", "p99_ms", "throughput_rps")
+
+
+def compare(base: Dict, head: Dict, tolerance: float) -> Tuple[List[str], List[str]]:
+    lines: List[str] = []
+    regressions: List[str] = []
+    for size, scenarios in head["results"].items():
+        for scenario, stats in scenarios.items():
+            before = base.get("results", {}).get(size, {}).get(scenario)
+            if not before:
+                lines.append(f"{size:>8} {scenario:<20} (new)")
+                continue
+            cells = []
+            for metric, larger_is_worse in METRICS.items():
+                old, new = before.get(metric, 0.0), stats.get(metric, 0.0)
+                change = (new - old) / old if old else 0.0
+                cells.append(f"{metric}={new:.2f} ({change:+.1%})")
+                worse = change > tolerance if larger_is_worse else change < -tolerance
+                if worse and metric in GATED:
+                    regressions.append(f"{size}/{scenario} {metric}: {old:.2f} -> {new:.2f} ({change:+.1%})")
+            lines.append(f"{size:>8} {scenario:<20} " + "  ".join(cells))
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    print(f"base {base['meta'].get('commit', '?')[:10]}  head {head['meta'].get('commit', '?')[:10]}")
+    lines, regressions = compare(base, head, args.tolerance)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRegressions:")
+        print("\n".join(f"  {r}" for r in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
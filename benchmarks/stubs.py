@@ -0,0 +1,80 @@
+"""
+In-process stand-ins for Gebeta and the user-management service.
+
+`upstream_transport()` returns an httpx transport that answers every upstream
+call the service makes, optionally after a simulated network delay, so the
+benchmarks measure our own pipeline rather than a third party.
+"""
+import asyncio
+import json
+import re
+from math import asin, cos, radians, sin, sqrt
+from typing import List, Tuple
+
+import httpx
+
+# Smallest valid PNG (1x1 transparent pixel)
+TILE_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+TENANT = {"id": "9b3f6c1e-2d4a-4f7b-8c1d-0a5e6f7b8c9d", "role": "Tenant"}
+
+_COORD = re.compile(r"\{(-?[\d.]+),(-?[\d.]+)\}")
+
+
+def _haversine_m(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    dlat = radians(b[0] - a[0])
+    dlon = radians(b[1] - a[1])
+    h = sin(dlat / 2) ** 2 + cos(radians(a[0])) * cos(radians(b[0])) * sin(dlon / 2) ** 2
+    return 2 * 6371000.0 * asin(sqrt(h))
+
+
+def _coords(request: httpx.Request) -> List[Tuple[float, float]]:
+    return [(float(lat), float(lon)) for lat, lon in _COORD.findall(request.url.params.get("json", ""))]
+
+
+def _stub_user(user_id: str) -> dict:
+    return {"id": user_id, "full_name": "Stub Owner", "email": "owner@example.et", "phone_number": "+251911000000"}
+
+
+def _handle(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.startswith("/auth/verify"):
+        return httpx.Response(200, json=TENANT)
+    if path.startswith("/users/bulk"):
+        ids = json.loads(request.content or b"{}").get("ids", [])
+        return httpx.Response(200, json={"users": [_stub_user(user_id) for user_id in ids]})
+    if path.startswith("/users"):
+        user_id = path.rstrip("/").rsplit("/", 1)[-1]
+        return httpx.Response(200, json=_stub_user(user_id))
+    if path.startswith("/geocode"):
+        return httpx.Response(200, json=[{"name": request.url.params.get("query"), "lat": 9.0054, "lon": 38.7904}])
+    if path.startswith("/tiles/"):
+        return httpx.Response(200, content=TILE_PNG, headers={"content-type": "image/png"})
+    if path.startswith("/api/route/matrix"):
+        points = _coords(request)
+        distances = [[round(_haversine_m(a, b) * 1.3, 1) for b in points] for a in points]
+        return httpx.Response(200, json={"distances": distances})
+    if path.startswith("/api/route/onm"):
+        points = _coords(request)
+        origin = tuple(float(x) for x in request.url.params.get("origin", "0,0").split(","))
+        total = sum(_haversine_m(origin, p) for p in points) * 1.3
+        return httpx.Response(200, json={"msg": "Ok", "totalDistance": round(total, 1), "order": list(range(len(points)))})
+    if path.startswith("/notifications"):
+        body = json.loads(request.content or b"{}")
+        return httpx.Response(202, json={"accepted": len(body.get("notifications", []))})
+    return httpx.Response(404, json={"detail": f"no stub for {path}"})
+
+
+def upstream_transport(latency_ms: float = 0.0) -> httpx.AsyncBaseTransport:
+    """
+    Mock transport for every upstream host, with an optional fixed delay per call.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000.0)
+        return _handle(request)
+
+    return httpx.MockTransport(handler)
@@ -0,0 +1,11 @@
+"""
+The service app with the benchmark stand-ins installed at import, for serving it from
+worker processes (benchmarks.bench_workers): each worker gets its own fakeredis (or a
+client for BENCH_REDIS_URL) and the stubbed upstreams.
+"""
+import os
+
+from app.main import app  # noqa: F401
+from benchmarks.run import install_environment
+
+install_environment(os.environ.get("BENCH_REDIS_URL", ""), float(os.environ.get("BENCH_UPSTREAM_LATENCY_MS", "0")))
@@ -2,25 +2,20 @@
 """
 Script to clear Redis cache for the search service.
 Run this after making changes to the search queries.
+The running service can do the same with POST /api/v1/admin/jobs/clear_search_cache/run.
 """
 import asyncio
-from redis.asyncio import Redis
-from app.config import settings
+from app.core.redis import close_redis
+from app.services.maintenance import clear_search_cache
 
 async def clear_cache():
-    redis = Redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
-    
-    # Clear all search-related cache keys
-    keys = await redis.keys("search:*")
-    keys.extend(await redis.keys("all_approved_properties"))
-    
-    if keys:
-        deleted = await redis.delete(*keys)
+    deleted = await clear_search_cache()
+    if deleted:
         print(f"✓ Cleared {deleted} cache keys")
     else:
         print("✓ No cache keys found")
-    
-    await redis.close()
+
+    await close_redis()
     print("✓ Cache cleared successfully!")
 
 if __name__ == "__main__":
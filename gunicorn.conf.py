@@ -0,0 +1,48 @@
+"""
+Multi-worker mode: gunicorn supervising uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app and its read-only data are loaded once in the master and forked, so workers share those
+pages. Pools, Redis clients and background tasks are created per worker, in the lifespan startup.
+"""
+import gc
+import glob
+import os
+import tempfile
+
+# Prometheus multiprocess mode: each worker writes its metric values to files in this directory and
+# /metrics adds them up. It has to be set before prometheus_client is imported (by app.core.metrics).
+# Files left by a previous run would be added in too, so they are removed first.
+_metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus_multiproc"))
+os.makedirs(_metrics_dir, exist_ok=True)
+for _path in glob.glob(os.path.join(_metrics_dir, "*.db")):
+    os.remove(_path)
+
+from app.config import settings
+from app.core.db import worker_count
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "app.core.worker.DrainingUvicornWorker"
+workers = worker_count()
+preload_app = True
+timeout = 60
+keepalive = 5
+# SIGTERM drain (delay, then requests in flight), then background jobs get their own grace period
+graceful_timeout = int(settings.SHUTDOWN_DELAY_SECONDS + settings.SHUTDOWN_DRAIN_SECONDS + settings.JOBS_SHUTDOWN_GRACE_SECONDS) + 5
+
+
+def on_starting(server):
+    from app.main import preload
+
+    preload()
+    # Keep the preloaded objects out of the collector's reach, so collections in the workers
+    # do not write to (and un-share) their pages
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Drop the exited worker's live gauges (in-flight requests, startup steps); its counters stay summed in
+    multiprocess.mark_process_dead(worker.pid)
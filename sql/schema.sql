@@ -23,7 +23,9 @@ CREATE TABLE IF NOT EXISTS properties (
     lon FLOAT, -- Added lon
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    fts tsvector
+    fts tsvector,
+    geohash VARCHAR(12) COLLATE "C", -- maintained by the update_geohash trigger
+    amenity_mask BIGINT NOT NULL DEFAULT 0 -- maintained by the update_amenity_mask trigger
 );
 
 -- Create a function to update the updated_at timestamp
@@ -52,6 +54,13 @@ CREATE INDEX IF NOT EXISTS idx_properties_price ON properties (price);
 -- Add index for geospatial queries, using lat/lon
 CREATE INDEX IF NOT EXISTS idx_properties_lat_lon ON properties USING GIST(ll_to_earth(lat, lon));
 
+-- Geohash cell prefix ranges (byte-wise ordering) for spatial prefilters
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS geohash VARCHAR(12) COLLATE "C";
+CREATE INDEX IF NOT EXISTS idx_properties_geohash ON properties (geohash);
+
+-- Amenity bitmask (bits from app/utils/amenities.py) for (amenity_mask & :required) = :required filters
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS amenity_mask BIGINT NOT NULL DEFAULT 0;
+
 -- Full-text search index
 CREATE INDEX IF NOT EXISTS fts_idx ON properties USING gin(fts);
 
@@ -66,4 +75,195 @@ DROP TRIGGER IF EXISTS update_fts ON properties;
 
 CREATE TRIGGER update_fts
 BEFORE INSERT OR UPDATE ON properties
-FOR EACH ROW EXECUTE PROCEDURE update_fts_column();
\ No newline at end of file
+FOR EACH ROW EXECUTE PROCEDURE update_fts_column();
+
+-- Geohash of a point (same algorithm as app/utils/geohash.py); NULL when lat/lon is NULL
+CREATE OR REPLACE FUNCTION geohash_encode(lat double precision, lon double precision, len integer DEFAULT 9)
+RETURNS text AS $$
+DECLARE
+  alphabet CONSTANT text := '0123456789bcdefghjkmnpqrstuvwxyz';
+  lat_lo double precision := -90;
+  lat_hi double precision := 90;
+  lon_lo double precision := -180;
+  lon_hi double precision := 180;
+  mid double precision;
+  result text := '';
+  ch integer := 0;
+  nbits integer := 0;
+  even boolean := true;
+BEGIN
+  WHILE length(result) < len LOOP
+    IF even THEN
+      mid := (lon_lo + lon_hi) / 2;
+      IF lon >= mid THEN ch := ch * 2 + 1; lon_lo := mid; ELSE ch := ch * 2; lon_hi := mid; END IF;
+    ELSE
+      mid := (lat_lo + lat_hi) / 2;
+      IF lat >= mid THEN ch := ch * 2 + 1; lat_lo := mid; ELSE ch := ch * 2; lat_hi := mid; END IF;
+    END IF;
+    even := NOT even;
+    nbits := nbits + 1;
+    IF nbits = 5 THEN
+      result := result || substr(alphabet, ch + 1, 1);
+      ch := 0;
+      nbits := 0;
+    END IF;
+  END LOOP;
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE STRICT;
+
+CREATE OR REPLACE FUNCTION update_geohash_column() RETURNS trigger AS $$
+BEGIN
+  NEW.geohash := geohash_encode(NEW.lat, NEW.lon, 9);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_geohash ON properties;
+
+CREATE TRIGGER update_geohash
+BEFORE INSERT OR UPDATE OF lat, lon ON properties
+FOR EACH ROW EXECUTE PROCEDURE update_geohash_column();
+
+-- Bitmask of the known amenities in a JSONB array; same vocabulary as app/utils/amenities.py
+-- (key = lowercased name without non-[a-z0-9]). Bits are stored: append, never renumber.
+CREATE OR REPLACE FUNCTION amenity_bits(amenities jsonb) RETURNS bigint AS $$
+  SELECT COALESCE(bit_or(1::bigint << v.bit), 0)
+  FROM jsonb_array_elements_text(CASE WHEN jsonb_typeof(amenities) = 'array' THEN amenities ELSE '[]'::jsonb END) AS a(name)
+  JOIN (VALUES
+    ('wifi', 0), ('wireless', 0), ('internet', 0), ('parking', 1), ('garage', 1),
+    ('carparking', 1), ('security', 2), ('guard', 2), ('securityguard', 2), ('generator', 3),
+    ('backuppower', 3), ('247water', 4), ('water', 4), ('watertank', 4), ('balcony', 5),
+    ('garden', 6), ('elevator', 7), ('lift', 7), ('furnished', 8), ('kitchenette', 9),
+    ('gym', 10), ('fitness', 10), ('swimmingpool', 11), ('pool', 11), ('sauna', 12),
+    ('jacuzzi', 13), ('rooftopterrace', 14), ('rooftop', 14), ('terrace', 14),
+    ('sharedkitchen', 15), ('loadingdock', 16), ('mainroadaccess', 17), ('mainroad', 17)
+  ) AS v(key, bit) ON v.key = regexp_replace(lower(a.name), '[^a-z0-9]+', '', 'g')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION update_amenity_mask_column() RETURNS trigger AS $$
+BEGIN
+  NEW.amenity_mask := amenity_bits(NEW.amenities);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_amenity_mask ON properties;
+
+CREATE TRIGGER update_amenity_mask
+BEFORE INSERT OR UPDATE OF amenities ON properties
+FOR EACH ROW EXECUTE PROCEDURE update_amenity_mask_column();
+
+-- Change feed: publish every properties row change on the property_changes channel
+-- (consumed by app/services/changes.py; also created by Alembic revision 2026_10_18_add_saved_search_matches)
+CREATE OR REPLACE FUNCTION notify_property_change() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    PERFORM pg_notify('property_changes', json_build_object(
+      'op', TG_OP, 'id', OLD.id, 'status', NULL, 'old_status', OLD.status)::text);
+    RETURN OLD;
+  END IF;
+  PERFORM pg_notify('property_changes', json_build_object(
+    'op', TG_OP, 'id', NEW.id, 'status', NEW.status,
+    'old_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status ELSE NULL END)::text);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS property_changes ON properties;
+
+CREATE TRIGGER property_changes
+AFTER INSERT OR UPDATE OR DELETE ON properties
+FOR EACH ROW EXECUTE PROCEDURE notify_property_change();
+
+-- Denormalized search table: approved listings only, searchable columns plus the precomputed
+-- earth point (also created by Alembic revision 2026_10_18_add_approved_property_search)
+CREATE TABLE IF NOT EXISTS approved_property_search (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    location VARCHAR(255) NOT NULL,
+    price NUMERIC(10, 2) NOT NULL,
+    house_type VARCHAR(50),
+    amenities JSONB NOT NULL DEFAULT '[]'::jsonb,
+    photos JSONB NOT NULL DEFAULT '[]'::jsonb,
+    lat FLOAT,
+    lon FLOAT,
+    geohash VARCHAR(12) COLLATE "C",
+    updated_at TIMESTAMPTZ NOT NULL,
+    earth earth,
+    amenity_mask BIGINT NOT NULL DEFAULT 0
+);
+
+ALTER TABLE approved_property_search ADD COLUMN IF NOT EXISTS amenity_mask BIGINT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_approved_property_search_price ON approved_property_search (price);
+CREATE INDEX IF NOT EXISTS idx_approved_property_search_house_type ON approved_property_search (house_type);
+CREATE INDEX IF NOT EXISTS idx_approved_property_search_geohash ON approved_property_search (geohash);
+CREATE INDEX IF NOT EXISTS idx_approved_property_search_earth ON approved_property_search USING GIST (earth);
+
+-- Row-level sync from properties (runs after update_geohash has set NEW.geohash)
+CREATE OR REPLACE FUNCTION sync_approved_property_search() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    DELETE FROM approved_property_search WHERE id = OLD.id;
+    RETURN OLD;
+  END IF;
+  IF NEW.status <> 'APPROVED' THEN
+    DELETE FROM approved_property_search WHERE id = NEW.id;
+    RETURN NEW;
+  END IF;
+  INSERT INTO approved_property_search (id, user_id, title, description, location, price, house_type, amenities, amenity_mask, photos, lat, lon, geohash, earth, updated_at)
+  VALUES (NEW.id, NEW.user_id, NEW.title, NEW.description, NEW.location, NEW.price, NEW.house_type,
+          COALESCE(NEW.amenities, '[]'::jsonb), NEW.amenity_mask, COALESCE(NEW.photos, '[]'::jsonb),
+          NEW.lat, NEW.lon, NEW.geohash,
+          CASE WHEN NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL THEN ll_to_earth(NEW.lat, NEW.lon) END,
+          NEW.updated_at)
+  ON CONFLICT (id) DO UPDATE SET
+    user_id = EXCLUDED.user_id, title = EXCLUDED.title, description = EXCLUDED.description,
+    location = EXCLUDED.location, price = EXCLUDED.price, house_type = EXCLUDED.house_type,
+    amenities = EXCLUDED.amenities, amenity_mask = EXCLUDED.amenity_mask, photos = EXCLUDED.photos,
+    lat = EXCLUDED.lat, lon = EXCLUDED.lon, geohash = EXCLUDED.geohash, earth = EXCLUDED.earth,
+    updated_at = EXCLUDED.updated_at;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sync_approved_property_search ON properties;
+
+CREATE TRIGGER sync_approved_property_search
+AFTER INSERT OR DELETE OR UPDATE OF user_id, title, description, location, price, house_type,
+                                  amenities, photos, status, lat, lon ON properties
+FOR EACH ROW EXECUTE PROCEDURE sync_approved_property_search();
+
+-- Catch-up keyed on updated_at: backfills, and repairs loads that bypassed triggers
+CREATE OR REPLACE FUNCTION refresh_approved_property_search() RETURNS integer AS $$
+DECLARE
+  removed integer;
+  changed integer;
+BEGIN
+  DELETE FROM approved_property_search s
+  WHERE NOT EXISTS (SELECT 1 FROM properties p WHERE p.id = s.id AND p.status = 'APPROVED');
+  GET DIAGNOSTICS removed = ROW_COUNT;
+  INSERT INTO approved_property_search (id, user_id, title, description, location, price, house_type, amenities, amenity_mask, photos, lat, lon, geohash, earth, updated_at)
+  SELECT p.id, p.user_id, p.title, p.description, p.location, p.price, p.house_type,
+         COALESCE(p.amenities, '[]'::jsonb), p.amenity_mask, COALESCE(p.photos, '[]'::jsonb),
+         p.lat, p.lon, p.geohash,
+         CASE WHEN p.lat IS NOT NULL AND p.lon IS NOT NULL THEN ll_to_earth(p.lat, p.lon) END,
+         p.updated_at
+  FROM properties p
+  LEFT JOIN approved_property_search s ON s.id = p.id
+  WHERE p.status = 'APPROVED' AND (s.id IS NULL OR s.updated_at < p.updated_at)
+  ON CONFLICT (id) DO UPDATE SET
+    user_id = EXCLUDED.user_id, title = EXCLUDED.title, description = EXCLUDED.description,
+    location = EXCLUDED.location, price = EXCLUDED.price, house_type = EXCLUDED.house_type,
+    amenities = EXCLUDED.amenities, amenity_mask = EXCLUDED.amenity_mask, photos = EXCLUDED.photos,
+    lat = EXCLUDED.lat, lon = EXCLUDED.lon, geohash = EXCLUDED.geohash, earth = EXCLUDED.earth,
+    updated_at = EXCLUDED.updated_at;
+  GET DIAGNOSTICS changed = ROW_COUNT;
+  RETURN removed + changed;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_approved_property_search();
@@ -1,11 +1,15 @@
 import pytest
 import pytest_asyncio
+from fastapi import HTTPException
 from httpx import AsyncClient
 from app.main import app
 from app.dependencies.auth import get_current_user
+from app.dependencies.ratelimit import reset_buckets
+from app.core.breaker import reset_breakers
 
-# Mock user data
-MOCK_TENANT = {"id": 1, "role": "Tenant"}
+# Mock user data. "user_id" is what the saved-search routes key on (a UUID in
+# the user-management service); it is also used by the load-test harness.
+MOCK_TENANT = {"id": 1, "user_id": "9b3f6c1e-2d4a-4f7b-8c1d-0a5e6f7b8c9d", "role": "Tenant"}
 MOCK_OWNER = {"id": 2, "role": "Owner"}
 
 async def override_get_current_user_tenant():
@@ -14,8 +18,22 @@ async def override_get_current_user_tenant():
 async def override_get_current_user_unauthorized():
     raise HTTPException(status_code=401, detail="Invalid token")
 
+@pytest.fixture(autouse=True)
+def fresh_rate_limits():
+    # Token buckets live in-process; start every test with full quotas
+    reset_buckets()
+    yield
+    reset_buckets()
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    # Upstream circuits are per process; a test stubbing 5xx responses must not trip the next one
+    reset_breakers()
+    yield
+    reset_breakers()
+
 @pytest_asyncio.fixture
-def client():
+async def client():
     app.dependency_overrides[get_current_user] = override_get_current_user_tenant
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
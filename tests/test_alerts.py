@@ -0,0 +1,183 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fakeredis
+import pytest
+
+from app.config import settings
+from app.services import alerts
+from app.services.alerts import SavedSearchIndex, deliver_notifications, match_properties, matches
+from app.services.changes import became_approved
+
+SEARCHES = [
+    {"id": 1, "user_id": "u1", "location": None, "min_price": 1000.0, "max_price": 8000.0, "house_type": "apartment", "amenities": [], "max_distance_km": None},
+    {"id": 2, "user_id": "u2", "location": "Adama", "min_price": None, "max_price": None, "house_type": None, "amenities": ["WiFi"], "max_distance_km": 5.0},
+    {"id": 3, "user_id": "u3", "location": None, "min_price": 50000.0, "max_price": None, "house_type": "house", "amenities": [], "max_distance_km": None},
+]
+
+NEAR = {"id": "p-near", "title": "Near", "location": "Adama", "price": 6000, "house_type": "apartment", "amenities": ["WiFi"], "lat": 8.545, "lon": 39.27}
+FAR = {"id": "p-far", "title": "Far", "location": "Addis", "price": 6000, "house_type": "apartment", "amenities": ["WiFi"], "lat": 9.0054, "lon": 38.7904}
+
+
+def _index():
+    index = SavedSearchIndex(price_bucket=5000.0, precision=5)
+    for search in SEARCHES:
+        index.add(search)
+    return index
+
+
+def test_candidates_prune_by_type_price_and_cell():
+    index = _index()
+    assert index.candidates(NEAR) == {1, 2}
+    # Search 2 is distance-scoped to the default center, so a far listing never reaches it
+    assert index.candidates(FAR) == {1}
+    assert index.candidates({**FAR, "house_type": "house", "price": 70000}) == {3}
+    # The stored (finer) geohash is used when present
+    assert index.candidates({**NEAR, "lat": None, "lon": None, "geohash": "scebtdf1z"}) == {1, 2}
+
+
+def test_match_properties_applies_exact_filters():
+    index = _index()
+    found = match_properties(index, [NEAR, FAR, {**NEAR, "id": "p-no-wifi", "amenities": []}])
+    assert sorted((m["saved_search_id"], m["property_id"]) for m in found) == [
+        (1, "p-far"), (1, "p-near"), (1, "p-no-wifi"), (2, "p-near"),
+    ]
+    assert not matches(SEARCHES[0], {**NEAR, "price": 9000})
+
+
+def test_amenities_match_by_mask_whatever_the_spelling():
+    index = _index()
+    assert index.candidates({**NEAR, "amenities": ["wi-fi"]}) == {1, 2}
+    # Rows loaded from the database carry the stored mask
+    assert index.candidates({**NEAR, "amenities": None, "amenity_mask": 0}) == {1}
+    assert matches(SEARCHES[1], {**NEAR, "amenities": ["Parking", "wifi"]})
+
+
+def test_index_add_is_idempotent():
+    index = _index()
+    index.add(SEARCHES[0])
+    assert len(index) == 3
+    assert index.last_id == 3
+
+
+def test_index_reindexes_edited_and_drops_deleted_searches():
+    index = _index()
+    index.add({**SEARCHES[0], "house_type": "house"})
+    assert index.candidates(NEAR) == {2}
+    assert index.candidates({**NEAR, "house_type": "house"}) == {1, 2}
+
+    index.replace_all([SEARCHES[0], SEARCHES[2]])
+    assert sorted(index.searches) == [1, 3]
+    assert index.candidates(NEAR) == {1}
+    index.remove(1)
+    index.remove(3)
+    assert len(index) == 0 and index.candidates(NEAR) == set()
+
+
+@pytest.mark.asyncio
+async def test_matches_are_rechecked_against_current_searches(monkeypatch):
+    index = _index()
+    current = {1: {**SEARCHES[0], "max_price": 5000.0, "user_id": "u1"}}
+
+    async def load(where, params):
+        return [current[sid] for sid in params["ids"] if sid in current]
+
+    monkeypatch.setattr(alerts, "_load_saved_searches", load)
+    found = match_properties(index, [NEAR])
+    assert {m["saved_search_id"] for m in found} == {1, 2}
+    # Search 1 now caps the price below NEAR's; search 2 was deleted
+    assert await alerts.recheck_matches(found, [NEAR], index) == []
+    assert sorted(index.searches) == [1, 3]
+    assert index.searches[1]["max_price"] == 5000.0
+
+
+@pytest.mark.asyncio
+async def test_approvals_are_queued_once_and_matched_by_the_leader_job(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(alerts, "get_redis", lambda: redis)
+    monkeypatch.setattr(settings, "ALERT_BATCH_SIZE", 2)
+    event = {"op": "UPDATE", "status": "APPROVED", "old_status": "PENDING"}
+    # Every worker's listener receives the same NOTIFY
+    for worker in range(3):
+        for pid in ("p1", "p2", "p3"):
+            await alerts.on_property_change({**event, "id": pid})
+    await alerts.on_property_change({**event, "id": "p4", "old_status": "APPROVED"})
+    batches = []
+
+    async def process(property_ids):
+        batches.append(sorted(property_ids))
+        if len(batches) == 1:
+            raise RuntimeError("database down")
+        return len(property_ids)
+
+    monkeypatch.setattr(alerts, "process_properties", process)
+    with pytest.raises(RuntimeError):
+        await alerts.match_pending()
+    # The failed batch is back on the queue
+    assert await redis.scard(alerts.PENDING_KEY) == 3
+    assert await alerts.match_pending() == 3
+    assert sorted(sum(batches[1:], [])) == ["p1", "p2", "p3"]
+    assert await redis.scard(alerts.PENDING_KEY) == 0
+
+
+def test_became_approved():
+    assert became_approved({"op": "UPDATE", "status": "APPROVED", "old_status": "PENDING"})
+    assert became_approved({"op": "INSERT", "status": "APPROVED", "old_status": None})
+    assert not became_approved({"op": "UPDATE", "status": "APPROVED", "old_status": "APPROVED"})
+    assert not became_approved({"op": "DELETE", "status": "APPROVED", "old_status": "APPROVED"})
+
+
+@pytest.fixture
+def notification_server(monkeypatch):
+    received = []
+    fail = {"remaining": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if fail["remaining"] > 0:
+                fail["remaining"] -= 1
+                self.send_response(503)
+            else:
+                received.append(json.loads(body))
+                self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "NOTIFICATION_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(settings, "ALERT_BATCH_SIZE", 2)
+    yield received, fail
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_deliver_notifications_batches(notification_server):
+    received, _ = notification_server
+    found = match_properties(_index(), [NEAR, FAR, {**NEAR, "id": "p-3"}])
+
+    delivered = await deliver_notifications(found)
+
+    assert delivered == found
+    assert [len(batch["notifications"]) for batch in received] == [2, 2, 1]
+    assert received[0]["notifications"][0]["type"] == "saved_search_match"
+
+
+@pytest.mark.asyncio
+async def test_deliver_notifications_reports_failed_batches(notification_server):
+    received, fail = notification_server
+    fail["remaining"] = 1
+    found = match_properties(_index(), [NEAR, FAR])
+
+    delivered = await deliver_notifications(found)
+
+    # First batch rejected: only the second one counts as delivered and the rest stays pending
+    assert delivered == found[2:]
+    assert len(received) == 1
@@ -0,0 +1,64 @@
+import re
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.services.search import add_attribute_filters, search_cache_key
+from app.utils.amenities import VOCABULARY, amenity_key, amenity_mask, has_amenities, parse_amenities, required_mask
+from tests.conftest import override_get_current_user_tenant
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_aliases_and_spelling_variants_share_a_bit():
+    assert parse_amenities(["wifi", "Wi-Fi", "PARKING", "pool"]) == (["WiFi", "Parking", "Swimming Pool"], [])
+    assert parse_amenities(["WiFi", "Helipad"]) == (["WiFi"], ["Helipad"])
+    assert amenity_mask(["WiFi", "24/7 Water", "Helipad"]) == 0b10001
+
+
+def test_required_mask():
+    listing = amenity_mask(["WiFi", "Parking", "Garden"])
+    assert has_amenities(listing, required_mask(["parking", "wifi"]))
+    assert not has_amenities(listing, required_mask(["WiFi", "Gym"]))
+    # An unknown amenity can never be satisfied
+    assert required_mask(["WiFi", "Helipad"]) is None
+    assert not has_amenities(listing, None)
+
+
+def test_sql_vocabulary_matches_python():
+    expected = {(amenity_key(alias), bit) for name, bit, aliases in VOCABULARY for alias in (name,) + aliases}
+    for path in (ROOT / "sql" / "schema.sql", ROOT / "alembic" / "versions" / "2026_10_18_add_amenity_mask.py"):
+        found = {(key, int(bit)) for key, bit in re.findall(r"\('([a-z0-9]+)', (\d+)\)", path.read_text())}
+        assert found == expected, path.name
+
+
+def test_filter_is_a_single_mask_check():
+    conditions, params = [], {}
+    add_attribute_filters(conditions, params, None, None, None, ["wifi", "Parking"])
+    assert conditions == ["(p.amenity_mask & :amenity_mask) = :amenity_mask"]
+    assert params == {"amenity_mask": 0b11}
+
+    conditions, params = [], {}
+    add_attribute_filters(conditions, params, None, None, None, ["Helipad"])
+    assert conditions == ["FALSE"]
+
+
+def test_cache_key_uses_canonical_names():
+    args = ("search", None, None, None, None)
+    rest = (None, False, None, "price")
+    assert search_cache_key(*args, ["wi-fi", "parking"], *rest) == search_cache_key(*args, ["Parking", "WiFi"], *rest)
+
+
+@pytest.mark.asyncio
+async def test_unknown_amenities_are_rejected():
+    app.dependency_overrides[get_current_user] = override_get_current_user_tenant
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post("/api/v1/saved-searches", json={"amenities": ["WiFi", "Helipad"]})
+    finally:
+        app.dependency_overrides = {}
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown amenities: Helipad"
@@ -0,0 +1,27 @@
+from app.core import cache as cache_module
+from app.core.cache import LocalCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LocalCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", None, ttl=5)
+    assert cache.get("b", "default") is None
+    now[0] += 10
+    assert cache.get("b", "default") == "default"
+    assert cache.get("a") == 1
+    now[0] += 30
+    assert cache.get("a") is None
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import changes
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.listener = None
+
+    async def add_listener(self, channel, callback):
+        self.listener = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    def notify(self, payload):
+        self.listener(self, 1, changes.CHANNEL, json.dumps(payload))
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    connections = []
+    connected = asyncio.Event()
+
+    async def connect(dsn):
+        connections.append(FakeConnection())
+        connected.set()
+        return connections[-1]
+
+    monkeypatch.setattr(changes.asyncpg, "connect", connect)
+    monkeypatch.setattr(changes, "asyncpg_dsn", lambda: "postgresql://test")
+    monkeypatch.setattr(changes, "POLL_SECONDS", 0.01)
+    monkeypatch.setattr(changes, "_subscribers", [])
+    monkeypatch.setattr(changes, "_resync_subscribers", [])
+
+    async def wait_for_connection(count):
+        while len(connections) < count:
+            connected.clear()
+            await asyncio.wait_for(connected.wait(), timeout=1)
+        return connections[count - 1]
+
+    yield wait_for_connection
+    changes._handler_tasks.clear()
+
+
+@pytest.mark.asyncio
+async def test_events_are_dispatched_and_gaps_trigger_a_resync(feed):
+    events, gaps = [], []
+    release = asyncio.Event()
+
+    async def slow_handler(event):
+        await release.wait()
+        events.append(event)
+
+    async def on_gap(seconds):
+        gaps.append(seconds)
+
+    changes.subscribe(slow_handler)
+    changes.subscribe_resync(on_gap)
+    changes.start_change_feed()
+    try:
+        first = await feed(1)
+        first.notify({"op": "UPDATE", "id": "p1"})
+        # The handler task is held until it finishes
+        assert len(changes._handler_tasks) == 1
+        release.set()
+        await asyncio.sleep(0.01)
+        assert events == [{"op": "UPDATE", "id": "p1"}] and not changes._handler_tasks
+        assert gaps == []
+
+        first.closed = True
+        await feed(2)
+        for _ in range(100):
+            if gaps:
+                break
+            await asyncio.sleep(0.01)
+        assert len(gaps) == 1 and gaps[0] >= 0
+    finally:
+        await changes.stop_change_feed()
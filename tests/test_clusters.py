@@ -0,0 +1,46 @@
+import json
+
+import fakeredis
+import pytest
+
+from app.config import settings
+from app.services import clusters
+from app.utils.geo import lonlat_to_tile, tile_bounds
+
+ADAMA_BBOX = (39.22, 8.50, 39.32, 8.58)
+
+
+def test_parse_bbox():
+    assert clusters.parse_bbox("39.22,8.5,39.32,8.58") == ADAMA_BBOX
+    for bad in ("39.3,8.5,39.2,8.6", "1,2,3", "a,b,c,d", "0,-95,1,1"):
+        with pytest.raises(ValueError):
+            clusters.parse_bbox(bad)
+
+
+def test_tile_round_trip():
+    x, y = lonlat_to_tile(39.2682, 8.5408, 14)
+    west, south, east, north = tile_bounds(14, x, y)
+    assert west <= 39.2682 < east and south <= 8.5408 < north
+
+
+def test_covering_tiles_is_bounded():
+    zoom, tiles = clusters.covering_tiles((39.25, 8.53, 39.29, 8.56), 14)
+    assert zoom == 14 and 0 < len(tiles) <= settings.MAP_MAX_TILES
+    # A whole-country viewport at street zoom falls back to coarser tiles
+    zoom, tiles = clusters.covering_tiles((33.0, 3.4, 48.0, 14.9), 18)
+    assert zoom < 18 and len(tiles) <= settings.MAP_MAX_TILES
+
+
+@pytest.mark.asyncio
+async def test_map_clusters_served_from_tile_cache(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(clusters, "get_redis", lambda: redis)
+    zoom, tiles = clusters.covering_tiles(ADAMA_BBOX, 13)
+    inside = {"lat": 8.54, "lon": 39.27, "count": 12, "min_price": 4000.0, "id": None}
+    outside = {"lat": 8.60, "lon": 39.27, "count": 1, "min_price": 9000.0, "id": "p1"}
+    for x, y in tiles:
+        await redis.set(f"map:{zoom}:{x}:{y}", json.dumps([inside, outside] if (x, y) == tiles[0] else []))
+
+    result = await clusters.map_clusters(ADAMA_BBOX, 13)
+
+    assert result == {"zoom": 13, "tile_zoom": zoom, "markers": [inside]}
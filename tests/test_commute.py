@@ -0,0 +1,112 @@
+import fakeredis
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core.http import use_transport
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.routers import search as search_router
+from app.services import commute as commute_service
+from app.services import onm as onm_service
+from benchmarks.stubs import _handle
+from tests.conftest import override_get_current_user_tenant
+
+WORK = (9.0300, 38.7400)
+
+
+def _listing(i: int, lat: float, lon: float) -> dict:
+    return {"id": f"p{i}", "title": f"Listing {i}", "price": 1000.0 + i, "lat": lat, "lon": lon}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(onm_service, "get_redis", lambda: redis)
+    monkeypatch.setattr(commute_service, "get_redis", lambda: redis)
+    onm_service._LOCAL.clear()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return _handle(request)
+
+    use_transport(httpx.MockTransport(handler))
+    try:
+        yield requests
+    finally:
+        use_transport(None)
+        onm_service._LOCAL.clear()
+
+
+def test_destinations_by_coordinates_or_dataset_name(monkeypatch):
+    monkeypatch.setattr(onm_service, "_ROUTES_DATA", [{"destination": "Piassa", "dest_lat": 9.0372, "dest_lon": 38.7522}])
+    assert commute_service.resolve_destinations(["9.03,38.74", "piassa"]) == [("9.03,38.74", WORK), ("piassa", (9.0372, 38.7522))]
+    with pytest.raises(ValueError):
+        commute_service.resolve_destinations(["Nowhere"])
+    with pytest.raises(ValueError):
+        commute_service.resolve_destinations(["95,38.74"])
+
+
+@pytest.mark.asyncio
+async def test_top_k_ranked_by_travel_time_with_cached_legs(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_COMMUTE_TOP_K", 12)
+    listings = [_listing(i, 9.0 + i * 0.004, 38.70 + (i % 3) * 0.01) for i in range(30)]
+    destinations = [("Office", WORK)]
+
+    ranked = await commute_service.rank_by_commute(listings, destinations, ("id", "price"))
+
+    # 12 candidates -> two Matrix calls of <= 9 listings plus the destination
+    assert len(upstream) == 2
+    assert len(ranked) == 30
+    assert set(ranked[0]) == {"id", "price", "commute"}
+    minutes = [row["commute"][0]["minutes"] for row in ranked[:12]]
+    assert minutes == sorted(minutes)
+    assert not any(row["commute"][0]["estimated"] for row in ranked[:12])
+    # Listings beyond K are kept, unranked
+    assert all(row["commute"] is None for row in ranked[12:])
+    assert {row["id"] for row in ranked} == {l["id"] for l in listings}
+
+    # Same candidates again: every leg is cached, no upstream call
+    onm_service._LOCAL.clear()
+    assert await commute_service.rank_by_commute(listings, destinations, ("id", "price")) == ranked
+    assert len(upstream) == 2
+
+
+@pytest.mark.asyncio
+async def test_listings_without_coordinates_come_last(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_COMMUTE_TOP_K", 2)
+    listings = [dict(_listing(0, 9.0, 38.7), lat=None)] + [_listing(i, 9.0 + i * 0.01, 38.74) for i in range(1, 5)]
+
+    ranked = await commute_service.rank_by_commute(listings, [("Office", WORK)], ("id",))
+
+    assert [row["id"] for row in ranked] == ["p3", "p2", "p4", "p1", "p0"]
+    assert [row["commute"] is None for row in ranked] == [False, False, True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_adds_commute_times(upstream, monkeypatch):
+    seen = {}
+
+    async def fake_search_properties(**kwargs):
+        seen.update(kwargs)
+        # Both legs above 1000 m, which distance_km reads as metres
+        return [_listing(1, 9.02, 38.75), _listing(2, 9.04, 38.74)]
+
+    monkeypatch.setattr(search_router, "search_properties", fake_search_properties)
+    app.dependency_overrides[get_current_user] = override_get_current_user_tenant
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/search?use_distance=false&fields=id,title&commute_to=9.03,38.74")
+            too_many = await client.get("/api/v1/search?" + "&".join(["commute_to=9.03,38.74"] * 4))
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert seen["fields"] == ("id", "title", "lat", "lon")
+    body = response.json()
+    assert [row["id"] for row in body] == ["p2", "p1"]
+    assert set(body[0]) == {"id", "title", "commute"}
+    assert body[0]["commute"][0]["destination"] == "9.03,38.74"
+    assert too_many.status_code == 400
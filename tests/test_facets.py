@@ -0,0 +1,45 @@
+import json
+
+import fakeredis
+import pytest
+
+from app.services import facets as facets_service
+from app.services.search import search_cache_key
+
+
+def test_shape_facets():
+    rows = [
+        {"facet": "total", "value": None, "count": 5},
+        {"facet": "house_type", "value": "studio", "count": 2},
+        {"facet": "house_type", "value": "apartment", "count": 3},
+        {"facet": "amenity", "value": "WiFi", "count": 4},
+        {"facet": "price", "value": "10000", "count": 1},
+        {"facet": "price", "value": "5000.00", "count": 4},
+        {"facet": "distance", "value": "5", "count": 3},
+        {"facet": "distance", "value": "10", "count": 5},
+    ]
+    facets = facets_service.shape_facets(rows, 5000.0, [1.0, 5.0, 10.0])
+    assert facets["total"] == 5
+    assert facets["house_types"] == {"studio": 2, "apartment": 3}
+    assert facets["amenities"] == {"WiFi": 4}
+    assert facets["price_buckets"] == [
+        {"min_price": 5000.0, "max_price": 10000.0, "count": 4},
+        {"min_price": 10000.0, "max_price": 15000.0, "count": 1},
+    ]
+    assert facets["distance_rings"] == [
+        {"max_distance_km": 1.0, "count": 0},
+        {"max_distance_km": 5.0, "count": 3},
+        {"max_distance_km": 10.0, "count": 5},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_facets_served_from_canonical_cache_key(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(facets_service, "get_redis", lambda: client)
+    cached = {"total": 1, "house_types": {}, "amenities": {}, "price_buckets": [], "distance_rings": []}
+    # Amenity order does not matter, same as the search cache
+    key = search_cache_key("facets", None, 1000.0, None, None, ["Parking", "WiFi"], None, False, None, None)
+    await client.set(key, json.dumps(cached))
+
+    assert await facets_service.search_facets(min_price=1000.0, amenities=["WiFi", "Parking"], use_distance=False) == cached
@@ -0,0 +1,36 @@
+import random
+
+from app.utils.geohash import bounds, covering_ranges, encode, prefix_upper_bound, range_condition
+
+
+def test_encode_matches_reference():
+    assert encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    lat_lo, lon_lo, lat_hi, lon_hi = bounds("scebt")
+    assert lat_lo <= 8.5408 < lat_hi and lon_lo <= 39.2682 < lon_hi
+    assert encode(8.5408, 39.2682).startswith("scebt")
+
+
+def test_prefix_upper_bound():
+    assert prefix_upper_bound("sceb") == "scec"
+    assert prefix_upper_bound("scez") == "scf"
+    assert prefix_upper_bound("zz") is None
+
+
+def test_covering_ranges_contain_every_point_in_the_box():
+    rng = random.Random(5)
+    for _ in range(100):
+        lat, lon = rng.uniform(-60, 60), rng.uniform(-170, 170)
+        box = (lat, lon, lat + rng.choice([0.01, 0.1, 0.5]), lon + rng.choice([0.01, 0.1, 0.5]))
+        ranges = covering_ranges(*box, max_ranges=16)
+        assert len(ranges) <= 16
+        for _ in range(50):
+            gh = encode(rng.uniform(box[0], box[2]), rng.uniform(box[1], box[3]))
+            assert any(gh >= low and (high is None or gh < high) for low, high in ranges)
+
+
+def test_range_condition_binds_parameters():
+    params = {}
+    sql = range_condition([("sceb", "scec"), ("zz", None)], params)
+    assert sql == "((p.geohash >= :gh_lo_0 AND p.geohash < :gh_hi_0) OR p.geohash >= :gh_lo_1)"
+    assert params == {"gh_lo_0": "sceb", "gh_hi_0": "scec", "gh_lo_1": "zz"}
+    assert range_condition([("", None)], {}) == "TRUE"
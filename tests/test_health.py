@@ -0,0 +1,125 @@
+import asyncio
+
+import fakeredis
+import httpx
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core.breaker import CircuitBreaker, CircuitOpenError
+from app.core.http import upstream_client, use_transport
+from app.main import app
+from app.routers import health
+from app.services import maintenance
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = {"redis": 0, "database": 0}
+    failing = set()
+
+    def probe(name):
+        async def run():
+            calls[name] += 1
+            await asyncio.sleep(0.01)
+            if name in failing:
+                raise ConnectionError(f"{name} down")
+        return run
+
+    monkeypatch.setattr(health, "_ping_redis", probe("redis"))
+    monkeypatch.setattr(health, "_ping_database", probe("database"))
+    health.reset_readiness()
+    yield calls, failing
+    health.reset_readiness()
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers_with_one_trial():
+    breaker = CircuitBreaker("api.gebeta.app", failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record(False, now=0)
+    breaker.record(True, now=0)
+    for _ in range(3):
+        assert breaker.allow(now=1)
+        breaker.record(False, now=1)
+    assert breaker.status(now=11) == {"state": "open", "failures": 3, "retry_in_seconds": 20}
+    assert not breaker.allow(now=11)
+
+    # Half-open: one trial; failing it reopens for another period
+    assert breaker.allow(now=31) and not breaker.allow(now=31)
+    breaker.record(False, now=31)
+    assert not breaker.allow(now=60)
+    assert breaker.allow(now=61)
+    breaker.record(True, now=61)
+    assert breaker.status()["state"] == "closed" and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_calling_upstream(monkeypatch):
+    monkeypatch.setattr(settings, "UPSTREAM_BREAKER_FAILURES", 2)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    use_transport(httpx.MockTransport(handler))
+    try:
+        async with upstream_client() as client:
+            for _ in range(2):
+                assert (await client.get("https://mapapi.gebeta.app/tiles/1/1/1.png")).status_code == 502
+            with pytest.raises(httpx.RequestError) as exc:
+                await client.get("https://mapapi.gebeta.app/tiles/1/1/1.png")
+            # Other hosts keep their own circuit
+            await client.get("https://api.gebeta.app/geocode")
+    finally:
+        use_transport(None)
+    assert isinstance(exc.value, CircuitOpenError)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_readiness_is_cached_and_shared_by_concurrent_probes(probes):
+    calls, failing = probes
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get("/api/v1/health/ready") for _ in range(5)))
+        assert [r.status_code for r in responses] == [200] * 5
+        assert calls == {"redis": 1, "database": 1}
+
+        body = responses[0].json()
+        assert body["checks"] == {"redis": "ok", "database": "ok"}
+        assert set(body["pool"]) == {"size", "checked_out", "overflow", "saturation"}
+        assert body["upstreams"] == {}
+
+        failing.add("database")
+        assert (await client.get("/api/v1/health/ready")).status_code == 200
+        health.reset_readiness()
+        degraded = await client.get("/api/v1/health/ready")
+    assert degraded.status_code == 503
+    assert degraded.json()["status"] == "degraded"
+    assert degraded.json()["checks"]["database"] == "fail: database down"
+
+
+@pytest.mark.asyncio
+async def test_slow_dependency_times_out(probes, monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_CHECK_TIMEOUT_SECONDS", 0.05)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(health, "_ping_redis", hang)
+    report = await health.check_readiness()
+    assert report["status"] == "degraded"
+    assert report["checks"] == {"redis": "fail: timeout", "database": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_cache_clear_endpoint_scans_result_caches(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(maintenance, "get_redis", lambda: redis)
+    for key in ("search:a", "facets:b", "map:c", "all_approved_properties:cards", "property:1"):
+        await redis.set(key, "x")
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/v1/cache/clear")
+    assert response.json() == {"status": "ok", "cleared_keys": 4}
+    assert await redis.keys("*") == ["property:1"]
@@ -0,0 +1,184 @@
+import asyncio
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core import jobs
+from app.core.http import use_transport
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.services import gebeta, maintenance
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(jobs, "get_redis", lambda: client)
+    jobs.clear_jobs()
+    yield client
+    jobs.clear_jobs()
+
+
+@pytest.mark.asyncio
+async def test_leader_jobs_run_on_one_replica_per_interval(redis, monkeypatch):
+    calls = []
+
+    async def work():
+        calls.append(jobs.INSTANCE_ID)
+        return len(calls)
+
+    job = jobs.register_job("warm", work, interval=60)
+    assert await jobs.run_job(job) == "ok"
+    # Same replica renews its lock
+    assert await jobs.run_job(job) == "ok"
+
+    monkeypatch.setattr(jobs, "INSTANCE_ID", "other-replica")
+    assert await jobs.run_job(job) == "not_leader"
+    assert len(calls) == 2
+    assert 0 < await redis.pttl(jobs.lock_key("warm")) <= 60000
+    assert job.status()["last_result"] == 2
+
+    # Admin-triggered runs skip the lock
+    await jobs.trigger_job(job)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_failures_are_recorded(redis):
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    job = jobs.register_job("slow", slow, interval=60, leader=False)
+    first = asyncio.create_task(jobs.run_job(job))
+    await asyncio.sleep(0)
+    assert await jobs.run_job(job) == "busy"
+    release.set()
+    assert await first == "ok"
+
+    failing = jobs.register_job("broken", broken, interval=60, leader=False)
+    assert await jobs.run_job(failing) == "error"
+    assert failing.status()["failures"] == 1
+    assert failing.status()["last_error"] == "boom"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_runs_jobs_and_cancels_them_on_shutdown(redis, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_SHUTDOWN_GRACE_SECONDS", 0.05)
+    ticks = []
+    cancelled = asyncio.Event()
+
+    async def tick():
+        ticks.append(1)
+
+    async def stuck():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    jobs.register_job("tick", tick, interval=0.01, leader=False)
+    jobs.register_job("stuck", stuck, interval=0.01, leader=False)
+    jobs.start_jobs()
+    await asyncio.sleep(0.1)
+    await jobs.stop_jobs()
+
+    assert len(ticks) >= 3
+    assert cancelled.is_set()
+    assert jobs.get_job("tick").status()["next_run"] is None
+
+
+@pytest.mark.asyncio
+async def test_clear_search_cache_only_touches_result_caches(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(maintenance, "get_redis", lambda: client)
+    for key in ("search:a", "facets:b", "map:14:1:2", "all_approved_properties:fields=id", "owner:u1", "ratelimit:x"):
+        await client.set(key, "1")
+
+    assert await maintenance.clear_search_cache() == 4
+    assert sorted(await client.keys("*")) == ["owner:u1", "ratelimit:x"]
+
+
+@pytest.mark.asyncio
+async def test_search_table_refresh_is_scheduled_and_clears_caches(redis, monkeypatch):
+    statements = []
+
+    class Session:
+        def __init__(self, engine):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement):
+            statements.append(str(statement))
+            return type("Result", (), {"scalar_one": lambda self: 3})()
+
+        async def commit(self):
+            pass
+
+    cleared = []
+
+    async def clear():
+        cleared.append(True)
+        return 0
+
+    monkeypatch.setattr(maintenance, "AsyncSession", Session)
+    monkeypatch.setattr(maintenance, "get_engine", lambda: None)
+    monkeypatch.setattr(maintenance, "clear_search_cache", clear)
+    maintenance.register_jobs()
+    job = jobs.get_job("refresh_search_table")
+    assert job.interval == settings.SEARCH_TABLE_REFRESH_INTERVAL_SECONDS and job.leader
+
+    assert await maintenance.refresh_search_table() == 3
+    assert statements == ["SELECT refresh_approved_property_search()"] and cleared == [True]
+
+
+@pytest.mark.asyncio
+async def test_admin_jobs_endpoint(redis):
+    async def noop():
+        return None
+
+    jobs.register_job("noop", noop, interval=None)
+    app.dependency_overrides[get_current_user] = lambda: {"id": 9, "role": "Admin"}
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            listed = await client.get("/api/v1/admin/jobs")
+            started = await client.post("/api/v1/admin/jobs/noop/run")
+            missing = await client.post("/api/v1/admin/jobs/nope/run")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert [j["name"] for j in listed.json()["jobs"]] == ["noop"]
+    assert started.status_code == status.HTTP_202_ACCEPTED
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_warm_map_tiles_refreshes_only_expiring_tiles(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(maintenance, "get_binary_redis", lambda: client)
+    monkeypatch.setattr(gebeta, "get_binary_redis", lambda: client)
+    monkeypatch.setattr(settings, "WARM_TILE_ZOOMS", "14")
+    monkeypatch.setattr(settings, "WARM_TILE_RADIUS", 0)
+    [(z, x, y)] = maintenance.warm_tiles()
+    use_transport(httpx.MockTransport(lambda request: httpx.Response(200, content=b"png")))
+    try:
+        assert await maintenance.warm_map_tiles() == {"tiles": 1, "refreshed": 1, "failed": 0}
+        assert await client.get(gebeta.tile_cache_key(z, x, y)) == b"png"
+        # Fresh for longer than two intervals: left alone
+        await client.expire(gebeta.tile_cache_key(z, x, y), int(3 * settings.WARM_TILES_INTERVAL_SECONDS))
+        assert await maintenance.warm_map_tiles() == {"tiles": 1, "refreshed": 0, "failed": 0}
+    finally:
+        use_transport(None)
@@ -0,0 +1,133 @@
+import asyncio
+import signal
+import time
+
+import pytest
+import uvicorn
+from httpx import AsyncClient
+
+from app import main
+from app.config import settings
+from app.core import lifecycle
+from app.core.jobs import clear_jobs
+from app.core.server import DrainingServer
+from app.routers import health
+
+
+@pytest.fixture(autouse=True)
+def not_draining():
+    yield
+    # Later tests probe readiness; leave the process out of the draining phase
+    lifecycle.begin_startup()
+
+
+@pytest.fixture
+def quiet_background(monkeypatch):
+    # Background tasks need live Redis/Postgres; the lifespan wiring is what is under test
+    for name in ("start_rate_limit_sync", "start_change_feed", "start_invalidation_listener", "start_jobs"):
+        monkeypatch.setattr(main, name, lambda: None)
+
+    async def noop():
+        return None
+
+    for name in ("stop_rate_limit_sync", "stop_change_feed", "stop_invalidation_listener", "stop_jobs", "flush_queries", "dispose_engine", "close_redis"):
+        monkeypatch.setattr(main, name, noop)
+    monkeypatch.setattr(settings, "ALERTS_ENABLED", False)
+    health.reset_readiness()
+    yield
+    clear_jobs()
+    health.reset_readiness()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_up_and_reports_startup(quiet_background, monkeypatch):
+    order = []
+
+    async def open_database():
+        order.append("database")
+
+    async def open_redis():
+        raise ConnectionError("redis down")
+
+    async def warm_caches():
+        order.append("caches")
+        return {}
+
+    monkeypatch.setattr(main, "_open_database", open_database)
+    monkeypatch.setattr(main, "_open_redis", open_redis)
+    monkeypatch.setattr(main, "warm_caches", warm_caches)
+    monkeypatch.setattr(main, "_load_routes", lambda: order.append("routes_dataset"))
+
+    async with main.lifespan(main.app):
+        report = lifecycle.startup_report()
+        assert report["phase"] == "ready"
+        assert order == ["database", "routes_dataset", "caches"]
+        assert report["steps"]["redis"]["status"] == "fail: redis down"
+        assert {step["status"] for name, step in report["steps"].items() if name != "redis"} == {"ok"}
+        assert report["duration_ms"] >= 0
+    assert lifecycle.draining()
+
+    async with AsyncClient(app=main.app, base_url="http://test") as client:
+        response = await client.get("/api/v1/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "draining"
+
+
+@pytest.mark.asyncio
+async def test_slow_startup_step_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_STEP_TIMEOUT_SECONDS", 0.01)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    lifecycle.begin_startup()
+    assert not await lifecycle.startup_step("slow", hang)
+    assert lifecycle.startup_report()["steps"]["slow"]["status"] == "fail: timeout"
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_requests_in_flight(monkeypatch):
+    remaining = iter([2, 1, 0, 0])
+    monkeypatch.setattr(lifecycle, "in_flight_requests", lambda: next(remaining))
+    assert await lifecycle.drain_requests(timeout=5) == 0
+
+    monkeypatch.setattr(lifecycle, "in_flight_requests", lambda: 3)
+    assert await lifecycle.drain_requests(timeout=0.05) == 3
+
+
+@pytest.mark.asyncio
+async def test_sigterm_drains_before_the_server_stops(monkeypatch):
+    monkeypatch.setattr(settings, "SHUTDOWN_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "SHUTDOWN_DRAIN_SECONDS", 1.0)
+    lifecycle.begin_startup()
+    server = DrainingServer(uvicorn.Config(main.app))
+
+    server.handle_exit(signal.SIGTERM, None)
+    await asyncio.sleep(0)
+    # Still accepting, but readiness already reports draining
+    assert lifecycle.draining() and not server.should_exit
+    await asyncio.sleep(0.1)
+    assert server.should_exit
+
+    # A second signal does not wait for the drain
+    lifecycle.begin_startup()
+    server = DrainingServer(uvicorn.Config(main.app))
+    server.handle_exit(signal.SIGTERM, None)
+    server.handle_exit(signal.SIGTERM, None)
+    assert server.should_exit
+
+
+@pytest.mark.asyncio
+async def test_routes_dataset_step_is_bounded(quiet_background, monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_STEP_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "STARTUP_WARM_CACHES", False)
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(main, "_open_database", noop)
+    monkeypatch.setattr(main, "_open_redis", noop)
+    monkeypatch.setattr(main, "_load_routes", lambda: time.sleep(0.3))
+
+    async with main.lifespan(main.app):
+        assert lifecycle.startup_report()["steps"]["routes_dataset"]["status"] == "fail: timeout"
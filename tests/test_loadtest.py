@@ -0,0 +1,35 @@
+import random
+from collections import Counter
+from benchmarks.loadtest import MIX, TrafficMix, check_thresholds
+
+
+def _stats(rps=100.0, p95=50.0, errors=0, requests=1000):
+    return {"requests": requests, "errors": errors, "throughput_rps": rps, "p50_ms": 10.0, "p95_ms": p95, "p99_ms": p95 * 2}
+
+
+def test_traffic_mix_matches_configured_ratios():
+    mix = TrafficMix(["a-property"], [1], seed=1)
+    rng = random.Random(7)
+    counts = Counter(mix.next_request(rng)[0] for _ in range(20000))
+    for kind, weight in MIX:
+        assert abs(counts[kind] / 20000 - weight / 100) < 0.02
+
+
+def test_saved_search_urls_target_fixture_ids():
+    mix = TrafficMix(["p1"], [42], seed=1)
+    rng = random.Random(3)
+    urls = {url for kind, url in (mix.next_request(rng) for _ in range(500)) if kind == "saved_search"}
+    assert urls == {"/api/v1/saved-searches/42/results"}
+
+
+def test_check_thresholds_reports_regressions():
+    levels = {"8": {"overall": _stats(rps=40.0, p95=300.0), "endpoints": {"search": _stats(p95=500.0)}}}
+    thresholds = {
+        "default": {"min_rps": 50, "max_p95_ms": 250},
+        "levels": {"8": {"max_p95_ms": 350}},
+        "endpoints": {"search": {"max_p95_ms": 400}},
+    }
+    violations = check_thresholds(levels, thresholds)
+    assert len(violations) == 2
+    assert any("rps" in v for v in violations)
+    assert any("search" in v and "p95" in v for v in violations)
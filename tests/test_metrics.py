@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+from app.main import app
+from app.core.http import InstrumentedTransport, classify_endpoint
+from app.core.metrics import REGISTRY, record_cache
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_prometheus_text():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/api/v1/health")
+        response = await client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "http_request_duration_seconds" in body
+    assert 'route="/api/v1/health"' in body
+
+
+def test_record_cache_folds_unknown_namespaces():
+    before = _sample("cache_requests_total", {"namespace": "other", "result": "hit"})
+    record_cache("something-else", True)
+    assert _sample("cache_requests_total", {"namespace": "other", "result": "hit"}) == before + 1
+
+
+def test_scrape_adds_up_every_worker(tmp_path):
+    # Multiprocess mode is chosen when prometheus_client is imported, so each "worker" is a process
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = "from app.core.metrics import record_cache; record_cache('geocode', True)"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+    scrape = "from prometheus_client import generate_latest; from app.core.metrics import scrape_registry; print(generate_latest(scrape_registry()).decode())"
+    body = subprocess.run([sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True).stdout
+    assert 'cache_requests_total{namespace="geocode",result="hit"} 2.0' in body
+
+
+def test_classify_endpoint_keeps_labels_bounded():
+    assert classify_endpoint("/tiles/14/9812/7713.png") == "tiles"
+    assert classify_endpoint("/api/route/matrix/") == "matrix"
+    assert classify_endpoint("/users/3f9c2a0e-1b7d-4e11-9c7a-55d0c1f7a0b2") == "users"
+    assert classify_endpoint("/some/unknown/path") == "other"
+
+
+@pytest.mark.asyncio
+async def test_instrumented_transport_records_upstream_latency():
+    mock = httpx.MockTransport(lambda request: httpx.Response(404))
+    labels = {"host": "api.gebeta.app", "endpoint": "geocode", "status": "4xx"}
+    before = _sample("upstream_request_duration_seconds_count", labels)
+    async with httpx.AsyncClient(transport=InstrumentedTransport(mock)) as client:
+        response = await client.get("https://api.gebeta.app/geocode", params={"query": "Bole"})
+    assert response.status_code == 404
+    assert _sample("upstream_request_duration_seconds_count", labels) == before + 1
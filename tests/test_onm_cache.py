@@ -0,0 +1,60 @@
+import fakeredis
+import httpx
+import pytest
+
+from app.core.http import use_transport
+from app.services import onm as onm_service
+from benchmarks.stubs import _handle
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(onm_service, "get_redis", lambda: redis)
+    onm_service._LOCAL.clear()
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return _handle(request)
+
+    use_transport(httpx.MockTransport(handler))
+    try:
+        yield requests, redis
+    finally:
+        use_transport(None)
+        onm_service._LOCAL.clear()
+
+
+@pytest.mark.asyncio
+async def test_route_cache_ignores_jitter_and_waypoint_order(upstream):
+    requests, redis = upstream
+    first = await onm_service.onm_route(9.00541, 38.76312, [(9.03, 38.74), (8.98, 38.79)])
+    again = await onm_service.onm_route(9.005412, 38.763118, [(8.980003, 38.79), (9.03, 38.740001), (9.03, 38.74)])
+
+    assert len(requests) == 1
+    assert again == first
+    assert first["waypoints"] == [[8.98, 38.79], [9.03, 38.74]]
+    assert await redis.ttl("onm:9.0054,38.7631:[{8.98,38.79},{9.03,38.74}]") > 600
+
+    # Another worker (empty in-process tier) is served from Redis
+    onm_service._LOCAL.clear()
+    assert await onm_service.onm_route(9.0054, 38.7631, [(9.03, 38.74), (8.98, 38.79)]) == first
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_origin_row_served_from_cached_matrix_legs(upstream):
+    requests, _ = upstream
+    origin, a, b, c = (9.0054, 38.7631), (9.03, 38.74), (8.98, 38.79), (9.01, 38.70)
+    full = await onm_service.matrix([a, origin, b])
+    assert len(requests) == 1
+
+    # Different coordinate set, but every origin leg is known from the first call
+    row = await onm_service.origin_matrix([origin, b, a])
+    assert len(requests) == 1
+    assert row == {"distances": [[0.0, full["distances"][1][2], full["distances"][1][0]]]}
+
+    # One unknown leg falls back to a live Matrix call
+    await onm_service.origin_matrix([origin, a, c])
+    assert len(requests) == 2
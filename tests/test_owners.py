@@ -0,0 +1,81 @@
+import fakeredis
+import httpx
+import pytest
+
+from app.config import settings
+from app.core.http import use_transport
+from app.services import owners as owner_service
+
+KNOWN = {"u1": {"name": "Abebe", "email": "abebe@example.et", "phone": "+251911000001"}}
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(owner_service, "get_redis", lambda: redis)
+    owner_service._LOCAL.clear()
+    calls = []
+
+    async def fake_load(user_ids):
+        calls.append(list(user_ids))
+        return {u: KNOWN.get(u) for u in user_ids}
+
+    monkeypatch.setattr(owner_service, "_load_from_db", fake_load)
+    yield calls, redis
+    owner_service._LOCAL.clear()
+
+
+@pytest.mark.asyncio
+async def test_one_lookup_per_page_for_distinct_owners(lookups):
+    calls, _ = lookups
+    listings = [{"owner_id": "u1"}, {"owner_id": "u2"}, {"owner_id": "u1"}, {"owner_id": None}]
+
+    contacts = await owner_service.owners_for(listings)
+
+    assert contacts == {"u1": KNOWN["u1"], "u2": None}
+    assert calls == [["u1", "u2"]]
+    # Projections without owner_contact skip the lookup entirely
+    assert await owner_service.owners_for(listings, ("id", "title")) is None
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_contacts_and_unknown_owners_are_cached(lookups):
+    calls, redis = lookups
+    await owner_service.get_owner_contacts(["u1", "u2"])
+    assert await redis.get("owner:u2") == owner_service.NOT_FOUND
+    assert await redis.ttl("owner:u2") <= settings.OWNER_CONTACT_NEGATIVE_TTL_SECONDS
+
+    # Another worker (empty in-process cache) is served from Redis
+    owner_service._LOCAL.clear()
+    assert await owner_service.get_owner_contacts(["u2", "u1"]) == {"u2": None, "u1": KNOWN["u1"]}
+    assert calls == [["u1", "u2"]]
+
+
+@pytest.mark.asyncio
+async def test_user_service_mode_uses_bulk_endpoint(lookups, monkeypatch):
+    calls, redis = lookups
+    monkeypatch.setattr(settings, "OWNER_CONTACT_SOURCE", "user_service")
+    monkeypatch.setattr(settings, "USER_BULK_LOOKUP_BATCH", 2)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) > 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"users": [{"id": "u1", "full_name": "Abebe", "email": "abebe@example.et", "phone_number": "+251911000001"}]})
+
+    use_transport(httpx.MockTransport(handler))
+    try:
+        contacts = await owner_service.get_owner_contacts(["u1", "u3", "u4"])
+        assert contacts == {"u1": KNOWN["u1"], "u3": None, "u4": None}
+        assert len(requests) == 2 and requests[0].url.path == settings.USER_BULK_LOOKUP_PATH
+
+        # An unavailable service is not cached as "no such user"
+        contacts = await owner_service.get_owner_contacts(["u5"])
+        assert contacts == {} and contacts.failed == {"u5"}
+        assert await redis.get("owner:u5") is None
+        assert owner_service.result_ttl(600, contacts) == settings.OWNER_CONTACT_OUTAGE_TTL_SECONDS
+    finally:
+        use_transport(None)
+    assert calls == []
@@ -0,0 +1,127 @@
+import fakeredis
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.schemas.search import SortByEnum
+from app.services import popular
+from app.services.search import search_cache_key
+
+
+def _criteria(max_price=20000.0, amenities=None, fields=None):
+    return dict(
+        location="Bole", min_price=None, max_price=max_price, house_type="apartment", amenities=amenities,
+        bedrooms=None, use_distance=True, max_distance_km=5.0, sort_by="distance", fields=fields,
+    )
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(popular, "get_redis", lambda: client)
+    popular._PENDING.clear()
+    yield client
+    popular._PENDING.clear()
+
+
+@pytest.mark.asyncio
+async def test_equivalent_queries_share_one_counter(redis):
+    popular.track_query(_criteria(amenities=["WiFi", "parking"]))
+    popular.track_query(_criteria(amenities=["parking", "wifi"]))
+    popular.track_query(_criteria(max_price=30000.0, fields=("id", "price")))
+
+    assert await popular.flush_queries() == 2
+    assert await popular.flush_queries() == 0
+    top = await popular.popular_queries(10)
+    assert [q["score"] for q in top] == [2.0, 1.0]
+    assert top[1]["criteria"]["fields"] == ("id", "price")
+    assert top[0]["cache_key"] == search_cache_key("search", **_criteria(amenities=["wifi", "parking"]))
+    assert top[0]["cache_ttl_seconds"] is None
+
+
+@pytest.mark.asyncio
+async def test_pending_counts_are_bounded(redis, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_POPULAR_MAX_PENDING", 1)
+    popular.track_query(_criteria())
+    popular.track_query(_criteria(max_price=1.0))
+    popular.track_query(_criteria())
+    assert list(popular._PENDING.values()) == [2]
+
+
+@pytest.mark.asyncio
+async def test_scores_decay_by_half_life_and_cold_queries_are_dropped(redis, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_POPULAR_HALF_LIFE_SECONDS", 100.0)
+    await redis.zadd(popular.POPULAR_KEY, {"hot": 8.0, "cold": 1.0})
+
+    assert await popular.decay_queries(now=1000.0) == 1.0
+    assert await popular.decay_queries(now=1100.0) == pytest.approx(0.5)
+    assert await redis.zrange(popular.POPULAR_KEY, 0, -1, withscores=True) == [("cold", 0.5), ("hot", 4.0)]
+    await popular.decay_queries(now=1200.0)
+    assert await redis.zrange(popular.POPULAR_KEY, 0, -1, withscores=True) == [("hot", 2.0)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_rebuilds_only_popular_entries_near_expiry(redis, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_POPULAR_TOP_N", 2)
+    monkeypatch.setattr(settings, "SEARCH_POPULAR_REFRESH_SECONDS", 600.0)
+    fresh, expiring, missing, unpopular = (_criteria(max_price=p) for p in (1.0, 2.0, 3.0, 4.0))
+    for criteria, score in ((fresh, 9), (expiring, 8), (missing, 7), (unpopular, 1)):
+        await redis.zadd(popular.POPULAR_KEY, {popular.canonical_query(criteria): score})
+    await redis.setex(search_cache_key("search", **fresh), 3000, "[]")
+    await redis.setex(search_cache_key("search", **expiring), 900, "[]")
+    rebuilt = []
+
+    async def fake_search_properties(refresh=False, **criteria):
+        assert refresh
+        rebuilt.append(criteria["max_price"])
+        return []
+
+    monkeypatch.setattr(popular, "search_properties", fake_search_properties)
+    assert await popular.refresh_popular_searches() == {"top": 2, "refreshed": 1, "failed": 0}
+    assert rebuilt == [2.0]
+
+    monkeypatch.setattr(settings, "SEARCH_POPULAR_TOP_N", 3)
+    rebuilt.clear()
+    await popular.refresh_popular_searches()
+    assert rebuilt == [2.0, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_admin_popular_searches_endpoint(redis):
+    await redis.zadd(popular.POPULAR_KEY, {popular.canonical_query(_criteria()): 3.0})
+    app.dependency_overrides[get_current_user] = lambda: {"id": 9, "role": "Admin"}
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/admin/popular-searches?limit=5")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert response.status_code == 200
+    [entry] = response.json()["searches"]
+    assert entry["score"] == 3.0
+    assert entry["criteria"]["house_type"] == "apartment"
+
+
+@pytest.mark.asyncio
+async def test_refresh_rebuilds_the_key_search_requests_read(redis, monkeypatch):
+    # /search passes the SortByEnum itself; the refresher replays the JSON-decoded string
+    requested = dict(_criteria(), sort_by=SortByEnum.distance)
+    request_key = search_cache_key("search", **requested)
+    assert request_key.endswith(":distance")
+    popular.track_query(requested)
+    await popular.flush_queries()
+    await redis.setex(request_key, 900, "[]")
+    monkeypatch.setattr(settings, "SEARCH_POPULAR_REFRESH_SECONDS", 600.0)
+    rebuilt = []
+
+    async def fake_search_properties(refresh=False, **criteria):
+        rebuilt.append(search_cache_key("search", **criteria))
+        return []
+
+    monkeypatch.setattr(popular, "search_properties", fake_search_properties)
+    [entry] = await popular.popular_queries(1)
+    assert entry["cache_key"] == request_key
+    assert 890 < entry["cache_ttl_seconds"] <= 900
+    assert await popular.refresh_popular_searches() == {"top": 1, "refreshed": 1, "failed": 0}
+    assert rebuilt == [request_key]
@@ -0,0 +1,57 @@
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+from app.config import settings
+from app.core import profiling
+from app.dependencies.auth import get_current_user
+from app.main import app
+
+
+@pytest.fixture
+def profiled_app(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_SLOW_MS", 0.0)
+    profiling.clear_profiles()
+    engine = create_engine("sqlite://")
+    demo = FastAPI()
+    demo.add_middleware(profiling.ProfilingMiddleware)
+
+    @demo.get("/api/v1/search")
+    async def search():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return []
+
+    yield demo
+    profiling.clear_profiles()
+
+
+@pytest.mark.asyncio
+async def test_sampled_request_captures_profile_and_sql(profiled_app):
+    async with AsyncClient(app=profiled_app, base_url="http://test") as client:
+        response = await client.get("/api/v1/search")
+    assert response.status_code == status.HTTP_200_OK
+
+    summaries = profiling.list_profiles()
+    assert len(summaries) == 1
+    assert summaries[0]["reason"] == "sampled"
+    assert summaries[0]["sql_count"] == 1
+    captured = profiling.get_profile(summaries[0]["id"])
+    assert captured["sql"][0]["statement"] == "SELECT 1"
+    assert captured["profile"]
+
+
+@pytest.mark.asyncio
+async def test_admin_profiles_requires_admin_role():
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1, "role": "Tenant"}
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            forbidden = await client.get("/api/v1/admin/profiles")
+            app.dependency_overrides[get_current_user] = lambda: {"id": 9, "role": "Admin"}
+            allowed = await client.get("/api/v1/admin/profiles")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+    assert allowed.status_code == status.HTTP_200_OK
+    assert "profiles" in allowed.json()
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.search import CARD_FIELDS, enrich_listings, parse_fields, search_cache_key, select_columns
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("card") == CARD_FIELDS
+    # Canonical order, id always included
+    assert parse_fields("price, title") == ("id", "title", "price")
+    with pytest.raises(ValueError):
+        parse_fields("title,password")
+
+
+def test_card_projection_is_pushed_into_select():
+    columns, needs_owner = select_columns(CARD_FIELDS, "0.0")
+    assert columns == "p.id::text as id, p.title, p.price, p.photos->>0 AS thumbnail, p.lat, p.lon"
+    assert not needs_owner
+
+    columns, needs_owner = select_columns(None, "0.0")
+    assert "p.description" in columns and "0.0 AS distance_km" in columns
+    # Owner contacts are looked up per page, not joined per row
+    assert "p.user_id::text AS owner_id" in columns and "u." not in columns
+    assert needs_owner
+
+
+def test_map_links_read_coordinates_but_return_only_requested_fields():
+    fields = parse_fields("preview_url")
+    columns, _ = select_columns(fields, "0.0")
+    assert "p.lat" in columns and "p.lon" in columns
+
+    rows = enrich_listings([{"id": "a", "lat": 8.5, "lon": 39.2, "price": Decimal("5000.00")}], fields)
+    assert rows == [{"id": "a", "preview_url": "/api/v1/map/preview?lat=8.5&lon=39.2&zoom=14"}]
+
+
+def test_full_rows_normalize_price_and_owner_contact():
+    row = {"id": "a", "price": Decimal("1200.50"), "lat": None, "lon": None, "owner_id": "u1"}
+    owners = {"u1": {"name": "Abebe", "email": None, "phone": None}}
+    [listing] = enrich_listings([row], owners=owners)
+    assert listing["price"] == 1200.5
+    assert listing["map_url"] is None and listing["preview_url"] is None
+    assert listing["owner_contact"] == {"name": "Abebe", "email": None, "phone": None}
+    assert "owner_id" not in listing
+
+
+def test_cache_key_depends_on_projection():
+    args = ("search", None, 1000.0, None, None, None, None, False, None, "price")
+    assert search_cache_key(*args) == "search:None:1000.0:None:None::None:False:None:price"
+    assert search_cache_key(*args, CARD_FIELDS).endswith(":fields=id,title,price,lat,lon,thumbnail")
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_compressed():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/metrics", headers={"Accept-Encoding": "gzip"})
+        small = await client.get("/api/v1/health", headers={"Accept-Encoding": "gzip"})
+    assert response.headers.get("content-encoding") in ("gzip", "br")
+    assert "content-encoding" not in small.headers
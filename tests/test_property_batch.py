@@ -0,0 +1,104 @@
+import fakeredis
+import pytest
+from pydantic import ValidationError
+
+from app.config import settings
+from app.schemas.search import PropertyBatchRequest
+from app.services import properties as property_service
+
+A = "0b8f2f7e-6f0d-4b2a-9d57-6f0c2d3b9a01"
+B = "1c9a3a8f-7a1e-4c3b-8e68-7a1d3e4cab02"
+MISSING = "2dab4b90-8b2f-4d4c-9f79-8b2e4f5dbc03"
+
+
+class Loads(list):
+    degraded: set
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(property_service, "get_redis", lambda: redis)
+    property_service._LOCAL.clear()
+    calls = Loads()
+    calls.degraded = set()
+
+    async def fake_load(prop_ids):
+        calls.append(list(prop_ids))
+        return {p: {"id": p, "title": f"Listing {p[:4]}"} for p in prop_ids if p != MISSING}, calls.degraded & set(prop_ids)
+
+    monkeypatch.setattr(property_service, "_load_properties", fake_load)
+    yield calls
+    property_service._LOCAL.clear()
+
+
+@pytest.mark.asyncio
+async def test_batch_preserves_order_and_reports_missing(loads):
+    properties, not_found = await property_service.get_properties_by_ids([B, "not-a-uuid", A, MISSING, B.upper()])
+
+    assert [p["id"] for p in properties] == [B, A]
+    assert not_found == ["not-a-uuid", MISSING]
+    # One query for all cache misses
+    assert loads == [[B, A, MISSING]]
+
+
+@pytest.mark.asyncio
+async def test_batch_serves_cached_rows_and_invalidates_on_change(loads):
+    await property_service.get_properties_by_ids([A, B])
+    properties, _ = await property_service.get_properties_by_ids([A, B])
+    assert [p["id"] for p in properties] == [A, B]
+    assert len(loads) == 1
+
+    await property_service.invalidate_property({"op": "UPDATE", "id": A, "status": "APPROVED", "old_status": "APPROVED"})
+    await property_service.get_properties_by_ids([A, B])
+    assert loads[-1] == [A]
+
+
+@pytest.mark.asyncio
+async def test_unknown_ids_are_negatively_cached(loads):
+    assert await property_service.get_property_by_id(MISSING) is None
+    assert await property_service.get_property_by_id(MISSING) is None
+    assert loads == [[MISSING]]
+
+    # Dropped when the property appears (INSERT on the change feed)
+    await property_service.invalidate_property({"op": "INSERT", "id": MISSING, "status": "PENDING", "old_status": None})
+    await property_service.get_property_by_id(MISSING)
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_hot_rows_are_served_in_process(loads):
+    await property_service.get_property_by_id(A)
+    await property_service.get_redis().flushall()
+
+    assert (await property_service.get_property_by_id(A))["id"] == A
+    assert loads == [[A]]
+
+
+@pytest.mark.asyncio
+async def test_change_feed_gap_drops_every_cached_row(loads):
+    await property_service.get_properties_by_ids([A, B, MISSING])
+    await property_service.get_redis().set("owner:u1", "{}")
+
+    assert await property_service.resync_property_cache(12.0) == 3
+    await property_service.get_properties_by_ids([A, B])
+    assert loads[-1] == [A, B]
+    assert await property_service.get_redis().get("owner:u1") == "{}"
+
+
+@pytest.mark.asyncio
+async def test_rows_without_owner_contacts_are_cached_briefly(loads):
+    # The owner lookup failed for A: its empty contact must not live for PROPERTY_CACHE_TTL_SECONDS
+    loads.degraded = {A}
+    await property_service.get_properties_by_ids([A, B])
+
+    redis = property_service.get_redis()
+    assert await redis.ttl(property_service.property_cache_key(A)) <= settings.OWNER_CONTACT_OUTAGE_TTL_SECONDS
+    assert await redis.ttl(property_service.property_cache_key(B)) > settings.OWNER_CONTACT_OUTAGE_TTL_SECONDS
+
+
+def test_batch_request_is_bounded():
+    with pytest.raises(ValidationError):
+        PropertyBatchRequest(ids=[])
+    with pytest.raises(ValidationError):
+        PropertyBatchRequest(ids=[A] * (settings.PROPERTY_BATCH_MAX_IDS + 1))
@@ -0,0 +1,108 @@
+import fakeredis
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core.metrics import record_cache
+from app.dependencies import ratelimit
+from app.dependencies.auth import get_current_user
+from app.dependencies.ratelimit import RateLimit, TokenBucket, UserRateLimit, sync_buckets
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/hit", dependencies=[Depends(RateLimit(times=2, seconds=60))])
+    async def hit():
+        record_cache("search", True)
+        return {}
+
+    @app.get("/miss", dependencies=[Depends(RateLimit(times=2, seconds=60))])
+    async def miss():
+        # The in-process tier missing alone is still a cheap request
+        record_cache("property_local", False)
+        record_cache("search", False)
+        return {}
+
+    @app.get("/me", dependencies=[Depends(UserRateLimit(times=1, seconds=60, hit_cost=1.0))])
+    async def me():
+        return {}
+
+    return app
+
+
+def test_bucket_refills_and_reports_wait():
+    bucket = TokenBucket(capacity=2, rate=1.0, now=0.0)
+    assert bucket.take(1, 0.0) == 0.0
+    assert bucket.take(1, 0.0) == 0.0
+    assert bucket.take(1, 0.0) == pytest.approx(1.0)
+    assert bucket.take(1, 0.5) == pytest.approx(0.5)
+    assert bucket.take(1, 1.0) == 0.0
+    assert bucket.unsynced == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_cost_a_fraction_of_misses():
+    async with AsyncClient(app=_app(), base_url="http://test") as client:
+        misses = [(await client.get("/miss")).status_code for _ in range(3)]
+        hits = [(await client.get("/hit")).status_code for _ in range(11)]
+        rejected = await client.get("/miss")
+
+    assert misses == [200, 200, 429]
+    assert hits == [200] * 10 + [429]
+    # 0.2 of a token at 2 tokens/minute
+    assert rejected.headers["Retry-After"] == "6"
+
+
+@pytest.mark.asyncio
+async def test_user_limits_are_per_user_and_scaled_by_role():
+    app = _app()
+    users = iter([
+        {"user_id": "a", "role": "Tenant"}, {"user_id": "a", "role": "Tenant"},
+        {"user_id": "b", "role": "Tenant"},
+        {"user_id": "c", "role": "Admin"}, {"user_id": "c", "role": "Admin"},
+    ])
+
+    async def next_user():
+        return next(users)
+
+    app.dependency_overrides[get_current_user] = next_user
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        codes = [(await client.get("/me")).status_code for _ in range(5)]
+
+    assert codes == [200, 429, 200, 200, 200]
+
+
+@pytest.mark.asyncio
+async def test_sync_takes_off_what_other_workers_spent(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(ratelimit, "get_redis", lambda: redis)
+    async with AsyncClient(app=_app(), base_url="http://test") as client:
+        assert (await client.get("/miss")).status_code == 200
+        assert await sync_buckets() == 1
+        key = next(iter(ratelimit._BUCKETS))
+        assert float(await redis.get(f"ratelimit:{key}")) == pytest.approx(1.0)
+
+        # Another worker spends a full token on the same key
+        await redis.incrbyfloat(f"ratelimit:{key}", 1.0)
+        await sync_buckets()
+        assert (await client.get("/miss")).status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_client_ip_is_limited_before_token_verification(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_PRE_AUTH_PER_MINUTE", 3)
+    app = _app()
+    verified = []
+
+    async def invalid_token():
+        verified.append(1)
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    app.dependency_overrides[get_current_user] = invalid_token
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        codes = [(await client.get("/me")).status_code for _ in range(5)]
+
+    assert codes == [401, 401, 401, 429, 429]
+    assert len(verified) == 3
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.services import onm as onm_service
+from app.services import route_matrix
+from app.utils.geo import haversine_km
+from benchmarks.catalog import generate_routes_dataset
+
+
+@pytest.fixture
+def routes(tmp_path, monkeypatch):
+    dataset = generate_routes_dataset(count=13, seed=3)
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps(dataset))
+    monkeypatch.setattr(settings, "ROUTES_DATA_PATH", str(path))
+    monkeypatch.setattr(settings, "ROUTE_MATRIX_PATH", str(tmp_path / "route_matrix.npy"))
+    monkeypatch.setattr(onm_service, "_ROUTES_DATA", None)
+    route_matrix.reset_route_matrix()
+    yield dataset
+    route_matrix.reset_route_matrix()
+
+
+def _fake_matrix(calls):
+    async def fetch(points):
+        assert len(points) <= 10
+        calls.append(points)
+        # Metres, like the Matrix API
+        return {"distances": [[haversine_km(*a, *b) * 1300 for b in points] for a in points]}
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_build_covers_every_pair_in_ten_point_batches(routes):
+    calls = []
+    nodes = route_matrix.dataset_nodes(routes)
+    rows = await route_matrix.build_route_matrix(nodes, _fake_matrix(calls))
+
+    # 13 nodes -> three blocks of <= 5 -> one call per pair of blocks
+    assert len(calls) == 3
+    for i, a in enumerate(nodes):
+        for j, b in enumerate(nodes):
+            assert rows[i][j] == pytest.approx(haversine_km(*a, *b) * 1.3 if i != j else 0.0)
+
+
+@pytest.mark.asyncio
+async def test_nearest_ranking_comes_from_the_mmapped_store(routes):
+    calls = []
+    nodes = route_matrix.dataset_nodes(routes)
+    rows = await route_matrix.build_route_matrix(nodes, _fake_matrix(calls))
+    route_matrix.write_npy(settings.ROUTE_MATRIX_PATH, rows)
+    with open(route_matrix.nodes_path(settings.ROUTE_MATRIX_PATH), "w") as f:
+        json.dump({"nodes": nodes}, f)
+
+    store = route_matrix.get_route_matrix()
+    assert store.row(2) == pytest.approx(rows[2], rel=1e-6)
+
+    # At a dataset stop: its own row, no upstream call
+    origin = (routes[4]["dest_lat"], routes[4]["dest_lon"])
+    ranking = dict(route_matrix.rank_from_store(*origin, routes))
+    assert ranking[4] == pytest.approx(0.0, abs=0.02)
+    j = nodes.index(onm_service.snap(routes[7]["dest_lat"], routes[7]["dest_lon"]))
+    assert ranking[7] <= rows[nodes.index(onm_service.snap(*origin))][j] + 0.02
+
+    # Far from every stop: caller falls back to the live API
+    assert route_matrix.rank_from_store(0.0, 0.0, routes) is None
@@ -0,0 +1,75 @@
+import json
+
+import fakeredis
+import pytest
+
+from app.services import search as search_service
+
+USER_ID = "9b3f6c1e-2d4a-4f7b-8c1d-0a5e6f7b8c9d"
+
+
+def _saved(search_id, **criteria):
+    base = {
+        "id": search_id, "user_id": USER_ID, "location": None, "min_price": None, "max_price": None,
+        "house_type": None, "amenities": None, "bedrooms": None, "max_distance_km": None,
+        "created_at": "2026-10-01 10:00:00+00:00", "photos": [], "property_id": None,
+    }
+    base.update(criteria)
+    return base
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(search_service, "get_redis", lambda: client)
+    return client
+
+
+@pytest.fixture
+def search_calls(monkeypatch):
+    calls = []
+
+    async def fake_search_properties(**criteria):
+        calls.append(criteria)
+        return [{"id": f"p{len(calls)}"}]
+
+    monkeypatch.setattr(search_service, "search_properties", fake_search_properties)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_saved_search_list_served_from_cache(redis):
+    searches = [_saved(2, max_price=20000.0), _saved(1)]
+    await redis.set(search_service.saved_searches_cache_key(USER_ID), json.dumps(searches))
+
+    # A cache hit must not touch the database (no engine is configured in tests)
+    assert await search_service.get_user_saved_searches(USER_ID) == searches
+
+    await search_service.invalidate_saved_searches(USER_ID)
+    assert await redis.get(search_service.saved_searches_cache_key(USER_ID)) is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_execution_runs_identical_criteria_once(redis, search_calls):
+    searches = [
+        _saved(3, max_price=20000.0, amenities=["WiFi", "Parking"]),
+        _saved(2, max_price=20000.0, amenities=["Parking", "WiFi"]),
+        _saved(1, location="Adama", max_distance_km=5.0),
+    ]
+    await redis.set(search_service.saved_searches_cache_key(USER_ID), json.dumps(searches))
+
+    executed = await search_service.execute_user_saved_searches(USER_ID)
+
+    assert len(search_calls) == 2
+    assert [saved["id"] for saved, _ in executed] == [3, 2, 1]
+    assert executed[0][1] is executed[1][1]
+    assert search_calls[1]["use_distance"] is True
+
+
+@pytest.mark.asyncio
+async def test_execute_saved_search_checks_ownership_via_cached_list(redis, search_calls):
+    await redis.set(search_service.saved_searches_cache_key(USER_ID), json.dumps([_saved(7, house_type="studio")]))
+
+    assert await search_service.execute_saved_search(8, USER_ID) is None
+    assert await search_service.execute_saved_search(7, USER_ID) == [{"id": "p1"}]
+    assert search_calls[0]["house_type"] == "studio"
@@ -1,17 +1,16 @@
+import fakeredis
+import httpx
 import pytest
-from httpx import AsyncClient
 from app.main import app
 from unittest.mock import AsyncMock, patch
+from app.core.http import use_transport
 from app.dependencies.auth import get_current_user
+from app.services import gebeta
 from fastapi import status, HTTPException
 
-# Mock user for authentication
-MOCK_TENANT = {"id": 1, "role": "Tenant"}
+# The conftest `client` authenticates as a Tenant; these override it per test
 MOCK_LANDLORD = {"id": 2, "role": "Landlord"}
 
-async def override_get_current_user_tenant():
-    return MOCK_TENANT
-
 async def override_get_current_user_landlord():
     return MOCK_LANDLORD
 
@@ -19,12 +18,6 @@ async def override_get_current_user_unauthenticated():
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
 # Helper to temporarily set and restore dependency overrides
-@pytest.fixture
-def tenant_auth_override():
-    app.dependency_overrides[get_current_user] = override_get_current_user_tenant
-    yield
-    app.dependency_overrides.pop(get_current_user, None)
-
 @pytest.fixture
 def landlord_auth_override():
     app.dependency_overrides[get_current_user] = override_get_current_user_landlord
@@ -37,19 +30,12 @@ def unauthenticated_auth_override():
     yield
     app.dependency_overrides.pop(get_current_user, None)
 
-@pytest.fixture
-async def client():
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        yield client
-
 @pytest.mark.asyncio
-@patch('app.services.search.search_properties', new_callable=AsyncMock)
-@patch('app.services.gebeta.geocode', new_callable=AsyncMock)
-async def test_search_properties_endpoint_success(mock_geocode, mock_search_properties, client, tenant_auth_override):
-    mock_geocode.return_value = {"lat": 9.0, "lon": 38.7}
+@patch('app.routers.search.search_properties', new_callable=AsyncMock)
+async def test_search_properties_endpoint_success(mock_search_properties, client):
     mock_search_properties.return_value = [
         {
-            "id": 1, "title": "Apartment in Bole", "description": "Nice place", "location": "Bole",
+            "id": "1", "title": "Apartment in Bole", "description": "Nice place", "location": "Bole",
             "price": 3000.00, "house_type": "apartment", "amenities": ["wifi"], "bedrooms": 2,
             "lat": 9.0, "lon": 38.7, "distance_km": 0.5, "map_url": "http://example.com/map"
         }
@@ -65,7 +51,7 @@ async def test_search_properties_endpoint_success(mock_geocode, mock_search_prop
     assert json_response[0]["title"] == "Apartment in Bole"
     assert "distance_km" in json_response[0]
     mock_search_properties.assert_called_once()
-    mock_geocode.assert_called_once_with("Bole")
+    assert mock_search_properties.call_args.kwargs["location"] == "Bole"
 
 @pytest.mark.asyncio
 async def test_search_properties_endpoint_unauthenticated(client, unauthenticated_auth_override):
@@ -78,8 +64,8 @@ async def test_search_properties_endpoint_forbidden_role(client, landlord_auth_o
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 @pytest.mark.asyncio
-@patch('app.services.search.save_search', new_callable=AsyncMock)
-async def test_save_search_endpoint_success(mock_save_search, client, tenant_auth_override):
+@patch('app.routers.search.save_search', new_callable=AsyncMock)
+async def test_save_search_endpoint_success(mock_save_search, client):
     mock_save_search.return_value = 123
 
     response = await client.post(
@@ -101,7 +87,7 @@ async def test_save_search_endpoint_forbidden_role(client, landlord_auth_overrid
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 @pytest.mark.asyncio
-@patch('app.services.gebeta.geocode', new_callable=AsyncMock)
+@patch('app.routers.search.geocode', new_callable=AsyncMock)
 async def test_geocode_endpoint_success(mock_geocode, client):
     mock_geocode.return_value = {"lat": 9.02, "lon": 38.76}
     response = await client.get("/api/v1/geocode/Bole")
@@ -110,15 +96,18 @@ async def test_geocode_endpoint_success(mock_geocode, client):
     mock_geocode.assert_called_once_with("Bole")
 
 @pytest.mark.asyncio
-@patch('app.services.gebeta.geocode', new_callable=AsyncMock)
-async def test_geocode_endpoint_fallback(mock_geocode, client):
-    mock_geocode.side_effect = Exception("Gebeta API error") # Simulate failure
-    response = await client.get("/api/v1/geocode/InvalidLocation")
+async def test_geocode_endpoint_fallback(client, monkeypatch):
+    monkeypatch.setattr(gebeta, "get_redis", lambda: fakeredis.FakeAsyncRedis(decode_responses=True))
+    use_transport(httpx.MockTransport(lambda request: httpx.Response(503))) # Simulate a Gebeta failure
+    try:
+        response = await client.get("/api/v1/geocode/InvalidLocation")
+    finally:
+        use_transport(None)
     assert response.status_code == status.HTTP_200_OK # Fallback returns 200
     assert response.json() == {"lat": 9.03, "lon": 38.75} # Expected fallback coordinates
 
 @pytest.mark.asyncio
-@patch('app.services.gebeta.get_map_tile', new_callable=AsyncMock)
+@patch('app.routers.search.get_map_tile', new_callable=AsyncMock)
 async def test_map_tile_proxy_success(mock_get_map_tile, client):
     mock_get_map_tile.return_value = b"someimagedata"
 
@@ -129,7 +118,7 @@ async def test_map_tile_proxy_success(mock_get_map_tile, client):
     mock_get_map_tile.assert_called_once_with(1, 2, 3)
 
 @pytest.mark.asyncio
-@patch('app.services.gebeta.get_map_tile', new_callable=AsyncMock)
+@patch('app.routers.search.get_map_tile', new_callable=AsyncMock)
 async def test_map_tile_proxy_failure(mock_get_map_tile, client):
     mock_get_map_tile.side_effect = ValueError("Map tile service error")
 
@@ -138,26 +127,24 @@ async def test_map_tile_proxy_failure(mock_get_map_tile, client):
     assert "Failed to fetch map tile" in response.json()["detail"]
 
 @pytest.mark.asyncio
-@patch('app.services.search.search_properties', new_callable=AsyncMock)
-async def test_search_properties_invalid_price_range(mock_search_properties, client, tenant_auth_override):
+@patch('app.routers.search.search_properties', new_callable=AsyncMock)
+async def test_search_properties_invalid_price_range(mock_search_properties, client):
     response = await client.get("/api/v1/search?min_price=5000&max_price=1000")
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert "min_price cannot be greater than max_price" in response.json()["detail"]
     mock_search_properties.assert_not_called()
 
 @pytest.mark.asyncio
-@patch('app.services.search.search_properties', new_callable=AsyncMock)
-@patch('app.services.gebeta.geocode', new_callable=AsyncMock)
-async def test_search_properties_sort_by_price(mock_geocode, mock_search_properties, client, tenant_auth_override):
-    mock_geocode.return_value = {"lat": 9.0, "lon": 38.7}
+@patch('app.routers.search.search_properties', new_callable=AsyncMock)
+async def test_search_properties_sort_by_price(mock_search_properties, client):
     mock_search_properties.return_value = [
         {
-            "id": 1, "title": "Apartment A", "description": "Desc A", "location": "Loc A",
+            "id": "1", "title": "Apartment A", "description": "Desc A", "location": "Loc A",
             "price": 1000.00, "house_type": "apartment", "amenities": ["wifi"], "bedrooms": 1,
             "lat": 9.0, "lon": 38.7, "distance_km": 1.0, "map_url": "http://example.com/map"
         },
         {
-            "id": 2, "title": "Apartment B", "description": "Desc B", "location": "Loc B",
+            "id": "2", "title": "Apartment B", "description": "Desc B", "location": "Loc B",
             "price": 2000.00, "house_type": "apartment", "amenities": ["parking"], "bedrooms": 2,
             "lat": 9.0, "lon": 38.7, "distance_km": 2.0, "map_url": "http://example.com/map"
         }
@@ -168,5 +155,6 @@ async def test_search_properties_sort_by_price(mock_geocode, mock_search_propert
     assert json_response[0]["price"] == 1000.00
     assert json_response[1]["price"] == 2000.00
     mock_search_properties.assert_called_once_with(
-        location='Bole', min_price=None, max_price=None, house_type=None, amenities=None, bedrooms=None, max_distance_km=None, sort_by='price'
+        location='Bole', min_price=None, max_price=None, house_type=None, amenities=None, bedrooms=None,
+        use_distance=True, max_distance_km=None, sort_by='price', fields=None
     )
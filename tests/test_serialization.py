@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.routers import search as search_router
+from benchmarks.bench_serialization import _fast, _validated, search_rows
+from tests.conftest import override_get_current_user_tenant
+
+
+def _search_route():
+    return next(r for r in app.routes if getattr(r, "path", None) == "/api/v1/search")
+
+
+@pytest.mark.asyncio
+async def test_fast_path_matches_validated_output():
+    rows = search_rows(200)
+    field = _search_route().response_field
+    assert json.loads(_fast(rows)) == json.loads(await _validated(field, rows))
+
+    # Rows read back from the search cache serialize the same way
+    cached = json.loads(json.dumps(rows, default=str))
+    assert json.loads(_fast(cached)) == json.loads(await _validated(field, cached))
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_output_is_identical_with_and_without_fast_path(monkeypatch):
+    rows = search_rows(50)
+
+    async def fake_search_properties(**kwargs):
+        return [dict(row) for row in rows]
+
+    monkeypatch.setattr(search_router, "search_properties", fake_search_properties)
+    app.dependency_overrides[get_current_user] = override_get_current_user_tenant
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+            fast = await client.get("/api/v1/search?use_distance=false")
+            monkeypatch.setattr(settings, "FAST_SERIALIZATION", False)
+            validated = await client.get("/api/v1/search?use_distance=false")
+    finally:
+        app.dependency_overrides = {}
+    assert fast.status_code == validated.status_code == 200
+    assert fast.json() == validated.json()
+    # OpenAPI still documents the full SearchResponse rows
+    schema = app.openapi()["paths"]["/api/v1/search"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["items"]["$ref"].endswith("/SearchResponse")
+
+
+@pytest.mark.asyncio
+async def test_saved_search_results_skip_revalidation(monkeypatch):
+    rows = search_rows(20)
+
+    async def fake_execute(user_id):
+        return [({"id": 1}, [dict(row) for row in rows]), ({"id": 2}, [])]
+
+    monkeypatch.setattr(search_router, "execute_user_saved_searches", fake_execute)
+    app.dependency_overrides[get_current_user] = override_get_current_user_tenant
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+            fast = await client.get("/api/v1/saved-searches/results")
+            counts = await client.get("/api/v1/saved-searches/results?counts_only=true")
+            monkeypatch.setattr(settings, "FAST_SERIALIZATION", False)
+            validated = await client.get("/api/v1/saved-searches/results")
+    finally:
+        app.dependency_overrides = {}
+    assert fast.status_code == validated.status_code == 200
+    assert fast.json() == validated.json()
+    assert counts.json() == [{"search_id": 1, "result_count": 20, "results": None}, {"search_id": 2, "result_count": 0, "results": None}]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import fakeredis
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.core import invalidation, jobs
+from app.core.cache import LocalCache, get_local_cache, local_cache_names
+from app.core.db import pool_limits
+from app.dependencies.auth import get_current_user
+from app.main import app
+
+
+def test_connection_budget_is_split_across_workers(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    assert pool_limits() == (5, 10)
+
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 40)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    assert pool_limits() == (5, 5)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 16)
+    assert pool_limits() == (2, 0)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 64)
+    assert pool_limits() == (1, 0)
+
+
+def test_named_caches_can_be_invalidated_by_message():
+    assert {"property", "owner", "route"} <= set(local_cache_names())
+    cache = LocalCache(10, 60, name="test_workers")
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+
+    assert invalidation.apply_invalidation({"cache": "test_workers", "keys": ["a"]}) == 1
+    assert cache.get("a") is None and cache.get("b") == "b"
+    invalidation.apply_invalidation({"cache": "test_workers", "keys": None})
+    assert len(cache) == 0
+    assert invalidation.apply_invalidation({"cache": "unknown", "keys": None}) == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidations_reach_other_workers_through_pubsub(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(invalidation, "get_redis", lambda: redis)
+    cache = get_local_cache("property")
+    cache.set("p1", {"id": "p1"})
+    cache.set("p2", {"id": "p2"})
+
+    invalidation.start_invalidation_listener()
+    try:
+        for _ in range(100):
+            if (await redis.pubsub_numsub(invalidation.CHANNEL))[0][1]:
+                break
+            await asyncio.sleep(0.01)
+        # Published by this process: already applied, so the listener ignores its echo
+        assert await invalidation.invalidate_local("property", ["p1"]) == 1
+        assert cache.get("p1") is None
+        # Another worker's message is applied on receipt
+        message = {"origin": "other-worker", "cache": "property", "keys": ["p2"]}
+        await redis.publish(invalidation.CHANNEL, json.dumps(message))
+        for _ in range(100):
+            if cache.get("p2") is None:
+                break
+            await asyncio.sleep(0.01)
+        assert cache.get("p2") is None
+    finally:
+        await invalidation.stop_invalidation_listener()
+        cache.clear()
+
+
+def test_forked_workers_get_their_own_instance_id():
+    before = jobs.INSTANCE_ID
+    jobs._reset_instance_id()
+    try:
+        assert jobs.INSTANCE_ID != before
+    finally:
+        jobs.INSTANCE_ID = before
+
+
+@pytest.mark.asyncio
+async def test_admin_clears_local_caches_everywhere(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(invalidation, "get_redis", lambda: redis)
+    get_local_cache("owner").set("u1", {"name": "Owner"})
+    app.dependency_overrides[get_current_user] = lambda: {"id": 9, "role": "Admin"}
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            cleared = await client.delete("/api/v1/admin/local-caches?cache=owner")
+            unknown = await client.delete("/api/v1/admin/local-caches?cache=nope")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+    assert cleared.json() == {"status": "ok", "caches": ["owner"], "receivers": 0}
+    assert get_local_cache("owner").get("u1") is None
+    assert unknown.status_code == 404